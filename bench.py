@@ -0,0 +1,373 @@
+# Benchmarks ItemHandler and GUI hot paths on generated stores of increasing size
+# Usage: python bench.py [--sizes 1000 10000] [--output bench_results.json]
+# Each operation's mean/min time, throughput and peak traced memory are
+# printed and saved as JSON, so runs can be compared
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import argparse
+import asyncio
+import threading
+import itertools
+import datetime
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+import todo
+from todo import ItemHandler, GUI
+
+SIZES  = [1000, 10000, 100000, 1000000]
+SEED   = 0
+REPEAT = 20 # Timed calls per operation (fewer for whole-store operations)
+NEW_ITEMS = itertools.count() # Numbers new items, so their names are unique across engines
+
+# Generates n items with the real categories, deterministically from seed
+# About 70% are complete and 10% of the rest are in progress. Half have a
+# deadline, from a month ago to a year from now
+def generate_items(n: int, seed: int = SEED) -> pd.DataFrame:
+	rng = np.random.default_rng(seed)
+	words = np.array("fix write read plan call clean buy learn build review the a new old paper garden car code".split())
+	created = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 3 * 365 * 86400, n)), unit="s")
+	items = pd.DataFrame({
+		"name"         : [f"Task {i}" for i in range(n)],
+		"description"  : [" ".join(rng.choice(words, 6)) for _ in range(n)],
+		"length"       : rng.choice(list(ItemHandler._cboptions["length"      ]), n),
+		"reviewable"   : rng.random(n) < 0.5,
+		"in_progress"  : rng.random(n) < 0.1,
+		"priority"     : rng.choice(list(ItemHandler._cboptions["priority"    ]), n),
+		"urgency"      : rng.choice(list(ItemHandler._cboptions["urgency"     ]), n),
+		"enjoyability" : rng.choice(list(ItemHandler._cboptions["enjoyability"]), n),
+		"complete"     : rng.random(n) < 0.7,
+		"creation_date": created,
+		"start_date"   : pd.NaT,
+		"deadline"     : pd.NaT,
+		"completion_date": created + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit="s"),
+	})
+	items.loc[items["complete"], "in_progress"] = False
+	items.loc[~items["complete"], "completion_date"] = pd.NaT
+	deadlines = pd.Timestamp.now().floor("min") + pd.to_timedelta(rng.integers(-30 * 86400, 365 * 86400, n), unit="s")
+	items["deadline"] = deadlines.where(rng.random(n) < 0.5)
+	return ItemHandler._typed(items)
+
+# A new incomplete item, as the Insert tab makes them
+def new_item(i: int) -> dict:
+	return {
+		"name"         : f"New task {i}",
+		"description"  : "",
+		"length"       : "1 day",
+		"reviewable"   : False,
+		"in_progress"  : False,
+		"priority"     : "High",
+		"urgency"      : "Soon",
+		"enjoyability" : "Okay",
+		"creation_date": datetime.datetime.now(),
+		"complete"     : False,
+	}
+
+# Times fn over repeat calls (running setup untimed before each), then runs
+# it once more under tracemalloc for its peak memory
+def measure(fn, repeat: int = REPEAT, setup = None) -> dict:
+	times = list()
+	for _ in range(repeat):
+		if setup: setup()
+		start = time.perf_counter()
+		fn()
+		times.append(time.perf_counter() - start)
+	if setup: setup()
+	tracemalloc.start()
+	fn()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	mean = sum(times) / len(times)
+	return {
+		"repeat"    : repeat,
+		"mean_s"    : mean,
+		"min_s"     : min(times),
+		"ops_per_s" : 1 / mean if mean else None,
+		"peak_bytes": peak,
+	}
+
+# Bytes allocated, and still held, by a handler after loading the store
+# Doesn't count the modules it imports, or memory Python doesn't allocate
+# (like pandas' Arrow-backed strings), see process_peak for that
+def footprint(make) -> dict:
+	tracemalloc.start()
+	handler = make()
+	handler.load_items()
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	handler.close()
+	return {"retained_bytes": size}
+
+# Peak resident memory of a process running todo.py with the given arguments,
+# with everything it imports. Linux only: it's read from /proc, since
+# getrusage's peak carries over from the process that started it
+def process_peak(args: list) -> dict:
+	code = (
+		"import runpy, sys; sys.argv = sys.argv[1:]; "
+		"runpy.run_path(sys.argv[0], run_name='__main__'); "
+		"print([line for line in open('/proc/self/status') if line.startswith('VmHWM')][0].split()[1], file=sys.stderr)"
+	)
+	proc = subprocess.run(
+		[sys.executable, "-c", code, os.path.abspath(todo.__file__), *args],
+		stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+	)
+	return {"peak_rss_bytes": int(proc.stderr.split()[-1]) * 1024}
+
+# Stands in for a Tk widget when there's no display, so View rendering can
+# still be timed (without Tk's own cost)
+class StubWidget:
+	def __init__(self, *args, **kwargs): self.options = dict(kwargs)
+	def configure(self, **kwargs): self.options.update(kwargs)
+	def cget(self, option): return self.options.get(option, "")
+	def grid(self, *args, **kwargs): pass
+	def grid_remove(self): pass
+	def bind(self, *args): pass
+	def winfo_reqheight(self): return 20
+
+# Returns the widget class used to render the View tab, real if possible
+def view_widgets():
+	try:
+		root = todo.tk.Tk()
+		root.withdraw()
+		return root, todo.tk.Label, todo.tk.Button, "tk"
+	except todo.tk.TclError:
+		return None, StubWidget, StubWidget, "stubbed"
+
+# Runs every benchmark on a store of n items, in the current directory
+def bench_size(n: int, rows_on_screen: int) -> dict:
+	results = dict()
+	items = generate_items(n)
+	# Completed items live in the archive, as they would after being completed
+	todo.Archive().append(items[items["complete"]].to_dict("records"))
+	items = items[~items["complete"]]
+
+	# Storage
+	for fmt, storage in todo.STORAGE_FORMATS.items():
+		if fmt == "feather":
+			try: import pyarrow
+			except ImportError: continue
+		handler = ItemHandler(journaled=False, storage=storage())
+		handler.items = items
+		results[f"export_items[{fmt}]"] = measure(handler.export_items, repeat=3)
+		def load():
+			for path in (todo.JOURNAL_FILE, todo.JOURNAL_FILE + ".old"):
+				if os.path.exists(path): os.remove(path)
+			handler.load_items()
+		results[f"load_items[{fmt}]"] = measure(load, repeat=3)
+	raw = todo.CSVStorage().read()
+	results["set_item_dtypes"] = measure(lambda: ItemHandler._typed(raw), repeat=3)
+
+	# Engines: the dataframe one as the GUI uses it (journaled), then the
+	# array and SQLite ones, converting the store on their first load
+	engines = {
+		"pandas": lambda: ItemHandler(storage=todo.CSVStorage()),
+		"array" : todo.ArrayItemHandler,
+		"sqlite": todo.SQLiteItemHandler,
+	}
+	for engine, make in engines.items():
+		handler = make()
+		handler.load_items()
+		handler.close()
+		results[f"memory[{engine}]"] = footprint(make)
+		handler = make()
+		handler.load_items()
+		bench_engine(handler, results, "" if engine == "pandas" else f"[{engine}]", rows_on_screen)
+		handler.close()
+		# Importing, loading and listing everything from the command line
+		command = [sys.executable, os.path.abspath(todo.__file__), "--engine", engine, "list"]
+		results[f"cold_start[{engine}]"] = measure(
+			lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True), repeat=3
+		)
+		if os.path.exists("/proc/self/status"):
+			results[f"process_memory[{engine}]"] = process_peak(["--engine", engine, "list"])
+	return results
+
+# Runs the operations the GUI uses on a loaded handler, suffixing their names with tag
+# SQLite keeps no caches in memory (it has indexes instead), so clearing
+# them does nothing for it, and its [cold] and [rescore] times are like the others
+def bench_engine(handler, results: dict, tag: str, rows_on_screen: int) -> None:
+	clear_sorts = getattr(handler, "_sort_cache", dict()).clear
+	# Mutations
+	results[f"add_item{tag}"] = measure(lambda: handler.add_item(new_item(next(NEW_ITEMS))))
+	names = iter(list(handler._names) if hasattr(handler, "_names") else handler.items["name"].tolist())
+	results[f"update_incomplete_item{tag}"] = measure(
+		lambda: handler.update_incomplete_item(next(names), {"priority": "Low"})
+	)
+	results[f"get_incomplete_item{tag}"] = measure(lambda: handler.get_incomplete_item(next(names)))
+	# Mutations are saved on the writer's thread, so time saving one separately
+	results[f"flush{tag}"] = measure(
+		handler.flush, repeat=3, setup=lambda: handler.update_incomplete_item(next(names), {"priority": "High"})
+	)
+
+	# Choose tab
+	bounds = {col: (list(opts)[0], list(opts)[-1]) for col, opts in ItemHandler._cboptions.items()}
+	results[f"choose_items{tag}"] = measure(lambda: handler.choose_items(bounds))
+	results[f"choose_items[weighted]{tag}"] = measure(lambda: handler.choose_items(bounds, todo.CHOOSE_WEIGHTS))
+	# "Optimal": scoring every item for new weights, then with the scores cached
+	def reweigh():
+		if hasattr(handler, "sampler"): handler.sampler.utility = None
+	results[f"recommend[rescore]{tag}"] = measure(lambda: handler.recommend(bounds, n=10), repeat=3, setup=reweigh)
+	results[f"recommend{tag}"] = measure(lambda: handler.recommend(bounds, n=10))
+	# Clicking Choose again: finding the candidates, then drawing the next one
+	def new_query(): handler._draws = None
+	results[f"draw[first]{tag}"] = measure(lambda: handler.draw(bounds), repeat=3, setup=new_query)
+	results[f"draw{tag}"] = measure(lambda: handler.draw(bounds))
+	# Choose's deadline filter, and the reminder timer, read from the schedule
+	results[f"due[soon]{tag}"] = measure(lambda: handler.due(todo.Schedule.FILTERS["soon"], bounds))
+	results[f"reminders{tag}"] = measure(lambda: (handler.reminders(), handler.next_reminder()))
+
+	# History, streamed from the archive
+	results[f"completions[month]{tag}"] = measure(handler.completions, repeat=3)
+	# Stats tab: summarizing the archive the first time, then from the summary
+	def forget_summary():
+		if os.path.exists(todo.ARCHIVE_FILE + ".summary"): os.remove(todo.ARCHIVE_FILE + ".summary")
+	results[f"stats[first]{tag}"] = measure(handler.stats, repeat=3, setup=forget_summary)
+	results[f"stats{tag}"] = measure(handler.stats)
+	# Exports, streamed a chunk at a time, so peak_bytes shouldn't grow with the archive
+	for fmt in todo.EXPORT_FORMATS:
+		results[f"export[{fmt}]{tag}"] = measure(lambda: handler.export(f"bench_export.{fmt}"), repeat=1)
+		os.remove(f"bench_export.{fmt}")
+
+	# View tab: building a sorted order, then reading it back
+	results[f"sorted_keys[cold]{tag}"] = measure(
+		lambda: handler.sorted_keys("priority"), repeat=3, setup=clear_sorts
+	)
+	results[f"sorted_keys[cached]{tag}"] = measure(lambda: handler.sorted_keys("priority", False))
+
+	# Queries: a page of a filtered, multi-column order, building the order
+	# first, then with it cached
+	filters, order_by = {"priority": ("Very High", "High"), "in_progress": False}, ["-urgency", "name"]
+	results[f"query[cold]{tag}"] = measure(
+		lambda: handler.query(filters, order_by, limit=rows_on_screen), repeat=3, setup=clear_sorts
+	)
+	results[f"query{tag}"] = measure(lambda: handler.query(filters, order_by, limit=rows_on_screen))
+	
+	# View tab: searching, building the index first, then as if typing
+	def reset_search(): handler._search = None
+	results[f"search[build]{tag}"] = measure(lambda: handler.search("fix"), repeat=3, setup=reset_search)
+	results[f"search{tag}"] = measure(lambda: handler.sorted_keys("priority").filter(handler.search("fix gar")))
+
+	# HTTP API, see load_test
+	load_test(handler, results, tag)
+	
+	# View tab: rendering a screenful of rows
+	root, label, button, mode = view_widgets()
+	gui = GUI(handler)
+	gui.sort_col = "priority"
+	gui.view_bg = ""
+	real_label, real_button = todo.tk.Label, todo.tk.Button
+	todo.tk.Label, todo.tk.Button = label, button
+	try:
+		frame = root if root is not None else StubWidget()
+		slots = [gui.make_view_row(frame, i + 1) for i in range(rows_on_screen)]
+		keys = handler.sorted_keys("priority")
+		pages = itertools.cycle([keys[:rows_on_screen], keys[rows_on_screen:2 * rows_on_screen]])
+		# Alternates between two pages, like scrolling back and forth
+		def render():
+			for widgets, key in zip(slots, next(pages)):
+				gui.fill_view_row(widgets, key)
+			if root is not None: root.update_idletasks()
+		results[f"render_view[{mode}]{tag}"] = measure(render)
+	finally:
+		todo.tk.Label, todo.tk.Button = real_label, real_button
+		if root is not None: root.destroy()
+
+# Sends requests from clients concurrent keep-alive connections (in this
+# process, so they compete with the server for the GIL) to a Server on the
+# handler, requests in all, one after another on each connection
+def load_test(handler, results: dict, tag: str, clients: int = 16, requests: int = 2000) -> None:
+	server = todo.Server(handler, port=0)
+	started = threading.Event()
+	thread = threading.Thread(target=asyncio.run, args=(server.run(started),))
+	thread.start()
+	started.wait()
+	try:
+		etag = server.etag()
+		cases = {
+			"choose"   : ("GET", "/choose?weighted=1", dict(), None),
+			"list"     : ("GET", "/items?sort=priority&limit=30", dict(), None),
+			"list[304]": ("GET", "/items?sort=priority&limit=30", {"If-None-Match": etag}, None),
+			"add"      : ("POST", "/items", dict(), lambda: json.dumps(new_item(next(NEW_ITEMS)), default=str).encode()),
+		}
+		for case, (method, target, headers, body) in cases.items():
+			results[f"serve[{case}]{tag}"] = asyncio.run(load(server.port, method, target, headers, body, clients, requests))
+	finally:
+		server.stop()
+		thread.join()
+
+async def load(port: int, method: str, target: str, headers: dict, body, clients: int, requests: int) -> dict:
+	async def client(n: int) -> list:
+		reader, writer = await asyncio.open_connection("127.0.0.1", port)
+		times = list()
+		for _ in range(n):
+			data = body() if body else b""
+			head = "".join(f"{key}: {val}\r\n" for key, val in {**headers, "Content-Length": len(data)}.items())
+			start = time.perf_counter()
+			writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n{head}\r\n".encode() + data)
+			status = (await reader.readline()).split()[1]
+			length = 0
+			while True:
+				line = await reader.readline()
+				if line == b"\r\n": break
+				if line.lower().startswith(b"content-length:"): length = int(line.split(b":")[1])
+			await reader.readexactly(length)
+			times.append(time.perf_counter() - start)
+			if status[:1] not in (b"2", b"3"): raise RuntimeError(f"{method} {target}: {status.decode()}")
+		writer.close()
+		return times
+	start = time.perf_counter()
+	times = [t for ts in await asyncio.gather(*(client(requests // clients) for _ in range(clients))) for t in ts]
+	elapsed = time.perf_counter() - start
+	return {
+		"clients"   : clients,
+		"repeat"    : len(times),
+		"mean_s"    : sum(times) / len(times), # Latency
+		"min_s"     : min(times),
+		"ops_per_s" : len(times) / elapsed,
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmarks todo.py on generated stores")
+	parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of items")
+	parser.add_argument("--rows", type=int, default=30, help="View rows rendered per redraw")
+	parser.add_argument("--output", default="bench_results.json")
+	args = parser.parse_args()
+
+	report = {
+		"date"    : datetime.datetime.now().isoformat(),
+		"python"  : sys.version.split()[0],
+		"pandas"  : pd.__version__,
+		"platform": platform.platform(),
+		"seed"    : SEED,
+		"sizes"   : dict(),
+	}
+	output = os.path.abspath(args.output)
+	cwd = os.getcwd()
+	for n in args.sizes:
+		with tempfile.TemporaryDirectory() as tmp:
+			os.chdir(tmp)
+			try:
+				results = bench_size(n, args.rows)
+			finally:
+				os.chdir(cwd)
+		report["sizes"][n] = results
+		print(f"\n{n} items")
+		for op, res in results.items():
+			if "mean_s" in res:
+				peak = f"{res['peak_bytes'] / 2 ** 20:9.2f} MiB" if "peak_bytes" in res else ""
+				print(f"  {op:30} {res['mean_s'] * 1000:10.3f} ms {res['ops_per_s']:12.1f} /s {peak}")
+			else:
+				for kind, size in res.items():
+					print(f"  {op:30} {size / 2 ** 20:10.3f} MiB {kind.replace('_bytes', '')}")
+
+	with open(output, "w") as f:
+		json.dump(report, f, indent=1)
+	print(f"\nSaved {output}")
+
+if __name__== "__main__": main()
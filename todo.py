@@ -1,636 +1,4688 @@
-# TODO parameters for pretty colors
-# TODO ? set width of grid to be maximum length OR length of header name
-# TODO ? store previously 'chosen' items that user didn't want
-# TODO give Choose an 'optimal' checkbox for choosing best item
-# TODO color code Choose results
-# TODO NAMING SCHEMES - change 'item' to 'task'
-
-WINDOW_GEOMETRY = "780x320"
-FONT            = "courier 8"
-
-import os
-import datetime
-from functools import partial
-import pandas as pd
-from pandas import DataFrame
-import tkinter as tk
-from tkinter import ttk, messagebox
-from random import randint
-
-class ItemHandler:
-	_columns: dict = {
-		# On creation
-		"name": str,
-		"description": str,
-		"length": str,
-		"reviewable": bool,
-		"in_progress": bool,
-		"priority": str,
-		"urgency": str,
-		"enjoyability": str,
-		"complete": bool,
-		"creation_date": "datetime64[ns]",
-		# After creation
-		"start_date": "datetime64[ns]",
-		"deadline": "datetime64[ns]",
-	}
-	
-	# Options for combo boxes, as well as useful information for them
-	_cboptions: dict = {
-		"length": {
-			"< 1 hr"         : {"color": "red"},
-			"1 hr - 1 day"   : {"color": "indian red"},
-			"1 day"          : {"color": "orange"},
-			"1 day - 1 wk"   : {"color": "gold"},
-			"1 wk"           : {"color": "lime green"},
-			"1 wk - 1 mth"   : {"color": "green"},
-			"Several months" : {"color": "black"},
-			"<= 1 year"      : {"color": "gray"},
-			"Several years"  : {"color": "light gray"},
-		},
-		
-		"priority": {
-			"Very High" : {"color": "red"},
-			"High"      : {"color": "orange"},
-			"Medium"    : {"color": "lime green"},
-			"Low"       : {"color": "black"},
-			"Very Low"  : {"color": "gray"},
-		},
-		
-		"urgency": {
-			"ASAP"          : {"color": "red"},
-			"Soon"          : {"color": "orange"},
-			"When ready"    : {"color": "lime green"},
-			"In the future" : {"color": "black"},
-			"Whenever"      : {"color": "gray"},
-		},
-		
-		"enjoyability": {
-			"Fun"    : {"color": "red"},
-			"Okay"   : {"color": "lime green"},
-			"Boring" : {"color": "gray"},
-		}
-	}
-	
-	# Stores all items
-	items: DataFrame
-	
-	# Adds a row to the data frame
-	def add_item(self, item: dict):
-		self.items = self.items.append(item, ignore_index=True)
-		self.export_items()
-		
-	# Removes an item that's not completed
-	def delete_incomplete_item(self, name: str) -> None:
-		df = self.items
-		
-		self.items.drop(
-			df.loc[
-				(df["complete"] == False) &
-				(df["name"] == name)
-			].index,
-			inplace=True
-		)
-		self.export_items()
-		
-	# Updates the columns values for the incomplete item's row in dataframe
-	# with the given name, using a col:val dictionary
-	# Returns False if new name is taken, and fails to update
-	def update_incomplete_item(self, name: str, cols: dict):
-		df = self.items
-		
-		name_changed = "name" in cols.keys() and cols["name"] != name
-		# Check if name already exists
-		if name_changed:
-			name_taken = cols["name"] in df["name"].unique()
-			if name_taken: return False
-		
-		row_idx = df[(df["complete"] == False) & (df["name"] == name)].index[0]
-		for col, val in cols.items():
-			self.items.iloc[row_idx, df.columns.get_loc(col)] = val
-		self.export_items()
-		return True
-	
-	# Exports the items dataframe to CSV
-	def export_items(self) -> None:
-		self.items.to_csv("items.csv", index=False)
-
-	# Reads the items CSV into the items dataframe, or creates a new one
-	def load_items(self) -> None:
-		# Create items file
-		if not os.path.exists("items.csv"):
-			self.items = DataFrame(columns = self._columns)
-			self.set_item_dtypes()
-			self.export_items()
-		# Read items file
-		else:
-			self.items = pd.read_csv("items.csv")
-			self.set_item_dtypes()
-			
-	# Set dtypes of items and convert to categoricals
-	def set_item_dtypes(self) -> None:
-		self.items = self.items.astype(self._columns)
-		# Convert to categoricals for sorting
-		for col in ["length", "priority", "urgency", "enjoyability"]:
-			self.items[col] = pd.Categorical(
-				self.items[col],
-				categories=list(ItemHandler._cboptions[col].keys()), ordered=True
-			)
-	
-class ScrollableFrame(ttk.Frame):
-    def __init__(self, container, *args, **kwargs):
-        super().__init__(container, *args, **kwargs)
-        canvas = tk.Canvas(self)
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-		
-class GUI:
-	items_handler : ItemHandler
-	win_main      : tk.Tk
-	tab_control   : ttk.Notebook
-	tab_choose    : tk.Frame
-	tab_insert    : tk.Frame
-	tab_view      : ScrollableFrame
-	items_disp    : list = list() # Items displayed in the View tab's grid
-	sort_col      : str  = "" # Column used to sort
-	sort_asc      : bool = True            # Sort ascending?
-	# Insert Item
-	txt_name   : tk.Entry     # Name
-	txt_desc   : tk.Text      # Description
-	cbx_leng   : ttk.Combobox # Length
-	cbx_prior  : ttk.Combobox # Priority
-	cbx_urge   : ttk.Combobox # Urgency
-	cbx_enjoy  : ttk.Combobox # Enjoyability
-	int_review : tk.IntVar    # Is reviewable
-	# Choose Item
-	cbx_leng_min    : ttk.Combobox    # Length Min
-	cbx_leng_max    : ttk.Combobox    # Length Max
-	cbx_prior_min   : ttk.Combobox    # Priority Min
-	cbx_urge_min    : ttk.Combobox    # Urgency Min
-	cbx_enjoy_min   : ttk.Combobox    # Enjoyability Min
-	frm_chosen_item : tk.Frame = None # Displays the chosen item
-	# Edit Item (popup window)
-	win_edit             : tk.Tk        # View popup window
-	txt_edit_name        : tk.Entry     # Name
-	txt_edit_desc        : tk.Text      # Description
-	cbx_edit_leng        : ttk.Combobox # Length
-	cbx_edit_prior       : ttk.Combobox # Priority
-	cbx_edit_urge        : ttk.Combobox # Urgency
-	cbx_edit_enjoy       : ttk.Combobox # Enjoyability
-	int_edit_review      : tk.IntVar    # Is reviewable
-	int_edit_in_progress : tk.IntVar    # In progress
-	int_edit_complete    : tk.IntVar    # Complete
-	remove_frm_chosen    : bool         # Whether to remove frame in Choose
-	
-	def __init__(self, items_handler: ItemHandler):
-		self.items_handler = items_handler
-		
-	# Displays items as rows in View tab
-	# Holds them in items_disp for easy removal
-	def disp_items(self, sort_col: str, keep_sort: bool = False):
-		# Sort all items
-		if sort_col == self.sort_col and not keep_sort:
-			self.sort_asc = not self.sort_asc
-		else:
-			self.sort_asc = True
-		self.sort_col = sort_col
-		self.items_handler.items.sort_values(
-			by=[sort_col, "creation_date"],
-			inplace=True,
-			ascending=self.sort_asc
-		)
-		self.items_handler.items.reset_index(drop=True, inplace=True)
-		
-		# Clear items_disp from screen if already drawn
-		for lbl in self.items_disp:
-			lbl.destroy()
-		self.items_disp = list()
-		
-		# Make a label to be placed in a cell
-		def make_label(width: int, col: str, row_idx: int, col_idx: int):
-			fg = "black"
-			bg = None
-			if col == sort_col: bg = "white"
-			if col in ["length", "priority", "urgency", "enjoyability"]:
-				fg = ItemHandler._cboptions[col][item[col]]["color"]
-			if   col == "in_progress"   : text = "✓" if item["in_progress"] else ""
-			elif col == "creation_date" : text = item[col].date()
-			else                        : text = item[col]
-			lbl = tk.Label(
-				self.tab_view.scrollable_frame,
-				width = width,
-				text = text,
-				fg = fg,
-				bg = bg
-			)
-			self.items_disp.append(lbl)
-			lbl.grid(row=row_idx+1, column=col_idx, sticky="w")
-		
-		# Add each row
-		items = self.items_handler.items
-		items = items[items["complete"] == False]
-		for idx, item in items.iterrows():
-			self.tab_view.scrollable_frame.grid_rowconfigure(idx+1, weight=1)
-			make_label(30, "name"         , idx, 0)
-			make_label(13, "length"       , idx, 1)
-			make_label(9 , "priority"     , idx, 2)
-			make_label(13, "urgency"      , idx, 3)
-			make_label(6 , "enjoyability" , idx, 4)
-			make_label(10, "creation_date", idx, 5)
-			make_label(6 , "in_progress"  , idx, 6)
-			btn = tk.Button(
-				self.tab_view.scrollable_frame,
-				width=5,
-				text="Edit",
-				command=partial(self.edit_item, item["name"])
-			)
-			self.items_disp.append(btn)
-			btn.grid(row=idx+1, column=7, sticky="w")
-		
-	# Sets the item to be in_progress
-	def commit_item(self, name: str):
-		self.frm_chosen_item.destroy()
-		self.items_handler.update_incomplete_item(
-			name, {"in_progress": True}
-		)
-		self.disp_items(self.sort_col, keep_sort = True)
-	
-	# Displays a randomly generated item following given parameters
-	def choose_item(self):
-		# Remove previous choice
-		if self.frm_chosen_item != None:
-			self.frm_chosen_item.pack_forget()
-		
-		# Create and store the choice as a frame
-		frm = tk.Frame(self.tab_choose, borderwidth=2, relief=tk.RAISED)
-		frm.pack(side=tk.TOP)
-		self.frm_chosen_item = frm
-		
-		# Generate a random item
-		items = self.items_handler.items
-		items = items[
-			(items["complete"]     == False                   ) &
-			(items["in_progress"]  == False                   ) &
-			(items["length"]       >= self.cbx_leng_min .get()) &
-			(items["length"]       <= self.cbx_leng_max .get()) &
-			(items["priority"]     <= self.cbx_prior_min.get()) &
-			(items["urgency"]      <= self.cbx_urge_min .get()) &
-			(items["enjoyability"] <= self.cbx_enjoy_min.get())
-		]
-		res_len = len(items)
-		if res_len < 1:
-			tk.Label(frm, text="No items found!").pack()
-			return
-		item = items.iloc[randint(0, res_len - 1)]
-		
-		# Display the item
-		def make_row(name: str, col: str):
-			fg = "black"
-			if col in ["length", "priority", "urgency", "enjoyability"]:
-				fg = ItemHandler._cboptions[col][item[col]]["color"]
-			subframe = tk.Frame(frm)
-			tk.Label(subframe, text=name, width=13, anchor="w").pack(side=tk.LEFT)
-			tk.Label(subframe, text=item[col], anchor="w", fg=fg).pack(side=tk.LEFT, fill=tk.X, expand=1)
-			subframe.pack(side=tk.TOP, anchor="w", fill=tk.X)
-		make_row("Name"        , "name")
-		make_row("Length"      , "length")
-		make_row("Priority"    , "priority")
-		make_row("Urgency"     , "urgency")
-		make_row("Enjoyability", "enjoyability")
-		
-		# Display buttons
-		subframe = tk.Frame(frm)
-		tk.Button(subframe, text="Commit", command=partial(self.commit_item, item["name"])).pack(fill=tk.X)
-		tk.Button(subframe, text="Edit", command=partial(self.edit_item, item["name"], True)).pack(fill=tk.X)
-		subframe.pack(side=tk.TOP, anchor="w", fill=tk.X)
-	
-	# Opens a popup for viewing the item
-	def edit_item(self, name: str, called_by_choose: bool = False):
-		self.win_edit = tk.Toplevel()
-		self.win_edit.grab_set()
-		self.win_edit.title("Edit Task")
-		self.win_edit.geometry(WINDOW_GEOMETRY)
-		self.win_edit.option_add("*Font", FONT)
-		
-		items = self.items_handler.items
-		items = items[items["complete"] == False]
-		item = items[items["name"] == name].iloc[0]
-		
-		# Build the UI
-		frm_edit = tk.Frame(self.win_edit)
-		
-		# Name
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Name", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.txt_edit_name = tk.Entry(subframe)
-		self.txt_edit_name.insert(0, item["name"])
-		self.txt_edit_name.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Description
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Description", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.txt_edit_desc = tk.Text(subframe, height=5)
-		self.txt_edit_desc.insert(1.0, item["description"])
-		self.txt_edit_desc.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Length
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Length", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_edit_leng = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
-		self.cbx_edit_leng.set(item["length"])
-		self.cbx_edit_leng.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Priority
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Priority", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_edit_prior = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
-		self.cbx_edit_prior.set(item["priority"])
-		self.cbx_edit_prior.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Urgency
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Urgency", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_edit_urge = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
-		self.cbx_edit_urge.set(item["urgency"])
-		self.cbx_edit_urge.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Enjoyability
-		subframe = tk.Frame(frm_edit)
-		tk.Label(subframe, text="Enjoyability", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_edit_enjoy = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
-		self.cbx_edit_enjoy.set(item["enjoyability"])
-		self.cbx_edit_enjoy.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Checkboxes
-		subframe = tk.Frame(frm_edit)
-		self.int_edit_review = tk.IntVar(value=int(item["reviewable"]))
-		cb = tk.Checkbutton(subframe, variable=self.int_edit_review, text="Is reviewable")
-		if item["reviewable"]: cb.select()
-		cb.pack(side=tk.LEFT)
-		
-		self.int_edit_complete = tk.IntVar()
-		tk.Checkbutton(subframe, variable=self.int_edit_complete, text="Complete").pack(side=tk.LEFT)
-		
-		self.int_edit_in_progress = tk.IntVar(value=int(item["in_progress"]))
-		cb = tk.Checkbutton(subframe, variable=self.int_edit_in_progress, text="In Progress")
-		if item["in_progress"]: cb.select()
-		cb.pack(side=tk.LEFT)
-		subframe.pack()
-		
-		# Buttons
-		self.remove_frm_chosen = False # Whether or not we should remove the frame in Choose tab
-		def apply_wrapper(name):
-			self.remove_frm_chosen = self.int_edit_complete.get() or self.int_edit_in_progress.get()
-			self.edit_apply(name)
-		def delete_wrapper(name):
-			self.remove_frm_chosen = True
-			self.edit_delete(name)
-		tk.Button(frm_edit, text="Apply",  command=partial(apply_wrapper , name)).pack(fill=tk.X)
-		tk.Button(frm_edit, text="Delete", command=partial(delete_wrapper, name)).pack(fill=tk.X)
-		
-		frm_edit.pack()
-		
-		self.win_main.wait_window(self.win_edit)
-		self.disp_items(self.sort_col, keep_sort=True)
-		
-		#print(called_by_choose, remove_frm_chosen)
-		if called_by_choose and self.remove_frm_chosen:
-			self.frm_chosen_item.destroy()
-				
-	# Applies views to the item in the dataframe and View tab
-	def edit_apply(self, name: str):
-		result = self.items_handler.update_incomplete_item(
-			name, {
-				"name":          self.txt_edit_name.get(),
-				"description":   self.txt_edit_desc.get("1.0", tk.END)[:-1],
-				"length":        self.cbx_edit_leng.get(),
-				"reviewable":    bool(self.int_edit_review .get()),
-				"in_progress":   bool(self.int_edit_in_progress.get()),
-				"priority":      self.cbx_edit_prior.get(),
-				"urgency":       self.cbx_edit_urge.get(),
-				"enjoyability":  self.cbx_edit_enjoy.get(),
-				"complete":      bool(self.int_edit_complete.get()),
-			}
-		)
-		
-		# Was name already taken?
-		if result == False:
-			messagebox.showerror(title="ERROR", message="Name already exists for another uncompleted task. Uncompleted task names must be unique")
-		
-	# Deletes the given item from the dataframe and View tab
-	def edit_delete(self, name: str):
-		self.items_handler.delete_incomplete_item(name)
-		self.win_edit.destroy()
-			
-	# Inserts an item into the dataframe, writes the CSV, and updates View tab
-	def insert_item(self):
-		name = self.txt_name.get()
-		if name == "":
-			messagebox.showerror(title="ERROR", message="Please enter a name")
-			return
-		cur_names = self.items_handler.items
-		cur_names = cur_names[cur_names["complete"] == False]["name"].values
-		if name in cur_names:
-			messagebox.showerror(title="ERROR", message="Name already exists for another uncompleted task. Uncompleted task names must be unique")
-			return
-		item = {
-			"name":          self.txt_name.get(),
-			"description":   self.txt_desc.get("1.0", tk.END)[:-1],
-			"length":        self.cbx_leng.get(),
-			"reviewable":    self.int_review.get(),
-			"in_progress":   False,
-			"priority":      self.cbx_prior.get(),
-			"urgency":       self.cbx_urge.get(),
-			"enjoyability":  self.cbx_enjoy.get(),
-			"creation_date": datetime.datetime.now(),
-			"complete":      False,
-			#"start_date": None,
-			#"deadline": None,
-		}
-		# Add to data frame and export
-		self.items_handler.add_item(item)
-		# Clear fields
-		self.txt_name  .delete(0  , tk.END)
-		self.txt_desc  .delete(1.0, tk.END)
-		self.cbx_leng  .set(list(ItemHandler._cboptions["length"      ].keys())[0])
-		self.cbx_prior .set(list(ItemHandler._cboptions["priority"    ].keys())[0])
-		self.cbx_urge  .set(list(ItemHandler._cboptions["urgency"     ].keys())[0])
-		self.cbx_enjoy .set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
-		self.int_review.set(False)
-		# Re-display items
-		self.items_handler.set_item_dtypes()
-		self.disp_items(self.sort_col, keep_sort=True)
-		
-	# TODO
-	def build_tab_insert(self):
-		self.tab_insert = tk.Frame(self.tab_control)
-		
-		# Name
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Name", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.txt_name = tk.Entry(subframe)
-		self.txt_name.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Description
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Description", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.txt_desc = tk.Text(subframe, height=5)
-		self.txt_desc.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Length
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Length", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_leng = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
-		self.cbx_leng.set(list(ItemHandler._cboptions["length"].keys())[0])
-		self.cbx_leng.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Priority
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Priority", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_prior = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
-		self.cbx_prior.set(list(ItemHandler._cboptions["priority"].keys())[0])
-		self.cbx_prior.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Urgency
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Urgency", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_urge = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
-		self.cbx_urge.set(list(ItemHandler._cboptions["urgency"].keys())[0])
-		self.cbx_urge.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Enjoyability
-		subframe = tk.Frame(self.tab_insert)
-		tk.Label(subframe, text="Enjoyability", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_enjoy = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
-		self.cbx_enjoy.set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
-		self.cbx_enjoy.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Checkboxes
-		subframe = tk.Frame(self.tab_insert)
-		self.int_review = tk.IntVar()
-		tk.Checkbutton(subframe, variable=self.int_review, text="Is reviewable").pack(side=tk.LEFT)
-		subframe.pack()
-		
-		# Insert button
-		tk.Button(self.tab_insert, text="Insert", command=self.insert_item).pack(fill=tk.X)
-		
-		self.tab_insert.pack()
-		
-	def build_tab_view(self):
-		self.tab_view = ScrollableFrame(self.tab_control)
-		
-		# Not sure this does anything
-		for i in range(8):
-			self.tab_view.scrollable_frame.grid_columnconfigure(i, weight=1)
-		self.tab_view.scrollable_frame.grid_rowconfigure(0, weight=1)
-		
-		# Makes a column header (button)
-		def make_col(text, width, data, col):
-			tk.Button(self.tab_view.scrollable_frame, text=text, width=width, relief=tk.RAISED, command=lambda: self.disp_items(data)).grid(row=0, column=col, sticky="w")
-		
-		# Column headers
-		make_col("Name"    , 30, "name"         , 0)
-		make_col("Length"  , 13, "length"       , 1)
-		make_col("Priority", 9 , "priority"     , 2)
-		make_col("Urgency" , 13, "urgency"      , 3)
-		make_col("Enjoy"   , 6 , "enjoyability" , 4)
-		make_col("Created" , 10, "creation_date", 5)
-		make_col("InProg"  , 6 , "in_progress"  , 6)
-		tk.Button(self.tab_view.scrollable_frame, text="Edit", width=5, relief=tk.RAISED).grid(row=0, column=7, sticky="w")
-		
-		# Items (and initial sorting)
-		self.disp_items("creation_date")
-		
-		self.tab_view.pack()
-		
-	def build_tab_choose(self):
-		self.tab_choose = tk.Frame(self.tab_control)
-		# cboptions = ItemHandler._cboptions["length"].keys() # alias
-		
-		# Length Min
-		subframe = tk.Frame(self.tab_choose)
-		tk.Label(subframe, text="Length       Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_leng_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
-		self.cbx_leng_min.set(list(ItemHandler._cboptions["length"].keys())[0])
-		self.cbx_leng_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Length Max
-		subframe = tk.Frame(self.tab_choose)
-		tk.Label(subframe, text="             Max", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_leng_max = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
-		self.cbx_leng_max.set(list(ItemHandler._cboptions["length"].keys())[0])
-		self.cbx_leng_max.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Priority Min
-		subframe = tk.Frame(self.tab_choose)
-		tk.Label(subframe, text="Priority     Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_prior_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
-		self.cbx_prior_min.set(list(ItemHandler._cboptions["priority"].keys())[0])
-		self.cbx_prior_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Urgency Min
-		subframe = tk.Frame(self.tab_choose)
-		tk.Label(subframe, text="Urgency      Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_urge_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
-		self.cbx_urge_min.set(list(ItemHandler._cboptions["urgency"].keys())[0])
-		self.cbx_urge_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Enjoyability Min
-		subframe = tk.Frame(self.tab_choose)
-		tk.Label(subframe, text="Enjoyability Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
-		self.cbx_enjoy_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
-		self.cbx_enjoy_min.set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
-		self.cbx_enjoy_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
-		subframe.pack(side=tk.TOP, fill=tk.X)
-		
-		# Choose button
-		tk.Button(self.tab_choose, text="Choose", command=self.choose_item).pack(fill=tk.X)
-		
-		self.tab_choose.pack()
-		
-	def build_gui(self):
-		self.win_main = tk.Tk()
-		self.win_main.title("TODO")
-		self.win_main.geometry(WINDOW_GEOMETRY)
-		self.win_main.option_add("*Font", FONT)
-		self.tab_control = ttk.Notebook(self.win_main)
-		self.build_tab_choose()
-		self.build_tab_insert()
-		self.build_tab_view()
-		self.tab_control.add(self.tab_choose, text='Choose')
-		self.tab_control.add(self.tab_insert, text='Insert')
-		self.tab_control.add(self.tab_view, text='View')
-		self.tab_control.pack(expand=True, fill="both")
-		self.win_main.mainloop()
-	
-def main():
-	items_handler = ItemHandler()
-	items_handler.load_items()
-	gui = GUI(items_handler)
-	gui.build_gui()
-
+# TODO parameters for pretty colors
+# TODO ? set width of grid to be maximum length OR length of header name
+# TODO color code Choose results
+# TODO NAMING SCHEMES - change 'item' to 'task'
+
+from __future__ import annotations
+
+WINDOW_GEOMETRY = "780x320"
+FONT            = "courier 8"
+ITEMS_FILE      = "items.csv"
+ITEMS_ENGINE    = "pandas" # "pandas" (a dataframe, saved as ITEMS_FORMAT), "sqlite" (DB_FILE) or "array" (no pandas, for small stores)
+ITEMS_FORMAT    = "csv" # Snapshot format: "csv", "cols" (memory-mapped NumPy) or "feather" (needs pyarrow)
+DB_FILE         = "items.db"
+JOURNAL_FILE    = "items.journal"
+JOURNAL_LIMIT   = 1 << 20 # Journal size (bytes) at which it's compacted into the snapshot
+ARCHIVE_FILE    = "items.archive" # Completed items, see Archive
+LOCK_FILE       = "items.lock" # Locked by whichever process is writing the items
+WATCH_INTERVAL  = 1000 # Milliseconds between checks for other processes' changes, without inotify
+PAGE_ROWS       = 500 # Keys of query results the sqlite engine fetches at a time
+METRICS_FILE    = "todo_metrics.json" # Where the Metrics tab (F12) saves them, see Metrics
+REJECTIONS_FILE = "items.rejections" # Tasks skipped in Choose, see Rejections
+REJECTION_HALF_LIFE = 14 # Days for a skip's weight to halve (None keeps skips for the session only)
+SERVE_PORT      = 8765 # Port todo.py serve listens on, see Server
+PERSIST_DELAY   = 0.5 # Seconds changes wait to be saved, so bursts of them are saved together (None saves at once)
+DUE_SOON        = 3 # Days before its deadline a task is "due soon" in Choose, see ItemHandler.due
+REMIND_MAX_WAIT = 3600 # Most seconds the reminder timer waits before checking again (Tk's timers overflow past ~24 days)
+# Relative odds of Choose picking an item, by category, when "Weighted" is checked
+CHOOSE_WEIGHTS  = {
+	"priority": [5, 4, 3, 2, 1],
+	"urgency" : [5, 4, 3, 2, 1],
+}
+# Utility of a task when "Optimal" is checked, to pick the best one: per
+# column, its weight times how good the category is (1 for the first, 0 for
+# the last), plus "age"'s weight per 30 days since the task was created
+RECOMMEND_WEIGHTS = {
+	"priority"    : 4,
+	"urgency"     : 3,
+	"enjoyability": 1,
+	"length"      : 1,
+	"age"         : 0.25,
+	"rejected"    : 2, # Subtracted per time the task was skipped (see Rejections)
+}
+
+import os
+import re
+import sys
+import json
+import gzip
+import argparse
+import contextlib
+import datetime
+import sqlite3
+import threading
+import time
+import signal
+import itertools
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from functools import partial, wraps
+import importlib
+import struct
+import types
+from random import random, randrange
+from math import log
+from typing import TYPE_CHECKING
+try:
+	import fcntl
+	msvcrt = None
+except ImportError: # Windows
+	import msvcrt
+	fcntl = None
+if TYPE_CHECKING:
+	from pandas import DataFrame
+
+# Stands in for a module until it's first used, then imports it and replaces
+# itself in this module's globals. Keeps the command line from paying for
+# pandas and tkinter when a command doesn't need them
+class LazyModule:
+	def __init__(self, alias: str, name: str):
+		self._alias = alias
+		self._name = name
+	
+	def __getattr__(self, attr: str):
+		module = importlib.import_module(self._name)
+		globals()[self._alias] = module
+		return getattr(module, attr)
+
+np         = LazyModule("np"        , "numpy")
+pd         = LazyModule("pd"        , "pandas")
+tk         = LazyModule("tk"        , "tkinter")
+ttk        = LazyModule("ttk"       , "tkinter.ttk")
+messagebox = LazyModule("messagebox", "tkinter.messagebox")
+cProfile    = LazyModule("cProfile"   , "cProfile")
+pstats      = LazyModule("pstats"     , "pstats")
+tracemalloc = LazyModule("tracemalloc", "tracemalloc")
+asyncio     = LazyModule("asyncio"    , "asyncio")
+http        = LazyModule("http"       , "http")
+urlparse    = LazyModule("urlparse"   , "urllib.parse")
+html        = LazyModule("html"       , "html")
+hashlib     = LazyModule("hashlib"    , "hashlib")
+ctypes      = LazyModule("ctypes"     , "ctypes")
+ctypes_util = LazyModule("ctypes_util", "ctypes.util") # Imports shutil, subprocess and tempfile, only Watcher needs it
+
+# Timings and counters of what the app does, so it's clear where time goes
+# when it's slow. Spans record how often and how long something ran (see
+# instrumented), counters how much it did (bytes written, widgets made...)
+# With profiling, each interaction (the outermost instrumented call on the
+# main thread, e.g. a GUI callback) is also run under cProfile, and the
+# memory it allocated compared with tracemalloc snapshots
+class Metrics:
+	MAX_PROFILES : int = 50 # Interactions whose profiles are kept
+	TOP          : int = 20 # Functions (and allocation sites) kept per profile
+	
+	def __init__(self):
+		self.spans     = dict() # Name: [calls, total seconds, max seconds]
+		self.counters  = dict() # Name: total
+		self.profiles  = list() # Profiles of the latest interactions
+		self.profiling = False
+		self.lock      = threading.Lock()
+		self.local     = threading.local() # depth: instrumented calls running on this thread
+	
+	def count(self, name: str, n: int = 1) -> None:
+		with self.lock:
+			self.counters[name] = self.counters.get(name, 0) + n
+	
+	def record(self, name: str, seconds: float) -> None:
+		with self.lock:
+			span = self.spans.get(name)
+			if span is None:
+				self.spans[name] = [1, seconds, seconds]
+			else:
+				span[0] += 1
+				span[1] += seconds
+				if seconds > span[2]: span[2] = seconds
+	
+	@contextlib.contextmanager
+	def span(self, name: str):
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(name, time.perf_counter() - start)
+	
+	# Wraps a function to record a span (named by its qualified name) per call
+	def timed(self, fn):
+		name = fn.__qualname__
+		@wraps(fn)
+		def wrapper(*args, **kwargs):
+			local = self.local
+			depth = getattr(local, "depth", 0)
+			local.depth = depth + 1
+			start = time.perf_counter()
+			try:
+				if self.profiling and depth == 0 and threading.current_thread() is threading.main_thread():
+					return self.profiled(name, fn, args, kwargs)
+				return fn(*args, **kwargs)
+			finally:
+				local.depth = depth
+				self.record(name, time.perf_counter() - start)
+		return wrapper
+	
+	def start_profiling(self) -> None:
+		if not tracemalloc.is_tracing(): tracemalloc.start()
+		self.profiling = True
+	
+	def profiled(self, name: str, fn, args, kwargs):
+		profiler = cProfile.Profile()
+		before = tracemalloc.take_snapshot()
+		start = time.perf_counter()
+		try:
+			return profiler.runcall(fn, *args, **kwargs)
+		finally:
+			seconds = time.perf_counter() - start
+			allocated = tracemalloc.take_snapshot().compare_to(before, "lineno")
+			# (file, line, function): (primitive calls, calls, own time, total time, callers)
+			stats = sorted(pstats.Stats(profiler).stats.items(), key=lambda stat: stat[1][3], reverse=True)
+			self.profiles.append({
+				"name"     : name,
+				"time"     : datetime.datetime.now().isoformat(),
+				"seconds"  : seconds,
+				"functions": [
+					{"function": f"{file}:{line}({func})", "calls": calls, "own_s": own, "total_s": total}
+					for (file, line, func), (_, calls, own, total, _) in stats[:self.TOP]
+				],
+				"allocated": [
+					{"where": str(stat.traceback), "bytes": stat.size_diff, "blocks": stat.count_diff}
+					for stat in allocated[:self.TOP]
+				],
+			})
+			del self.profiles[:-self.MAX_PROFILES]
+	
+	# Everything collected, as JSON-compatible dicts
+	def snapshot(self) -> dict:
+		with self.lock:
+			return {
+				"spans": {
+					name: {"calls": calls, "total_s": total, "mean_s": total / calls, "max_s": longest}
+					for name, (calls, total, longest) in sorted(self.spans.items(), key=lambda span: -span[1][1])
+				},
+				"counters": dict(sorted(self.counters.items())),
+				"profiles": list(self.profiles),
+			}
+	
+	def dump(self, path: str) -> None:
+		with open(path, "w") as f:
+			json.dump(self.snapshot(), f, indent=1)
+	
+	# Counts Tk widgets as they're created and destroyed
+	def count_widgets(self) -> None:
+		init, destroy = tk.BaseWidget.__init__, tk.BaseWidget.destroy
+		def counted_init(widget, *args, **kwargs):
+			self.count("widgets_created")
+			init(widget, *args, **kwargs)
+		def counted_destroy(widget):
+			self.count("widgets_destroyed")
+			destroy(widget)
+		tk.BaseWidget.__init__, tk.BaseWidget.destroy = counted_init, counted_destroy
+
+METRICS = Metrics()
+
+# Class decorator recording a span per call of each of the class' public
+# methods (see Metrics.timed). Private ones are left alone, since some run
+# per row, where even a span's overhead adds up
+def instrumented(cls):
+	for name, fn in list(vars(cls).items()):
+		if not name.startswith("_") and isinstance(fn, types.FunctionType) and not getattr(fn, "untimed", False):
+			setattr(cls, name, METRICS.timed(fn))
+	return cls
+
+# Keeps instrumented from wrapping a method: one running per View row, or
+# the event loop, whose callbacks would otherwise not be the outermost calls
+def untimed(fn):
+	fn.untimed = True
+	return fn
+
+# Reads and writes snapshots of the items dataframe in one file format
+@instrumented
+class Storage:
+	path  : str
+	typed : bool = False # Whether read() already returns the dtypes in ItemHandler._columns
+	
+	def __init__(self, path: str = None):
+		if path is not None: self.path = path
+	
+	def exists(self) -> bool:
+		return os.path.exists(self.path)
+	
+	def read(self) -> DataFrame:
+		raise NotImplementedError
+	
+	# Atomically replaces the file with the given dataframe
+	def write(self, items: DataFrame) -> None:
+		tmp = self.path + ".tmp"
+		with open(tmp, "wb") as f:
+			self.write_to(f, items)
+			f.flush()
+			os.fsync(f.fileno())
+			METRICS.count(f"bytes_written[{self.path}]", f.tell())
+		os.replace(tmp, self.path)
+		# Make the rename itself durable (not supported on Windows)
+		try:
+			fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+			try:     os.fsync(fd)
+			finally: os.close(fd)
+		except OSError:
+			pass
+	
+	def write_to(self, f, items: DataFrame) -> None:
+		raise NotImplementedError
+
+@instrumented
+class CSVStorage(Storage):
+	path = ITEMS_FILE
+	
+	def read(self) -> DataFrame:
+		return pd.read_csv(self.path)
+	
+	def write_to(self, f, items: DataFrame) -> None:
+		f.write(items.to_csv(index=False).encode())
+
+# Binary columnar file that's memory-mapped on read, so nothing is parsed:
+# categoricals are stored as int8 codes, dates as int64 nanoseconds, bools as
+# bytes and strings as one UTF-8 blob plus character offsets.
+# Layout: MAGIC, 8 byte header length, JSON header, then 8 byte aligned arrays
+@instrumented
+class ColumnarStorage(Storage):
+	path  = "items.cols"
+	typed = True
+	MAGIC = b"TODOCOLS1\n"
+	
+	def write_to(self, f, items: DataFrame) -> None:
+		header = {"rows": len(items), "columns": dict()}
+		arrays = list()
+		offset = 0
+		for col, dtype in ItemHandler._columns.items():
+			series = items[col]
+			if col in ItemHandler._cboptions:
+				cats = pd.Categorical(series, categories=list(ItemHandler._cboptions[col]), ordered=True)
+				parts = [cats.codes.astype(np.int8)]
+			elif dtype == bool:
+				parts = [series.values.astype(np.bool_)]
+			elif dtype == str:
+				strs = series.fillna("").astype(str).tolist()
+				offsets = np.zeros(len(strs) + 1, dtype=np.int64)
+				np.cumsum([len(x) for x in strs], out=offsets[1:])
+				parts = [offsets, np.frombuffer("".join(strs).encode(), dtype=np.uint8)]
+			else: # Dates, NaT is stored as the minimum int64 like numpy does
+				parts = [series.values.astype("datetime64[ns]").view(np.int64)]
+			header["columns"][col] = list()
+			for arr in parts:
+				header["columns"][col].append([arr.dtype.str, offset, len(arr)])
+				arrays.append(arr)
+				offset += -(-arr.nbytes // 8) * 8
+		
+		header = json.dumps(header).encode()
+		header += b" " * (-(len(self.MAGIC) + 8 + len(header)) % 8)
+		f.write(self.MAGIC + len(header).to_bytes(8, "little") + header)
+		for arr in arrays:
+			f.write(arr.tobytes())
+			f.write(b"\0" * (-arr.nbytes % 8))
+	
+	def read(self) -> DataFrame:
+		mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+		start = len(self.MAGIC) + 8
+		header_len = int.from_bytes(mm[len(self.MAGIC):start].tobytes(), "little")
+		header = json.loads(mm[start:start + header_len].tobytes())
+		start += header_len
+		
+		# Arrays are copied out of the map so the file can be replaced later
+		def array(dtype: str, offset: int, length: int) -> np.ndarray:
+			dtype = np.dtype(dtype)
+			begin = start + offset
+			return np.array(mm[begin:begin + length * dtype.itemsize].view(dtype))
+		
+		cols = dict()
+		for col, dtype in ItemHandler._columns.items():
+			# Columns added since the file was written (only dates so far)
+			if col not in header["columns"]:
+				cols[col] = np.full(header["rows"], np.datetime64("NaT"), dtype="datetime64[ns]")
+				continue
+			parts = [array(*part) for part in header["columns"][col]]
+			if col in ItemHandler._cboptions:
+				cols[col] = pd.Categorical.from_codes(
+					parts[0], categories=list(ItemHandler._cboptions[col]), ordered=True
+				)
+			elif dtype == bool:
+				cols[col] = parts[0]
+			elif dtype == str:
+				offsets, text = parts[0].tolist(), parts[1].tobytes().decode()
+				cols[col] = pd.Series([text[a:b] for a, b in zip(offsets, offsets[1:])], dtype=str)
+			else:
+				cols[col] = parts[0].view("datetime64[ns]")
+		del mm
+		return pd.DataFrame(cols)
+
+# Apache Arrow file, needs pyarrow installed
+@instrumented
+class FeatherStorage(Storage):
+	path = "items.feather"
+	
+	def read(self) -> DataFrame:
+		return pd.read_feather(self.path)
+	
+	def write_to(self, f, items: DataFrame) -> None:
+		items.reset_index(drop=True).to_feather(f)
+
+# Storage classes selectable with ITEMS_FORMAT
+STORAGE_FORMATS: dict = {
+	"csv"    : CSVStorage,
+	"cols"   : ColumnarStorage,
+	"feather": FeatherStorage,
+}
+
+# Formats items as text to share them (see ItemHandler.export), a chunk at a
+# time, so the output is written as the items are read. Items are dicts of
+# plain values (see ItemHandler._plain), cols the columns to show
+class Exporter:
+	def header(self, cols: list) -> str:
+		return ""
+	
+	def rows(self, items: list, cols: list) -> str:
+		raise NotImplementedError
+	
+	def footer(self) -> str:
+		return ""
+
+# JSON lines, one item per line
+class JSONLExporter(Exporter):
+	def rows(self, items: list, cols: list) -> str:
+		return "".join(json.dumps({col: item[col] for col in cols}) + "\n" for item in items)
+
+class MarkdownExporter(Exporter):
+	def header(self, cols: list) -> str:
+		return "| " + " | ".join(cols) + " |\n" + "|" + "---|" * len(cols) + "\n"
+	
+	def rows(self, items: list, cols: list) -> str:
+		return "".join("| " + " | ".join(self.cell(item[col]) for col in cols) + " |\n" for item in items)
+	
+	@staticmethod
+	def cell(val) -> str:
+		if val is None: return ""
+		if val is True or val is False: return "✓" if val else ""
+		return str(val).replace("\\", "\\\\").replace("|", "\\|").replace("\n", "<br>")
+
+# A standalone page with a table, colored like the View tab
+class HTMLExporter(Exporter):
+	def header(self, cols: list) -> str:
+		return (
+			"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Tasks</title><style>\n"
+			"body { font-family: sans-serif } table { border-collapse: collapse }\n"
+			"th, td { border: 1px solid #ccc; padding: 2px 6px; text-align: left } tr.complete { color: gray }\n"
+			f"</style></head><body>\n<p>Exported {datetime.datetime.now():%Y-%m-%d %H:%M}</p>\n<table>\n"
+			"<tr>" + "".join(f"<th>{html.escape(col)}</th>" for col in cols) + "</tr>\n"
+		)
+	
+	def rows(self, items: list, cols: list) -> str:
+		return "".join(
+			("<tr class=\"complete\">" if item["complete"] else "<tr>") + "".join(self.cell(col, item[col]) for col in cols) + "</tr>\n"
+			for item in items
+		)
+	
+	@staticmethod
+	def cell(col: str, val) -> str:
+		if val is None: return "<td></td>"
+		if val is True or val is False: return f"<td>{'✓' if val else ''}</td>"
+		options = ItemHandler._cboptions.get(col)
+		# Tk's color names, without their spaces, are CSS's
+		style = f" style=\"color: {options[val]['color'].replace(' ', '')}\"" if options and val in options else ""
+		return f"<td{style}>{html.escape(str(val)).replace(chr(10), '<br>')}</td>"
+	
+	def footer(self) -> str:
+		return "</table>\n</body></html>\n"
+
+# iCalendar to-dos (RFC 5545) of items with a start date or deadline, for
+# calendar apps. Ignores cols
+class ICalExporter(Exporter):
+	PRIORITIES : dict = {"Very High": 1, "High": 3, "Medium": 5, "Low": 7, "Very Low": 9}
+	
+	def header(self, cols: list) -> str:
+		self.stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+		return "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//TODO-Tracker//EN\r\n"
+	
+	def rows(self, items: list, cols: list) -> str:
+		lines = list()
+		for item in items:
+			if item["start_date"] is None and item["deadline"] is None: continue
+			if   item["complete"]   : status = "COMPLETED"
+			elif item["in_progress"]: status = "IN-PROCESS"
+			else                    : status = "NEEDS-ACTION"
+			uid = hashlib.sha1(f"{item['name']}\0{item['creation_date']}".encode()).hexdigest()
+			lines += ["BEGIN:VTODO", f"UID:{uid}@todo-tracker", f"DTSTAMP:{self.stamp}", f"SUMMARY:{self.text(item['name'])}"]
+			if item["description"]       : lines.append(f"DESCRIPTION:{self.text(item['description'])}")
+			if item["start_date"]        : lines.append(f"DTSTART:{self.date(item['start_date'])}")
+			if item["deadline"]          : lines.append(f"DUE:{self.date(item['deadline'])}")
+			if item["priority"] in self.PRIORITIES: lines.append(f"PRIORITY:{self.PRIORITIES[item['priority']]}")
+			lines += [f"STATUS:{status}", "END:VTODO"]
+		return "".join(self.fold(line) + "\r\n" for line in lines)
+	
+	def footer(self) -> str:
+		return "END:VCALENDAR\r\n"
+	
+	@staticmethod
+	def text(val: str) -> str:
+		return val.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+	
+	# An ISO date as a local ("floating") date-time
+	@staticmethod
+	def date(val: str) -> str:
+		return datetime.datetime.fromisoformat(val).strftime("%Y%m%dT%H%M%S")
+	
+	# Splits a line into ones of at most 75 bytes, continued with a space
+	@staticmethod
+	def fold(line: str) -> str:
+		if len(line) * 4 <= 75 or len(line.encode()) <= 75: return line
+		parts, part, size = list(), "", 0
+		for char in line:
+			width = len(char.encode())
+			if size + width > 75:
+				parts.append(part)
+				part, size = " ", 1
+			part += char
+			size += width
+		return "\r\n".join(parts + [part])
+
+# Exporters by name, and the file extensions they're picked by
+EXPORT_FORMATS: dict = {
+	"jsonl": JSONLExporter,
+	"md"   : MarkdownExporter,
+	"html" : HTMLExporter,
+	"ics"  : ICalExporter,
+}
+EXPORT_EXTENSIONS: dict = {".jsonl": "jsonl", ".md": "md", ".html": "html", ".htm": "html", ".ics": "ics"}
+
+# Advisory lock on a file, held while writing the items so processes sharing
+# them don't overwrite each other's changes. It's reentrant and shared by a
+# process' threads (and handlers, see shared), since a process' locks on one
+# file don't exclude each other
+class FileLock:
+	instances : dict = dict() # Path: lock, see shared
+	
+	def __init__(self, path: str = LOCK_FILE):
+		self.path  = path
+		self.file  = None
+		self.depth = 0
+		self.mutex = threading.RLock()
+	
+	@classmethod
+	def shared(cls, path: str = LOCK_FILE) -> FileLock:
+		return cls.instances.setdefault(os.path.abspath(path), cls(path))
+	
+	def __enter__(self):
+		self.mutex.acquire()
+		if self.depth == 0:
+			try:
+				self.file = open(self.path, "a+b")
+				if fcntl is not None:
+					fcntl.flock(self.file, fcntl.LOCK_EX)
+				else:
+					self.file.seek(0)
+					while True:
+						try:
+							msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+							break
+						except OSError:
+							time.sleep(0.05)
+			except BaseException:
+				if self.file is not None: self.file.close()
+				self.mutex.release()
+				raise
+		self.depth += 1
+		return self
+	
+	def __exit__(self, *exc) -> None:
+		self.depth -= 1
+		if self.depth == 0:
+			if fcntl is None:
+				self.file.seek(0)
+				msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+			self.file.close() # Releases flock's lock
+			self.file = None
+		self.mutex.release()
+
+# Append-only, compressed store of completed items, which are kept out of the
+# items dataframe and only read when their history is asked for
+# Each append is a gzip member of JSON lines (an item each) behind its 8 byte
+# length, so a torn append from a crash can be found and dropped
+@instrumented
+class Archive:
+	path       : str  = ARCHIVE_FILE
+	FRAME_ROWS : int  = 10000 # Most items compressed together
+	_end       : int  = None  # Size when last known to end on a whole append (see size)
+	_summary   : dict = None  # Latest summary, see summary
+	
+	def __init__(self, path: str = None, save = None):
+		if path is not None: self.path = path
+		self._save = save # Takes [("summary", summary)] to write later, None writes at once
+	
+	def exists(self) -> bool:
+		return os.path.exists(self.path)
+	
+	# Durably appends items (dicts)
+	def append(self, items: list) -> None:
+		if not items: return
+		# Only look for a torn append if another process may have made one
+		if not self.exists() or os.path.getsize(self.path) != self._end: self._truncate_torn()
+		with open(self.path, "ab") as f:
+			for i in range(0, len(items), self.FRAME_ROWS):
+				lines = "".join(
+					json.dumps(
+						{col: Archive._value(item.get(col)) for col in ItemHandler._columns},
+						default=ItemHandler._encode
+					) + "\n"
+					for item in items[i:i + self.FRAME_ROWS]
+				)
+				data = gzip.compress(lines.encode())
+				f.write(len(data).to_bytes(8, "little") + data)
+				METRICS.count(f"bytes_written[{self.path}]", 8 + len(data))
+			f.flush()
+			os.fsync(f.fileno())
+			self._end = f.tell()
+	
+	# Size of the archive, dropping a torn append at its end first if another
+	# process may have left one. Call holding the items' lock
+	def size(self) -> int:
+		if not self.exists(): return 0
+		if os.path.getsize(self.path) != self._end: self._truncate_torn()
+		self._end = os.path.getsize(self.path)
+		return self._end
+	
+	# None for missing values (NaN and NaT aren't equal to themselves)
+	@staticmethod
+	def _value(val):
+		return None if val is None or val != val else val
+	
+	# Drops a torn append left by a crash, which would hide anything after it
+	def _truncate_torn(self) -> None:
+		if not self.exists(): return
+		with open(self.path, "r+b") as f:
+			size = f.seek(0, os.SEEK_END)
+			end = 0
+			while end + 8 <= size:
+				f.seek(end)
+				length = int.from_bytes(f.read(8), "little")
+				if end + 8 + length > size: break
+				end += 8 + length
+			if end != size: f.truncate(end)
+	
+	# Yields archived items as dicts, in the order they were archived
+	def records(self):
+		for _, items in self.frames():
+			yield from items
+	
+	# Yields the items (dicts) of each frame from the given offset, with the
+	# offset of the frame's end
+	def frames(self, start: int = 0):
+		if not self.exists(): return
+		with open(self.path, "rb") as f:
+			f.seek(start)
+			while True:
+				header = f.read(8)
+				if len(header) < 8: return
+				length = int.from_bytes(header, "little")
+				data = f.read(length)
+				if len(data) < length: return # Torn append from a crash
+				# Parsed as one JSON array, which is much faster than line by line
+				lines = gzip.decompress(data).decode()
+				yield f.tell(), json.loads("[" + lines.rstrip("\n").replace("\n", ",") + "]")
+	
+	# Counts of archived items by week created and week completed (see
+	# ItemHandler.stats), as {"created": {week: count}, "completed": ...}
+	# Kept in path + ".summary" (written through save if given, so Stats
+	# doesn't wait on the disk) and in memory, along with the size of the
+	# archive it counted, so only items archived since are read. An append
+	# still being made is left for the next call, as frames stops at it like
+	# at a torn one. Rebuilt if the archive shrank (e.g. it was replaced)
+	def summary(self) -> dict:
+		size = os.path.getsize(self.path) if self.exists() else 0
+		summary = self._summary
+		if summary is None or summary["end"] > size: summary = self._read_summary(size)
+		if summary["end"] < size:
+			end, created, completed = summary["end"], dict(summary["created"]), dict(summary["completed"])
+			for end, items in self.frames(end):
+				for item in items:
+					week = Archive.week(item["creation_date"])
+					created[week] = created.get(week, 0) + 1
+					if item["completion_date"] is None: continue
+					week = Archive.week(item["completion_date"])
+					completed[week] = completed.get(week, 0) + 1
+			if end != summary["end"]:
+				summary = {"end": end, "created": created, "completed": completed}
+				if self._save is not None: self._save([("summary", summary)])
+				else: self.write_summary(summary)
+		self._summary = summary
+		return summary
+	
+	# The summary kept in path + ".summary", if it counted at most size bytes
+	def _read_summary(self, size: int) -> dict:
+		path = self.path + ".summary"
+		if os.path.exists(path):
+			with open(path) as f:
+				cached = json.load(f)
+			if cached["end"] <= size:
+				return {
+					"end"      : cached["end"],
+					"created"  : {int(week): count for week, count in cached["created"  ].items()},
+					"completed": {int(week): count for week, count in cached["completed"].items()},
+				}
+		return {"end": 0, "created": dict(), "completed": dict()}
+	
+	# Atomically replaces path + ".summary"
+	def write_summary(self, summary: dict) -> None:
+		path = self.path + ".summary"
+		with open(path + ".tmp", "w") as f:
+			json.dump(summary, f)
+		os.replace(path + ".tmp", path)
+	
+	# Week of an ISO date, as weeks (starting on Mondays) since the epoch
+	@staticmethod
+	def week(date: str) -> int:
+		return ((datetime.date.fromisoformat(date[:10]) - ItemHandler._epoch.date()).days + 3) // 7
+	
+	# Yields archived items as typed dataframes of up to chunk_size rows
+	def chunks(self, chunk_size: int = 10000):
+		records = self.records()
+		while True:
+			chunk = list(itertools.islice(records, chunk_size))
+			if not chunk: return
+			yield ItemHandler._typed(pd.DataFrame(chunk, columns=list(ItemHandler._columns)))
+	
+	# Returns those of the (name, creation date) keys that are archived in
+	# frames from the given offset (the end of an append, see size)
+	def find(self, keys: set, start: int = 0) -> set:
+		found = set()
+		for _, items in self.frames(start):
+			for item in items:
+				key = (item["name"], pd.Timestamp(item["creation_date"]))
+				if key in keys: found.add(key)
+		return found
+
+# Saves an ItemHandler's changes on a background thread, so callers (like the
+# GUI's event handlers) never wait on the disk. Operations (see
+# ItemHandler._save) are written in the order they were submitted, once none
+# have come for delay seconds (or the first has waited 4 times that), so a
+# burst of changes is saved together (see coalesce)
+# An operation that fails is reported through the handler's on_error (or
+# printed), and retried, with those after it, along with the next ones
+class Writer:
+	def __init__(self, handler: "ItemHandler", delay: float):
+		self.handler  = handler
+		self.delay    = delay
+		self.pending  = list()  # Operations not yet written
+		self.failed   = list()  # Operations that failed, written before pending
+		self.error    = None    # Last exception writing failed with
+		self.first    = None    # When the oldest pending operation came
+		self.last     = None    # When the newest pending operation came
+		self.busy     = False   # Whether operations are being written
+		self.flushing = False   # Whether to write without waiting for more
+		self.closed   = False
+		self.thread   = None
+		self.cond     = threading.Condition()
+	
+	def submit(self, ops: list) -> None:
+		with self.cond:
+			self.last = time.monotonic()
+			if not self.pending: self.first = self.last
+			self.pending.extend(ops)
+			if self.thread is None:
+				self.thread = threading.Thread(target=self.run, daemon=True)
+				self.thread.start()
+			self.cond.notify_all()
+	
+	def run(self) -> None:
+		while True:
+			with self.cond:
+				while not self.pending and not self.closed:
+					self.cond.wait()
+				while self.pending and not (self.flushing or self.closed):
+					wait = min(self.last + self.delay, self.first + 4 * self.delay) - time.monotonic()
+					if wait <= 0: break
+					self.cond.wait(wait)
+				if not self.pending and self.closed: return
+				ops = self.coalesce(self.failed + self.pending)
+				self.failed, self.pending = list(), list()
+				self.busy = True
+			ops, error = self.write(ops)
+			with self.cond:
+				self.failed = ops
+				self.error = error
+				self.busy = False
+				self.cond.notify_all()
+			if error is not None: self.report(error)
+	
+	# Writes operations in order, until one fails
+	# Returns those left unwritten, and the error
+	def write(self, ops: list) -> tuple:
+		for i, (kind, data) in enumerate(ops):
+			try:
+				with self.handler.lock:
+					self.handler._write(kind, data)
+			except Exception as e:
+				return ops[i:], e
+		return list(), None
+	
+	# Whether every operation submitted has been written
+	def idle(self) -> bool:
+		with self.cond:
+			return not (self.pending or self.failed or self.busy)
+	
+	def report(self, error: Exception) -> None:
+		if self.handler.on_error is not None: self.handler.on_error(error)
+		else: print(f"Couldn't save changes, will retry: {error!r}", file=sys.stderr)
+	
+	# Writes pending operations (and retries failed ones) now, and waits for them
+	# Raises the error writing failed with, if it did
+	def flush(self) -> None:
+		with self.cond:
+			if self.failed and not self.pending:
+				self.pending, self.failed = self.failed, list()
+			if self.pending:
+				self.flushing = True
+				self.cond.notify_all()
+				while self.pending or self.busy:
+					self.cond.wait()
+				self.flushing = False
+			while self.busy:
+				self.cond.wait()
+			if self.failed: raise self.error
+	
+	# Writes pending operations and stops the thread, then retries any that
+	# failed. Raises the error writing failed with, if it does again
+	def close(self) -> None:
+		with self.cond:
+			self.closed = True
+			self.cond.notify_all()
+		if self.thread is not None: self.thread.join()
+		if self.failed:
+			self.failed, self.error = self.write(self.failed)
+			if self.failed: raise self.error
+	
+	# Joins consecutive journal writes into one (one fsync), and drops
+	# snapshots followed by another with no archive write in between, and
+	# rejections or summaries followed by another
+	@staticmethod
+	def coalesce(ops: list) -> list:
+		out = list()
+		for kind, data in ops:
+			if kind in ("rejections", "summary"): out = [op for op in out if op[0] != kind]
+			if kind == "journal" and out and out[-1][0] == "journal":
+				out[-1] = ("journal", out[-1][1] + data)
+				continue
+			if kind == "snapshot":
+				i = len(out)
+				while i > 0 and out[i - 1][0] != "archive": i -= 1
+				out[i:] = [op for op in out[i:] if op[0] != "snapshot"]
+			out.append((kind, data))
+		return out
+
+@instrumented
+class ItemHandler:
+	_columns: dict = {
+		# On creation
+		"name": str,
+		"description": str,
+		"length": str,
+		"reviewable": bool,
+		"in_progress": bool,
+		"priority": str,
+		"urgency": str,
+		"enjoyability": str,
+		"complete": bool,
+		"creation_date": "datetime64[ns]",
+		# After creation
+		"start_date": "datetime64[ns]",
+		"deadline": "datetime64[ns]",
+		# On completion
+		"completion_date": "datetime64[ns]",
+	}
+	
+	# Options for combo boxes, as well as useful information for them
+	_cboptions: dict = {
+		"length": {
+			"< 1 hr"         : {"color": "red"},
+			"1 hr - 1 day"   : {"color": "indian red"},
+			"1 day"          : {"color": "orange"},
+			"1 day - 1 wk"   : {"color": "gold"},
+			"1 wk"           : {"color": "lime green"},
+			"1 wk - 1 mth"   : {"color": "green"},
+			"Several months" : {"color": "black"},
+			"<= 1 year"      : {"color": "gray"},
+			"Several years"  : {"color": "light gray"},
+		},
+		
+		"priority": {
+			"Very High" : {"color": "red"},
+			"High"      : {"color": "orange"},
+			"Medium"    : {"color": "lime green"},
+			"Low"       : {"color": "black"},
+			"Very Low"  : {"color": "gray"},
+		},
+		
+		"urgency": {
+			"ASAP"          : {"color": "red"},
+			"Soon"          : {"color": "orange"},
+			"When ready"    : {"color": "lime green"},
+			"In the future" : {"color": "black"},
+			"Whenever"      : {"color": "gray"},
+		},
+		
+		"enjoyability": {
+			"Fun"    : {"color": "red"},
+			"Okay"   : {"color": "lime green"},
+			"Boring" : {"color": "gray"},
+		}
+	}
+	
+	# col: {category: code}, codes follow the order of _cboptions
+	_codes: dict = {
+		col: {cat: code for code, cat in enumerate(opts)}
+		for col, opts in _cboptions.items()
+	}
+	
+	# Stores all items that aren't complete, see the items property
+	_items      : DataFrame
+	_appended   : dict # Index label: typed one-row dataframe, of rows not yet in _items
+	_next_label : int  # Index label for the next row added
+	APPEND_ROWS : int = 256 # Most rows held in _appended
+	FEW_ROWS    : int = 16  # Most rows add_items appends one at a time
+	
+	# Stores completed items, which move there when they're completed
+	archive    : Archive
+	_archiving : list # Completed items, archived once their journal records are written
+	
+	# Where snapshots of items are kept
+	storage: Storage
+	
+	# Journaling: mutations are appended to JOURNAL_FILE instead of rewriting
+	# the snapshot, which is only rewritten on compaction
+	journaled      : bool
+	_journal       = None # Open journal file
+	_journal_lock  : threading.Lock
+	_journal_bytes : int = 0 # Written to the journal since the last snapshot
+	# Archive size when the journal was started, which its first record (a
+	# "snapshot" one) holds. Items completed in the journal were archived
+	# after it, so only frames from there are searched for them on load
+	_archive_start : int = None
+	
+	# Saves changes in the background, None if they're saved as they're made
+	_writer  : "Writer" = None
+	on_error = None # Called with exceptions the writer raises, from its thread
+	
+	# Other processes may share the files (see sync). Changes are written
+	# holding lock, and snapshots only if the files are as last read or
+	# written here, so their changes are never overwritten
+	lock           : FileLock
+	_snapshot_sig  : tuple = None # _stat of the snapshot
+	_journal_end   : int   = 0    # Journal bytes read or written here
+	_foreign       : list         # (start, end) of journal bytes written by others
+	_touched       : set          # Keys (see _record_key) of items changed since sync
+	
+	# Incomplete items bucketed by category, for choosing
+	sampler: "ItemSampler"
+	
+	# Index labels of incomplete items by name (which are unique)
+	_names: dict
+	
+	_batch: list = None # Journal records held back by batch()
+	
+	# Columns the View tab sorts by. Sorted orders of incomplete items are
+	# cached per column as col: (sort keys, index labels), both ascending,
+	# and patched on every change. items itself is never reordered
+	_sort_cols  : list = [
+		"name", "length", "priority", "urgency",
+		"enjoyability", "creation_date", "in_progress"
+	]
+	_sort_cache : dict
+	
+	_search : SearchIndex = None # Built by the first search, then kept up to date with the sorted orders
+	
+	_predicates : dict # Compiled filters, see query
+	PREDICATES  : int = 64 # Most compiled filters kept, the least recently used are dropped
+	
+	rejections : "Rejections" # Tasks skipped in Choose, see recommend
+	_draws     : tuple = None # (query, Draws) of the latest draw, see draw
+	
+	_epoch : datetime.datetime = datetime.datetime(1970, 1, 1) # See _encode_val
+	# Dates nanoseconds since _epoch can hold (in an int64, as datetime64[ns]
+	# does), a day in from either end so a UTC offset can't push one out
+	_date_range : tuple = (datetime.datetime(1677, 9, 23), datetime.datetime(2262, 4, 10))
+	
+	def __init__(self, journaled: bool = True, storage: Storage = None, delay: float = PERSIST_DELAY):
+		self.storage = storage if storage is not None else STORAGE_FORMATS[ITEMS_FORMAT]()
+		self.journaled = journaled
+		if delay is not None: self._writer = Writer(self, delay)
+		self.lock = FileLock.shared()
+		self._foreign = list()
+		self._touched = set()
+		self.archive = Archive(save=self._save)
+		self._archiving = list()
+		self._journal_lock = threading.Lock()
+		self.sampler = ItemSampler()
+		self._names = dict()
+		self._sort_cache = dict()
+		self._predicates = dict()
+		self._appended = dict()
+		self.rejections = Rejections(save=self._save)
+	
+	# The items dataframe. Rows added one at a time are typed on their own
+	# and held back until the whole frame is next needed (or there are
+	# APPEND_ROWS of them), so adding a row doesn't copy the frame
+	@property
+	def items(self) -> DataFrame:
+		self._merge_appended()
+		return self._items
+	
+	@items.setter
+	def items(self, items: DataFrame) -> None:
+		self._items = items
+		self._appended.clear()
+		self._next_label = int(items.index.max()) + 1 if len(items) else 0
+	
+	def _merge_appended(self) -> None:
+		if self._appended:
+			self._items = pd.concat([self._items, *self._appended.values()])
+			self._appended.clear()
+	
+	# Adds a row to the data frame, or to the archive if it's complete
+	def add_item(self, item: dict):
+		if item["complete"]:
+			self._archiving.append(item)
+			self.commit({"op": "add", "item": item})
+			return
+		self._append(item)
+		self.commit({"op": "add", "item": item})
+	
+	# Adds an incomplete item's row, without committing it
+	def _append(self, item: dict) -> None:
+		if len(self._appended) >= self.APPEND_ROWS: self._merge_appended()
+		label = self._next_label
+		self._next_label += 1
+		self._appended[label] = self._typed_row(item, label)
+		self._names[item["name"]] = label
+		self.sampler.add(item)
+		self._sort_insert(label, item)
+		
+	# Adds many rows with one concat, after validating them all together
+	# A few (like one from Server) are appended one at a time instead, which
+	# doesn't copy the frame
+	# Raises ValueError, adding nothing, if any are invalid (see _validate_new_items)
+	# Returns the number of rows added
+	def add_items(self, items) -> int:
+		items = self._validate_new_items(items)
+		if not items: return 0
+		incomplete = [item for item in items if not item["complete"]]
+		self._archiving.extend(item for item in items if item["complete"])
+		if len(incomplete) <= self.FEW_ROWS:
+			for item in incomplete: self._append(item)
+		elif incomplete:
+			start = self._next_label
+			labels = range(start, start + len(incomplete))
+			new = pd.DataFrame(incomplete, index=labels, columns=list(self._columns))
+			self.items = pd.concat([self.items, ItemHandler._typed(new)])
+			for label, item in zip(labels, incomplete):
+				self._names[item["name"]] = label
+				self.sampler.add(item)
+				if self._search is not None: self._search.add(label, item["name"], item["description"])
+			self._sort_cache.clear()
+		self.commit(*({"op": "add", "item": item} for item in items))
+		return len(items)
+	
+	# Fills in defaults for new items, and checks that their names are given
+	# and unique among incomplete items, and that their categories exist
+	# Dates are parsed (see local_date) here too, so none fails once some
+	# of the items have been added
+	# Returns the items as dicts, raises ValueError listing any problems
+	def _validate_new_items(self, items) -> list:
+		defaults = {
+			"description": "", "reviewable": False, "in_progress": False,
+			"complete": False, "creation_date": datetime.datetime.now(),
+		}
+		items = [{**defaults, **item} for item in items]
+		errors = list()
+		names = set()
+		for i, item in enumerate(items):
+			name = item.get("name", "")
+			if str(name).strip() == "":
+				errors.append(f"Item {i + 1} has no name")
+			elif not item["complete"]:
+				if name in names or self.get_incomplete_item(name) is not None:
+					errors.append(f"Item {i + 1}: name {name!r} already exists for another uncompleted task")
+				names.add(name)
+			for col, codes in self._codes.items():
+				if item.get(col) not in codes:
+					errors.append(f"Item {i + 1}: {col} {item.get(col)!r} isn't one of {list(codes)}")
+			for col, kind in self._columns.items():
+				if kind != "datetime64[ns]" or col not in item: continue
+				try:
+					item[col] = self.local_date(item[col])
+					if item[col] is None and col == "creation_date": raise ValueError
+				except ValueError:
+					errors.append(f"Item {i + 1}: {col} {item[col]!r} isn't an ISO date{'' if col == 'creation_date' else ' or None'}")
+		if len(errors) > 10: errors[10:] = [f"... and {len(errors) - 10} more"]
+		if errors: raise ValueError("\n".join(errors))
+		return items
+	
+	# Checks the values update_incomplete_item is given against their columns'
+	# types, before any index is changed, so an invalid update changes nothing
+	# Dates must be naive (local time), like the ones the columns hold
+	# Raises ValueError listing any problems
+	@classmethod
+	def _validate_update(cls, cols: dict) -> None:
+		errors = list()
+		for col, val in cols.items():
+			kind = cls._columns.get(col)
+			if   kind is None          : valid, expected = False, f"a column, only {list(cls._columns)}"
+			elif col in cls._codes     : valid, expected = isinstance(val, str) and val in cls._codes[col], f"one of {list(cls._codes[col])}"
+			elif col == "name"         : valid, expected = isinstance(val, str) and val.strip() != "", "a name"
+			elif kind is str           : valid, expected = isinstance(val, str), "text"
+			elif kind is bool          : valid, expected = isinstance(val, bool) or getattr(val, "dtype", None) == bool, "true or false"
+			elif col == "creation_date": valid, expected = isinstance(val, datetime.datetime) and val == val and val.tzinfo is None, "a local date"
+			else                       : valid, expected = val is None or isinstance(val, datetime.datetime) and val.tzinfo is None, "a local date or None"
+			if not valid: errors.append(f"{col} {val!r} isn't {expected}")
+		if errors: raise ValueError("\n".join(errors))
+	
+	# Adds the items in a CSV or JSON lines file (by extension), chunk_size
+	# rows at a time so the file is never read all at once
+	# Returns the number of rows added, stopping at the first invalid chunk
+	def import_items(self, path: str, chunk_size: int = 1000) -> int:
+		if path.endswith(".csv"):
+			chunks = (
+				[{k: v for k, v in row.items() if not pd.isna(v)} for row in chunk.to_dict("records")]
+				for chunk in pd.read_csv(path, chunksize=chunk_size)
+			)
+		else:
+			def read_chunks():
+				with open(path) as f:
+					lines = (json.loads(line) for line in f if line.strip())
+					while True:
+						chunk = list(itertools.islice(lines, chunk_size))
+						if not chunk: return
+						yield chunk
+			chunks = read_chunks()
+		return sum(self.add_items(chunk) for chunk in chunks)
+	
+	# Holds back journal writes made inside the with block, then writes them
+	# all with a single fsync
+	@contextlib.contextmanager
+	def batch(self):
+		outer = self._batch is None
+		if outer: self._batch = list()
+		try:
+			yield self
+		finally:
+			if outer:
+				records, self._batch = self._batch, None
+				if records: self.commit(*records)
+	
+	# Removes an item that's not completed
+	def delete_incomplete_item(self, name: str) -> None:
+		item = self.get_incomplete_item(name)
+		if item is None: return
+		
+		self._sort_remove(item.name, item)
+		self.items.drop(item.name, inplace=True)
+		del self._names[name]
+		self.sampler.remove(name)
+		self.commit({"op": "delete", "name": name, "created": item["creation_date"]})
+		
+	# Updates the columns values for the incomplete item's row in dataframe
+	# with the given name, using a col:val dictionary
+	# Completing the item moves it to the archive
+	# Returns False if new name is taken, and fails to update
+	# Raises ValueError, updating nothing, if a value is invalid (see _validate_update)
+	def update_incomplete_item(self, name: str, cols: dict):
+		self._validate_update(cols)
+		df = self.items
+		
+		name_changed = "name" in cols.keys() and cols["name"] != name
+		# Check if name already exists
+		if name_changed:
+			name_taken = cols["name"] in self._names
+			if name_taken: return False
+		
+		cols = self._dated(cols)
+		row_idx = self._names[name]
+		old = df.loc[row_idx].copy()
+		# Sets the values before any index is changed, putting the old ones
+		# back if pandas rejects one, so a failed update changes nothing
+		try:
+			for col, val in cols.items():
+				df.at[row_idx, col] = val
+		except BaseException:
+			for col in cols: df.at[row_idx, col] = old[col]
+			raise
+		del self._names[name]
+		created = old["creation_date"]
+		self._sort_remove(row_idx, old)
+		self.sampler.remove(name)
+		item = self.items.loc[row_idx]
+		if item["complete"]:
+			self._archiving.append(item.to_dict())
+			self.items.drop(row_idx, inplace=True)
+		else:
+			self._names[item["name"]] = row_idx
+			self.sampler.add(item)
+			self._sort_insert(row_idx, item)
+		self.commit({"op": "update", "name": name, "created": created, "cols": cols})
+		return True
+	
+	# Adds the completion date to updated columns that complete an item
+	@staticmethod
+	def _dated(cols: dict) -> dict:
+		if cols.get("complete") and "completion_date" not in cols:
+			cols = {**cols, "completion_date": datetime.datetime.now()}
+		return cols
+	
+	# Persists mutations, either as journal records or by exporting, then
+	# archives items they completed. If a crash comes in between, loading
+	# finds the completed items in the journal and archives them then
+	# (unjournaled, they're archived first, so they can't be lost)
+	def commit(self, *records: dict) -> None:
+		if self._batch is not None:
+			self._batch.extend(records)
+			return
+		archived, self._archiving = self._archiving, list()
+		if not self.journaled:
+			self._save([("archive", archived), ("snapshot", self._snapshot())])
+			return
+		self._touched.update(self._record_key(record) for record in records)
+		lines = "".join(json.dumps(record, default=ItemHandler._encode) + "\n" for record in records)
+		self._save([("journal", lines), ("archive", archived)])
+		self._journal_bytes += len(lines)
+		if self._journal_bytes > JOURNAL_LIMIT: self.compact()
+	
+	# Saves operations: ("journal", lines), ("archive", items), ("snapshot",
+	# what storage writes), ("rejections", weights) or ("summary", archive
+	# summary), in the background if there's a writer
+	def _save(self, ops: list) -> None:
+		ops = [(kind, data) for kind, data in ops if kind != "archive" or data]
+		if self._writer is not None: self._writer.submit(ops)
+		else:
+			with self.lock:
+				for kind, data in ops: self._write(kind, data)
+	
+	# Writes an operation from _save, holding lock. Runs on the writer's thread
+	def _write(self, kind: str, data) -> None:
+		with METRICS.span(f"ItemHandler._write[{kind}]"):
+			self._write_op(kind, data)
+	
+	def _write_op(self, kind: str, data) -> None:
+		if kind == "journal":
+			with self._journal_lock:
+				# Another process appended records since, so they're merged by sync
+				size = os.fstat(self._journal.fileno()).st_size
+				if size > self._journal_end: self._foreign.append((self._journal_end, size))
+				self._journal.write(data)
+				self._journal.flush()
+				os.fsync(self._journal.fileno())
+				METRICS.count(f"bytes_written[{JOURNAL_FILE}]", len(data))
+				self._journal_end = os.fstat(self._journal.fileno()).st_size
+		elif kind == "archive":
+			self.archive.append(data)
+		elif kind == "rejections":
+			self.rejections.write(data)
+		elif kind == "summary":
+			self.archive.write_summary(data)
+		else:
+			self._export(data)
+	
+	# Copy of what storage writes, safe to write from another thread
+	def _snapshot(self) -> DataFrame:
+		return self.items.copy()
+	
+	# Waits for changes to be saved. Raises the writer's error if they can't be
+	def flush(self) -> None:
+		if self._writer is not None: self._writer.flush()
+	
+	# JSON encoder for values json can't handle (timestamps, numpy scalars)
+	@staticmethod
+	def _encode(val):
+		if isinstance(val, datetime.datetime): return val.isoformat()
+		if hasattr(val, "item"): return val.item()
+		return str(val)
+	
+	# Writes the items dataframe to storage, emptying the journal
+	# Overwrites changes other processes made since the items were read
+	def export_items(self) -> None:
+		self.flush()
+		self._export(self._snapshot(), force=True)
+	
+	# Writes a snapshot, unless (without force) another process changed the
+	# files since. Then, journaled, it's left to be written once sync merges
+	# their changes (the journal has these), and otherwise it's an error
+	def _export(self, snapshot, force: bool = False) -> None:
+		with self.lock, self._journal_lock:
+			if not force and self._changed_elsewhere():
+				if self.journaled: return
+				raise RuntimeError(f"Another process changed {self.storage.path}, reopen to see its changes (yours can't be saved)")
+			self.storage.write(snapshot)
+			self._snapshot_sig = self._stat(self.storage.path)
+			if self.journaled:
+				if self._journal is not None: self._journal.close()
+				self._journal = open(JOURNAL_FILE, "w")
+				self._archive_start = self.archive.size()
+				self._journal.write(json.dumps({"op": "snapshot", "archive": self._archive_start}) + "\n")
+				self._journal.flush()
+				self._journal_end = os.fstat(self._journal.fileno()).st_size
+				self._foreign.clear()
+	
+	# Identifies a version of a file (None if there isn't one)
+	@staticmethod
+	def _stat(path: str):
+		try:
+			st = os.stat(path)
+		except FileNotFoundError:
+			return None
+		return st.st_ino, st.st_size, st.st_mtime_ns
+	
+	# Whether another process wrote the snapshot or journal since they were
+	# last read or written here. Call holding lock
+	def _changed_elsewhere(self) -> bool:
+		if self._stat(self.storage.path) != self._snapshot_sig: return True
+		if not self.journaled: return False
+		return bool(self._foreign) or self._journal_size() != self._journal_end
+	
+	def _journal_size(self) -> int:
+		return os.path.getsize(JOURNAL_FILE) if os.path.exists(JOURNAL_FILE) else 0
+	
+	# Files other processes change the items through, see sync
+	def watched_files(self) -> list:
+		return [self.storage.path, JOURNAL_FILE] if self.journaled else [self.storage.path]
+	
+	# Whether changes made here are still waiting to be saved (or failed to be)
+	def saving(self) -> bool:
+		return self._writer is not None and not self._writer.idle()
+	
+	# Merges the changes other processes made to the files since they were
+	# last read or written here. Only the journal records they appended are
+	# read, unless one of them wrote a snapshot, which is then read again
+	# Returns the names of items changed both here and there (since the last
+	# sync), which are read again so the order they were saved in decides,
+	# or None if there was nothing to merge, or saving() (call it later)
+	def sync(self):
+		if self.saving(): return None
+		with self.lock:
+			if not self._changed_elsewhere(): return None
+			if self._stat(self.storage.path) != self._snapshot_sig or not self.journaled:
+				before = {key: self._touched_row(*key) for key in self._touched}
+				self.load_items()
+				return sorted({name for (name, created), row in before.items() if self._touched_row(name, created) != row})
+			
+			# Records appended to the journal
+			size = self._journal_size()
+			ranges = self._foreign + [(self._journal_end, size)]
+			records = list()
+			with open(JOURNAL_FILE, "rb") as f:
+				for start, end in ranges:
+					f.seek(start)
+					for line in f.read(end - start).splitlines():
+						try:
+							records.append(json.loads(line))
+						except ValueError:
+							break # Torn write from a crash
+			# Both changed an item (or added one by the same name)
+			conflicts = set()
+			for record in records:
+				if record["op"] == "snapshot": continue
+				name, created = self._record_key(record)
+				item = self.get_incomplete_item(name)
+				if (name, created) in self._touched or (record["op"] == "add" and item is not None and item["creation_date"] != created):
+					conflicts.add(name)
+			if conflicts:
+				self.load_items()
+				return sorted(conflicts)
+			self._foreign.clear()
+			self._journal_end = size
+			self._touched.clear()
+			for record in records: self._apply_record(record)
+			self._archive_completed(self._archive_start or 0)
+			self._rebuild_indexes()
+			if size > JOURNAL_LIMIT: self.compact()
+			return list()
+	
+	# An incomplete item as a dict, or None if there isn't one with the given
+	# name and creation date
+	def _touched_row(self, name: str, created):
+		item = self.get_incomplete_item(name)
+		if item is None or item["creation_date"] != created: return None
+		return item.to_dict()
+	
+	# Replaces all items, archived ones included, with those in a CSV file
+	def import_csv(self, path: str) -> None:
+		self.flush()
+		self.items = CSVStorage(path).read()
+		self.set_item_dtypes()
+		if self.archive.exists(): os.remove(self.archive.path)
+		self._archive_completed()
+		self._rebuild_indexes()
+		self.export_items()
+	
+	# Writes all items, archived ones included, to a CSV file
+	# The archive is streamed rather than read all at once
+	def export_csv(self, path: str) -> None:
+		with open(path, "w", newline="") as f:
+			self.items.to_csv(f, index=False)
+			for chunk in self.history():
+				chunk.to_csv(f, index=False, header=False)
+	
+	# Writes items to a file in one of EXPORT_FORMATS (by default, the one
+	# its extension is for): the incomplete ones matching filters, sorted by
+	# order_by (as for query), then with history the matching completed ones.
+	# Items are read, filtered and written a chunk at a time, so nothing is
+	# held in memory but the chunk. Returns the number of items written
+	def export(self, path: str, fmt: str = None, filters: dict = None, columns: list = None,
+			order_by: list = None, history: bool = True, chunk_size: int = 1000) -> int:
+		fmt = fmt or EXPORT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+		if fmt not in EXPORT_FORMATS: raise ValueError(f"Can't tell the format of {path!r}, use one of {sorted(EXPORT_FORMATS)}")
+		cols = list(columns or self._columns)
+		for col in cols:
+			if col not in self._columns: raise KeyError(col)
+		exporter = EXPORT_FORMATS[fmt]()
+		written = 0
+		with open(path, "w", encoding="utf-8", newline="") as f:
+			f.write(exporter.header(cols))
+			for items in self._export_chunks(dict(filters or ()), order_by, history, chunk_size):
+				f.write(exporter.rows(items, cols))
+				written += len(items)
+			f.write(exporter.footer())
+		METRICS.count("items_exported", written)
+		return written
+	
+	# Lists of plain items (see _plain) for export, filtering on complete
+	# choosing between incomplete and completed ones
+	def _export_chunks(self, filters: dict, order_by: list, history: bool, chunk_size: int):
+		complete = filters.pop("complete", None)
+		if not complete:
+			keys = self.query(filters, order_by)
+			for i in range(0, len(keys), chunk_size):
+				yield self._plain_items(list(keys[i:i + chunk_size]))
+		if history and complete is not False:
+			matches = self._record_filter(filters)
+			for items in self._history_records(chunk_size):
+				items = [item for item in items if matches(item)]
+				if items: yield items
+	
+	# Plain items of the given keys, read from the frame a chunk at once
+	# rather than a row at a time
+	def _plain_items(self, keys: list) -> list:
+		return [self._plain(item) for item in self.items.loc[keys].to_dict("records")]
+	
+	# Completed items as lists of up to chunk_size plain items, read from the
+	# archive a frame at a time
+	def _history_records(self, chunk_size: int):
+		self.flush()
+		records = self.archive.records()
+		while True:
+			chunk = list(itertools.islice(records, chunk_size))
+			if not chunk: return
+			yield chunk
+	
+	# Function telling whether a plain item matches filters (as for query),
+	# complete or not. Categories are compared by their codes
+	def _record_filter(self, filters: dict):
+		spec = self._filter_spec(filters)
+		terms = SearchIndex.tokenize(filters.get("search") or "")
+		def matches(item: dict) -> bool:
+			for col, lo, hi in spec:
+				val = self._encode_val(col, item[col])
+				if val is None: return False # Missing dates match no range
+				if lo is not None and val < lo: return False
+				if hi is not None and val > hi: return False
+			if terms:
+				words = SearchIndex.tokenize(f"{item['name']} {item['description']}")
+				return all(any(word.startswith(term) for word in words) for term in terms)
+			return True
+		return matches
+	
+	# Filter value (see query) of a column from text, e.g. a query string:
+	# a min..max range (either end may be empty) of categories, or a value
+	@staticmethod
+	def filter_value(col: str, val: str):
+		if ".." in val and col in ItemHandler._codes:
+			lo, hi = val.split("..", 1)
+			return (lo or None, hi or None)
+		if ItemHandler._columns[col] == bool: return val.lower() in ("1", "true", "yes")
+		if ItemHandler._columns[col] == "datetime64[ns]": return ItemHandler.local_date(val)
+		return val
+	
+	# A date (datetime or ISO string) as the columns hold it: naive, in local
+	# time, which one with a UTC offset is converted to. None if missing
+	# Raises ValueError if it's not a date, or not one the columns can hold
+	@staticmethod
+	def local_date(val):
+		if val is None or val != val: return None # NaN and NaT aren't equal to themselves
+		if isinstance(val, str): val = datetime.datetime.fromisoformat(val)
+		if not isinstance(val, datetime.datetime): raise ValueError(f"{val!r} isn't a date")
+		lo, hi = ItemHandler._date_range
+		if not lo <= val.replace(tzinfo=None) <= hi: raise ValueError(f"{val} isn't between {lo.year} and {hi.year}")
+		if val.tzinfo is not None: val = datetime.datetime.fromtimestamp(val.timestamp())
+		return val
+	
+	# An item (dataframe row, ItemView or dict) as a dict of JSON-compatible
+	# values: None for missing ones and ISO strings for dates, like the archive's
+	@staticmethod
+	def _plain(item) -> dict:
+		plain = dict()
+		for col in ItemHandler._columns:
+			val = Archive._value(item[col])
+			if   isinstance(val, datetime.datetime): val = val.isoformat()
+			elif hasattr(val, "item")             : val = val.item() # numpy scalars
+			plain[col] = val
+		return plain
+	
+	# Writes a new snapshot (in the background, if there's a writer), which
+	# empties the journal. It's written after every journal record before it,
+	# so it includes them all, and any written after it are replayed on it
+	def compact(self) -> None:
+		self._journal_bytes = 0
+		self._save([("snapshot", self._snapshot())])
+	
+	# Saves any changes waiting to be, and closes the journal
+	# Raises the writer's error if they can't be saved
+	def close(self) -> None:
+		if self._writer is not None: self._writer.close()
+		with self._journal_lock:
+			if self._journal is not None: self._journal.close()
+			self._journal = None
+
+	# Reads the items snapshot into the items dataframe, or creates a new one
+	# Replays the journal on top of it
+	def load_items(self) -> None:
+		with self.lock:
+			self._load_items()
+			self._touched.clear()
+			if self._journal is not None: self._journal_end = self._journal_bytes = os.fstat(self._journal.fileno()).st_size
+	
+	def _load_items(self) -> None:
+		created = not self.storage.exists()
+		# Read items file
+		stale = False
+		if not created:
+			self.items = self.storage.read()
+			if not self.storage.typed: self.set_item_dtypes()
+			# From before the archive, so it's rewritten without completed items
+			stale = bool((self.items["complete"] == True).any())
+		# Switching to another storage format, so convert the old CSV
+		elif os.path.exists(ITEMS_FILE):
+			self.items = CSVStorage(ITEMS_FILE).read()
+			self.set_item_dtypes()
+		# Create items file
+		else:
+			self.items = pd.DataFrame(columns = self._columns)
+			self.set_item_dtypes()
+		
+		# Records left by an interrupted compaction (from before it was done
+		# by the writer) come first
+		old = JOURNAL_FILE + ".old"
+		self._archive_start = None
+		if self.journaled:
+			self._index_names()
+			self.replay_journal(old)
+			self.replay_journal(JOURNAL_FILE)
+		self._archive_completed(0 if stale else self._archive_start or 0)
+		self._rebuild_indexes()
+		
+		# Only compacted when the journal is big, since other processes have
+		# to read a new snapshot whole, but only new journal records (see sync)
+		# Items completed in the journal are left in it, they're only looked
+		# for in the archive since it started. A journal from before it
+		# recorded that is compacted so it's never searched whole again
+		unmarked = self.journaled and self._archive_start is None
+		if created or stale or unmarked or os.path.exists(old) or self._journal_size() > JOURNAL_LIMIT:
+			self.export_items()
+			if os.path.exists(old): os.remove(old)
+		else:
+			self._snapshot_sig = self._stat(self.storage.path)
+			if self.journaled and self._journal is None: self._journal = open(JOURNAL_FILE, "a")
+	
+	# Moves completed items from the dataframe to the archive, skipping any
+	# already there (in frames from start). They're found here in snapshots
+	# from before the archive, and replayed from the journal, which keeps the
+	# records completing them after they're archived
+	# Returns the number of items moved
+	def _archive_completed(self, start: int = 0) -> int:
+		done = self.items["complete"] == True
+		if not done.any(): return 0
+		items = self.items[done].to_dict("records")
+		keys = {(item["name"], item["creation_date"]) for item in items}
+		found = self.archive.find(keys, start) if self.archive.exists() else set()
+		self.archive.append([item for item in items if (item["name"], item["creation_date"]) not in found])
+		self.items = self.items[~done]
+		return len(items)
+	
+	# Rebuilds everything derived from items after it's replaced
+	def _rebuild_indexes(self) -> None:
+		self._index_names()
+		self.sampler.rebuild(self.items)
+		self._sort_cache.clear()
+		self._search = None
+	
+	def _index_names(self) -> None:
+		incomplete = self.items.index[self.items["complete"] == False]
+		self._names = dict(zip(self.items.loc[incomplete, "name"], incomplete))
+	
+	# Applies each record in a journal file to the items dataframe
+	# A torn write from a crash (always the last line) is cut off, so records
+	# appended after it are read
+	# Returns the number of records read
+	def replay_journal(self, path: str) -> int:
+		if not os.path.exists(path): return 0
+		count = 0
+		end = 0
+		with open(path, "r+b") as f:
+			for line in f:
+				try:
+					if not line.endswith(b"\n"): raise ValueError
+					record = json.loads(line)
+				except ValueError:
+					break
+				self._apply_record(record)
+				count += 1
+				end += len(line)
+			f.truncate(end)
+		return count
+	
+	# Applies one journal record. Rows are matched on name and creation date,
+	# so records already folded into the snapshot (if a compaction was
+	# interrupted) match nothing and are skipped
+	# Rows are found through _names, which is kept up to date, so replaying
+	# doesn't scan (or, adding, copy) the dataframe
+	def _apply_record(self, record: dict) -> None:
+		if record["op"] == "snapshot":
+			start = record["archive"]
+			self._archive_start = start if self._archive_start is None else min(self._archive_start, start)
+			return
+		name, created = self._record_key(record)
+		key = self._names.get(name)
+		if key is not None and self.get_item(key)["creation_date"] != created: key = None
+		
+		if record["op"] == "add":
+			if key is None:
+				item = dict(record["item"], creation_date=created)
+				if len(self._appended) >= self.APPEND_ROWS: self._merge_appended()
+				label = self._next_label
+				self._next_label += 1
+				self._appended[label] = self._typed_row(item, label)
+				if not item.get("complete"): self._names[name] = label
+		elif key is None:
+			return
+		elif record["op"] == "delete":
+			if key in self._appended: del self._appended[key]
+			else: self._items.drop(key, inplace=True)
+			del self._names[name]
+		elif record["op"] == "update":
+			df = self._appended[key] if key in self._appended else self._items
+			for col, val in record["cols"].items():
+				if self._columns[col] == "datetime64[ns]" and val is not None: val = pd.Timestamp(val)
+				df.at[key, col] = val
+			if record["cols"].get("complete"): del self._names[name]
+			elif "name" in record["cols"]: self._names[record["cols"]["name"]] = self._names.pop(name)
+			
+	# Name and creation date of the item a journal record changes
+	@staticmethod
+	def _record_key(record: dict) -> tuple:
+		if record["op"] == "add": return record["item"]["name"], pd.Timestamp(record["item"]["creation_date"])
+		return record["name"], pd.Timestamp(record["created"])
+	
+	# Randomly picks the names of n incomplete items that aren't in progress,
+	# with categories in the given bounds (col: (min, max) category names)
+	# weights (col: list of weights per category) makes some categories likelier
+	def choose_items(self, bounds: dict, weights: dict = None, n: int = 1) -> list:
+		return self.sampler.sample(self._ranges(bounds), weights, n)
+	
+	# Names of the n best incomplete items (by weights, see
+	# RECOMMEND_WEIGHTS) that aren't in progress, with categories in the
+	# given bounds, as for choose_items. Best first
+	def recommend(self, bounds: dict, weights: dict = None, n: int = 1) -> list:
+		weights = weights or RECOMMEND_WEIGHTS
+		penalties = self.rejections.penalties() if weights.get("rejected") else dict()
+		names = self.sampler.rank(self._ranges(bounds), weights, n + len(penalties))
+		if not penalties: return names
+		return self._penalized([(name, self.sampler.cached(name)) for name in names], penalties, weights["rejected"], n)
+	
+	# Lowers the scores of (name, score) pairs by weight times their
+	# rejections' penalties, and returns the names of the best n. Penalties
+	# only lower scores, so the best n are among the best n + len(penalties)
+	@staticmethod
+	def _penalized(scored: list, penalties: dict, weight: float, n: int) -> list:
+		scored = sorted(scored, key=lambda pair: pair[1] - weight * penalties.get(pair[0], 0), reverse=True)
+		return [name for name, _ in scored[:n]]
+	
+	# Draws the name of an incomplete item that isn't in progress, with
+	# categories in the given bounds, without replacement: at random (by
+	# weights) as choose_items, or best first as recommend if optimal. Each
+	# call returns one not returned since the query last changed, and once
+	# they all were, starts over. Returns None if none match
+	# With due (see Schedule.FILTERS), only items due within it are drawn
+	# (see ItemHandler.due), and optimal draws the soonest due first
+	# The candidates are found once per query, then shuffled as they're
+	# drawn (see Draws). Items changed since are skipped if they no longer
+	# match, and items added since wait until the draws start over
+	def draw(self, bounds: dict, weights: dict = None, optimal: bool = False, due: datetime.timedelta = None):
+		query = (
+			tuple(sorted(bounds.items())),
+			tuple((col, tuple(ws)) for col, ws in sorted((weights or {}).items())),
+			optimal, due
+		)
+		if self._draws is None or self._draws[0] != query:
+			self._draws = (query, self._new_draws(bounds, weights, optimal, due))
+		for attempt in range(2):
+			for name in self._draws[1]:
+				if self._drawable(name, bounds, due): return name
+			if attempt == 0: self._draws = (query, self._new_draws(bounds, weights, optimal, due))
+		return None
+	
+	# As choose_items (or recommend, if optimal), but only of the items due
+	# within the given time (see due), soonest first if optimal, and without
+	# repeats
+	def choose_due(self, within: datetime.timedelta, bounds: dict, weights: dict = None, optimal: bool = False, n: int = 1) -> list:
+		return list(itertools.islice(self._new_draws(bounds, weights, optimal, within), n))
+	
+	def _new_draws(self, bounds: dict, weights: dict, optimal: bool, due: datetime.timedelta = None) -> "Draws":
+		if due is not None:
+			names = self.due(due, bounds)
+			if optimal: return Draws(names, ordered=True)
+			if not weights: return Draws(names)
+			return Draws(names, [ItemSampler.weight(ItemSampler.bucket_key(self.get_incomplete_item(name)), weights) for name in names])
+		names, name_weights = self._candidates(bounds, weights)
+		if optimal: return Draws(self.recommend(bounds, n=len(names)), ordered=True)
+		return Draws(names, name_weights)
+	
+	# Whether an item is still one draw would find
+	def _drawable(self, name: str, bounds: dict, due: datetime.timedelta = None) -> bool:
+		item = self.get_incomplete_item(name)
+		if item is None or item["in_progress"]: return False
+		if due is not None:
+			deadline = Schedule.time(item["deadline"])
+			if deadline is None or deadline > Schedule.now() + due.total_seconds(): return False
+		return all(
+			self._codes[col][lo] <= self._codes[col][item[col]] <= self._codes[col][hi]
+			for col, (lo, hi) in bounds.items()
+		)
+	
+	# Names of the incomplete items that aren't in progress, with categories
+	# in the given bounds (as for choose_items), whose deadlines are within
+	# the given time from now (zero for the overdue ones). Soonest first
+	# Read from the schedule's heap of deadlines, see Schedule.due
+	def due(self, within: datetime.timedelta, bounds: dict = None) -> list:
+		names = self.sampler.schedule.due(Schedule.now() + within.total_seconds())
+		ranges, where = self._ranges(bounds or dict()), self.sampler.where
+		return [
+			name for name in names
+			if not where[name][0][-1] and all(
+				ranges[col][0] <= code <= ranges[col][1]
+				for col, code in zip(ItemSampler._dims, where[name][0]) if col in ranges
+			)
+		]
+	
+	# Start dates and deadlines of incomplete items that passed since the
+	# last call (or since the items were loaded), up to until (by default,
+	# now), as (datetime, column, name) in order
+	def reminders(self, until: datetime.datetime = None) -> list:
+		until = Schedule.now() if until is None else Schedule.time(until)
+		return [
+			(self._epoch + datetime.timedelta(seconds=t), col, name)
+			for t, col, name in self.sampler.schedule.pop(until)
+		]
+	
+	# When the next start date or deadline reminders returns will pass, None
+	# if there are none
+	def next_reminder(self):
+		t = self.sampler.schedule.next()
+		return None if t is None else self._epoch + datetime.timedelta(seconds=t)
+	
+	# Number of items choose_items picks from, summed over the sampler's
+	# matching buckets rather than counting items
+	def count_candidates(self, bounds: dict) -> int:
+		buckets = self.sampler.buckets
+		return sum(len(buckets[key]) for key in self.sampler._keys(self._ranges(bounds)))
+	
+	# Names of the items choose_items picks from, and their weights (None
+	# if not weighted)
+	def _candidates(self, bounds: dict, weights: dict = None) -> tuple:
+		names, name_weights = list(), list()
+		for key in self.sampler._keys(self._ranges(bounds)):
+			bucket = self.sampler.buckets[key]
+			names += bucket
+			if weights: name_weights += [ItemSampler.weight(key, weights)] * len(bucket)
+		return names, (name_weights if weights else None)
+	
+	# Category bounds (col: (min, max) category names) as code ranges
+	def _ranges(self, bounds: dict) -> dict:
+		codes = self._codes
+		return {
+			col: (codes[col][lo], codes[col][hi])
+			for col, (lo, hi) in bounds.items()
+		}
+	
+	# Completed items, read from the archive as dataframes of up to chunk_size rows
+	def history(self, chunk_size: int = 10000):
+		self.flush()
+		return self.archive.chunks(chunk_size)
+	
+	# Counts completed items by month of completion ("unknown" for items
+	# completed before it was recorded), or by the given column
+	# Streams the archive's records, so it's never read all at once
+	def completions(self, by: str = "month") -> dict:
+		if by not in self._columns and by != "month": raise KeyError(by)
+		counts = dict.fromkeys(self._cboptions.get(by, ()), 0)
+		self.flush()
+		for item in self.archive.records():
+			if by == "month" : key = (item["completion_date"] or "unknown")[:7] # ISO dates start with YYYY-MM
+			else             : key = item[by]
+			counts[key] = counts.get(key, 0) + 1
+		return counts if by in self._cboptions else dict(sorted(counts.items()))
+	
+	# Shape of the backlog, as a dict of
+	#   open, in_progress   : numbers of incomplete items, and of those in progress
+	#   by                  : {col: {category: count}} of incomplete items, per _cboptions column
+	#   priority_by_urgency : {priority: {urgency: count}} of incomplete items
+	#   weeks               : {Monday's date: {"created": count, "completed": count}}, without gaps
+	#   age_days            : {percentile: age in days} of incomplete items
+	# Nothing is scanned: incomplete items are counted from the sampler's
+	# buckets, which (like its sorted creation dates) are kept up to date as
+	# items change, and archived ones when they're archived (see Archive.summary)
+	# Nothing waits for the writer either: items it's yet to archive are
+	# counted as archived once it has, by a later call
+	def stats(self, percentiles: tuple = (50, 90, 99, 100)) -> dict:
+		sampler = self.sampler
+		archived = self.archive.summary()
+		created = dict(archived["created"])
+		for week, count in sampler.weeks.items():
+			created[week] = created.get(week, 0) + count
+		return self._stats(
+			{key: len(bucket) for key, bucket in sampler.buckets.items()},
+			created, archived["completed"],
+			len(sampler.sorted_days), sampler.sorted_days.__getitem__, percentiles
+		)
+	
+	# Builds stats() from counts of incomplete items by sampler bucket key,
+	# counts by week (see Archive.week) of items created and completed, and
+	# the number of incomplete items with a function giving the i-th
+	# earliest creation date, in days since the epoch
+	def _stats(self, buckets: dict, created: dict, completed: dict, n: int, day_at, percentiles: tuple) -> dict:
+		dims = ItemSampler._dims
+		by = {col: dict.fromkeys(self._cboptions[col], 0) for col in dims}
+		cross = {priority: dict.fromkeys(self._cboptions["urgency"], 0) for priority in self._cboptions["priority"]}
+		names = {col: list(self._cboptions[col]) for col in dims}
+		in_progress = 0
+		for key, count in buckets.items():
+			if not count: continue
+			for col, code in zip(dims, key):
+				by[col][names[col][code]] += count
+			cross[names["priority"][key[dims.index("priority")]]][names["urgency"][key[dims.index("urgency")]]] += count
+			if key[-1]: in_progress += count
+		
+		weeks = dict()
+		known = [week for week, count in itertools.chain(created.items(), completed.items()) if count]
+		for week in range(min(known), max(known) + 1) if known else ():
+			monday = (self._epoch + datetime.timedelta(days=week * 7 - 3)).date().isoformat()
+			weeks[monday] = {"created": created.get(week, 0), "completed": completed.get(week, 0)}
+		
+		# Nearest rank: the p-th percentile age is the ceil(p * n / 100)-th
+		# youngest, i.e. created that many from the latest
+		today = (datetime.datetime.now() - self._epoch).total_seconds() / 86400
+		ages = {p: today - day_at(n - max(1, -(-p * n // 100))) for p in percentiles} if n else dict()
+		return {
+			"open"               : sum(buckets.values()),
+			"in_progress"        : in_progress,
+			"by"                 : by,
+			"priority_by_urgency": cross,
+			"weeks"              : weeks,
+			"age_days"           : ages,
+		}
+	
+	# Returns the row of the incomplete item with the given name, or None
+	def get_incomplete_item(self, name: str):
+		key = self._names.get(name)
+		return None if key is None else self.get_item(key)
+	
+	# Returns the row with the given index label, or None if it was deleted
+	# Runs per View row, so it isn't timed (see instrumented)
+	@untimed
+	def get_item(self, key):
+		if key in self._appended: return self._appended[key].loc[key]
+		return self._items.loc[key] if key in self._items.index else None
+	
+	# Index labels of incomplete items, sorted by the column then creation date
+	# Returns a view of the cached order (reversed if descending), not a copy
+	def sorted_keys(self, col: str, ascending: bool = True) -> "ListView":
+		if col not in self._sort_cache:
+			by = list(dict.fromkeys([col, "creation_date"]))
+			df = self.items
+			df = df.loc[df["complete"] == False, by]
+			df = df.sort_values(by=by, kind="mergesort")
+			created = df["creation_date"].values.astype("datetime64[ns]").astype("int64")
+			if   col in self._codes : vals = df[col].cat.codes
+			elif col == "creation_date" : vals = created
+			else                        : vals = df[col]
+			self._sort_cache[col] = (list(zip(vals.tolist(), created.tolist())), list(df.index))
+		return ListView(self._sort_cache[col][1], reverse=not ascending)
+	
+	# Index labels of incomplete items with a word starting with each word of
+	# the query (in their name or description), see SearchIndex
+	def search(self, query: str) -> set:
+		if self._search is None:
+			self._search = SearchIndex()
+			self._search.rebuild(self._search_texts())
+		return self._search.search(query)
+	
+	# (index label, name, description) of each incomplete item
+	def _search_texts(self):
+		df = self.items
+		df = df[df["complete"] == False]
+		return zip(df.index.tolist(), df["name"].tolist(), df["description"].tolist())
+	
+	# Keys of the incomplete items matching filters, in the order given by
+	# order_by, then by creation date. Only limit of them are returned,
+	# skipping the first offset, if given
+	# filters (col: filter) matches each column to a value or an inclusive
+	# (min, max) range, either end of which may be None (categories compare
+	# in their order), or "search" to a query, see search
+	# order_by lists columns (of _sort_cols), each prefixed with "-" to sort
+	# descending (sorting by only one reverses creation dates too)
+	# Returns a view of the cached order (or a list, with limit)
+	def query(self, filters: dict = None, order_by: list = None, limit: int = None, offset: int = 0):
+		keys = self._ordered(self._order_spec(order_by))
+		filters = filters or dict()
+		if filters.get("search"): keys = keys.filter(self.search(filters["search"]))
+		spec = self._filter_spec(filters)
+		if spec: keys = keys.filter(self._matching(spec))
+		if limit is None and not offset: return keys
+		return keys[offset:None if limit is None else offset + limit]
+	
+	# ((col, ascending), ...) of query's order_by
+	def _order_spec(self, order_by: list) -> tuple:
+		order = list()
+		for col in order_by or ["creation_date"]:
+			asc = not col.startswith("-")
+			col = col.lstrip("-")
+			if col not in self._sort_cols: raise ValueError(f"Can't sort by {col!r}")
+			order.append((col, asc))
+		return tuple(order)
+	
+	# Sorted order of incomplete items' keys. By more than one column, it's
+	# built from the single column orders, and cached (and patched) with them
+	def _ordered(self, order: tuple) -> ListView:
+		if len(order) == 1: return self.sorted_keys(*order[0])
+		if order not in self._sort_cache:
+			vals = dict()
+			for col, _ in order:
+				self.sorted_keys(col)
+				keys, labels = self._sort_cache[col]
+				vals[col] = dict(zip(labels, keys))
+			first = vals[order[0][0]]
+			rows = sorted(
+				(tuple(self._flip(vals[col][label][0], asc) for col, asc in order) + (key[1],), label)
+				for label, key in first.items()
+			)
+			self._sort_cache[order] = ([key for key, _ in rows], [label for _, label in rows])
+		return ListView(self._sort_cache[order][1])
+	
+	# Sort value ordering the other way: negated, or for strings the negated
+	# code points, then one, so a string still sorts apart from its prefixes
+	@staticmethod
+	def _flip(val, ascending: bool):
+		if ascending: return val
+		if isinstance(val, str): return tuple(-ord(c) for c in val) + (1,)
+		return -val
+	
+	# ((col, min, max), ...) of query's filters, as _encode_val values, sorted
+	# so equal filters compile once. Raises KeyError for unknown columns
+	def _filter_spec(self, filters: dict) -> tuple:
+		spec = list()
+		for col, val in filters.items():
+			if col == "search": continue
+			if col not in self._columns: raise KeyError(col)
+			lo, hi = val if isinstance(val, tuple) else (val, val)
+			spec.append((
+				col,
+				None if lo is None else self._encode_val(col, lo),
+				None if hi is None else self._encode_val(col, hi),
+			))
+		return tuple(sorted(spec))
+	
+	# Filters compiled by _compile, cached by spec. Specs hold the filtered
+	# values, so a server sees endless ones, and only the PREDICATES most
+	# recently used are kept (dicts keep insertion order, oldest first)
+	def _predicate(self, spec: tuple):
+		predicate = self._predicates.pop(spec, None)
+		if predicate is None:
+			predicate = self._compile(spec)
+			if len(self._predicates) >= self.PREDICATES: del self._predicates[next(iter(self._predicates))]
+		self._predicates[spec] = predicate
+		return predicate
+	
+	# Compiles a filter spec to a function giving a dataframe's matching rows
+	# as a boolean array. Categories are compared by their codes
+	def _compile(self, spec: tuple):
+		def matching(df):
+			mask = (df["complete"] == False).to_numpy()
+			for col, lo, hi in spec:
+				if   col in self._codes                    : vals = df[col].cat.codes.to_numpy()
+				elif self._columns[col] == "datetime64[ns]": vals = df[col].to_numpy().astype("datetime64[ns]").astype("int64")
+				else                                       : vals = df[col].to_numpy()
+				if lo is not None: mask = mask & (vals >= lo)
+				if hi is not None: mask = mask & (vals <= hi)
+			return mask
+		return matching
+	
+	# Keys of the incomplete items matching a filter spec
+	def _matching(self, spec: tuple) -> set:
+		df = self.items
+		return set(df.index[self._predicate(spec)(df)].tolist())
+	
+	# Key of an item (a dict or row) in the sorted order for col
+	def _sort_key(self, col: str, item) -> tuple:
+		created = pd.Timestamp(item["creation_date"]).value
+		if   col in self._codes : val = self._codes[col][item[col]]
+		elif col == "creation_date" : val = created
+		elif col == "in_progress"   : val = bool(item[col])
+		else                        : val = item[col]
+		return (val, created)
+	
+	# Key of an item in a cached sorted order, by a column or an _order_spec
+	def _cache_key(self, order, item) -> tuple:
+		if isinstance(order, str): return self._sort_key(order, item)
+		vals = [self._sort_key(col, item) for col, _ in order]
+		return tuple(self._flip(val, asc) for (val, _), (_, asc) in zip(vals, order)) + (vals[0][1],)
+	
+	# Adds an item to every cached sorted order (and the search index),
+	# unless it's complete
+	def _sort_insert(self, label, item) -> None:
+		if item["complete"]: return
+		if self._search is not None: self._search.add(label, item["name"], item["description"])
+		for col, (keys, labels) in self._sort_cache.items():
+			key = self._cache_key(col, item)
+			i = bisect_right(keys, key)
+			keys.insert(i, key)
+			labels.insert(i, label)
+	
+	# Removes an item from every cached sorted order (and the search index)
+	def _sort_remove(self, label, item) -> None:
+		if item["complete"]: return
+		if self._search is not None: self._search.remove(label)
+		for col, (keys, labels) in self._sort_cache.items():
+			i = bisect_left(keys, self._cache_key(col, item))
+			while labels[i] != label: i += 1
+			del keys[i]
+			del labels[i]
+	
+	# Plain value of an item's column: a category's code, an int for bools
+	# or nanoseconds since _epoch for dates (None if missing)
+	# Doesn't use pandas, so the command line doesn't have to import it
+	def _encode_val(self, col: str, val):
+		missing = val is None or val != val # NaN and NaT aren't equal to themselves
+		if col in self._codes: return self._codes[col][val]
+		if self._columns[col] == bool: return int(bool(val))
+		if self._columns[col] == str: return "" if missing else str(val)
+		if missing: return None
+		if isinstance(val, str): val = datetime.datetime.fromisoformat(val)
+		if hasattr(val, "value"): return val.value # pandas Timestamp
+		return (val - ItemHandler._epoch) // datetime.timedelta(microseconds=1) * 1000
+	
+	# Inverse of _encode_val, dates are decoded as datetimes
+	def _decode_val(self, col: str, val):
+		if   col in self._codes         : return list(self._cboptions[col])[val]
+		elif self._columns[col] == bool : return bool(val)
+		elif self._columns[col] == str  : return val
+		return None if val is None else self._epoch + datetime.timedelta(microseconds=val // 1000)
+	
+	# Set dtypes of items and convert to categoricals
+	# Only needed for whole frames read from files, rows added later are
+	# typed on their own (see _typed_row)
+	def set_item_dtypes(self) -> None:
+		self.items = ItemHandler._typed(self.items)
+	
+	@staticmethod
+	def _typed(items: DataFrame) -> DataFrame:
+		# Adds columns missing from files written before they existed
+		items = items.reindex(columns=list(ItemHandler._columns))
+		items["description"] = items["description"].fillna("")
+		items = items.astype(ItemHandler._columns)
+		# Convert to categoricals for sorting
+		for col in ["length", "priority", "urgency", "enjoyability"]:
+			items[col] = pd.Categorical(
+				items[col],
+				categories=list(ItemHandler._cboptions[col].keys()), ordered=True
+			)
+		return items
+	
+	# One-row dataframe of an item (a dict) in the dtypes of items, so it can
+	# be appended without converting the whole frame
+	def _typed_row(self, item: dict, label) -> DataFrame:
+		dtypes = self._items.dtypes
+		row = dict()
+		for col in self._columns:
+			val = item.get(col)
+			if val is None and self._columns[col] == str: val = ""
+			row[col] = pd.Series([val], index=[label], dtype=dtypes[col])
+		return pd.DataFrame(row)
+		
+# Read-only view of a list, optionally reversed, that doesn't copy it
+class ListView:
+	def __init__(self, data: list, reverse: bool = False):
+		self.data = data
+		self.reverse = reverse
+	
+	def __len__(self) -> int:
+		return len(self.data)
+	
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self[j] for j in range(*i.indices(len(self)))]
+		if i < 0: i += len(self.data)
+		if not 0 <= i < len(self.data): raise IndexError(i)
+		return self.data[len(self.data) - 1 - i] if self.reverse else self.data[i]
+	
+	# View of only the given keys (a set), in the same order
+	def filter(self, keys) -> ListView:
+		return ListView([key for key in self.data if key in keys], self.reverse)
+	
+# Keys of a query's results, fetched PAGE_ROWS at a time as they're indexed
+# fetch(offset, limit) returns a list of keys
+class PagedKeys:
+	def __init__(self, fetch, count: int):
+		self.fetch = fetch
+		self.count = count
+		self.pages = dict() # Page number: its keys
+	
+	def __len__(self) -> int:
+		return self.count
+	
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self[j] for j in range(*i.indices(len(self)))]
+		if i < 0: i += self.count
+		if not 0 <= i < self.count: raise IndexError(i)
+		page = i // PAGE_ROWS
+		if page not in self.pages: self.pages[page] = self.fetch(page * PAGE_ROWS, PAGE_ROWS)
+		return self.pages[page][i % PAGE_ROWS]
+	
+# Inverted index of incomplete items' names and descriptions, for search
+# Words are lowercased runs of letters and digits. Each word of a query
+# matches the start of a word, so items are found as the query is typed
+class SearchIndex:
+	def __init__(self):
+		self.postings = dict() # Word: keys of the items with it
+		self.words    = list() # Every word, sorted, to find those with a prefix
+		self.item_words = dict() # Key: the item's words
+	
+	WORD = re.compile(r"\w+")
+	
+	@staticmethod
+	def tokenize(text: str) -> set:
+		return set(SearchIndex.WORD.findall(text.lower()))
+	
+	# Indexes the given (key, name, description)s, replacing everything
+	def rebuild(self, items) -> None:
+		self.postings, self.item_words = dict(), dict()
+		postings = self.postings
+		for key, name, description in items:
+			words = self.item_words[key] = self.tokenize(f"{name} {description}")
+			for word in words:
+				keys = postings.get(word)
+				if keys is None: postings[word] = {key}
+				else: keys.add(key)
+		self.words = sorted(postings)
+	
+	def add(self, key, name: str, description: str) -> None:
+		words = self.item_words[key] = self.tokenize(f"{name} {description}")
+		for word in words:
+			if word not in self.postings:
+				self.postings[word] = set()
+				insort(self.words, word)
+			self.postings[word].add(key)
+	
+	def remove(self, key) -> None:
+		for word in self.item_words.pop(key, ()):
+			keys = self.postings[word]
+			keys.discard(key)
+			if not keys:
+				del self.postings[word]
+				del self.words[bisect_left(self.words, word)]
+	
+	# Keys of the items with a word starting with each word of the query
+	# Longer words are looked up first, since they usually match fewer items
+	def search(self, query: str) -> set:
+		found = None
+		for term in sorted(self.tokenize(query), key=len, reverse=True):
+			keys = set()
+			i = bisect_left(self.words, term)
+			while i < len(self.words) and self.words[i].startswith(term):
+				keys |= self.postings[self.words[i]]
+				i += 1
+			found = keys if found is None else found & keys
+			if not found: break
+		return found or set()
+	
+# Start dates and deadlines of incomplete items, for reminders and the due
+# filter of Choose, as seconds since ItemHandler._epoch. Kept in heaps, so
+# neither needs a scan: deadlines (for due) and dates yet to be reminded of
+# (for pop). Entries of items changed or removed since they were pushed are
+# skipped when met (their times no longer match dates), and dropped by
+# rebuilding the heaps once they outnumber the live ones
+class Schedule:
+	COLS: tuple = ("start_date", "deadline")
+	
+	# Due filters of Choose (see ItemHandler.due) by name
+	FILTERS: dict = {"soon": datetime.timedelta(days=DUE_SOON), "overdue": datetime.timedelta(0)}
+	
+	def __init__(self):
+		self.reminded = Schedule.now() # Dates up to this time aren't reminded of
+		self.clear()
+	
+	def clear(self) -> None:
+		self.dates     = {col: dict() for col in self.COLS} # Col: {name: time}
+		self.deadlines = list() # Heap of (deadline, name)
+		self.events    = list() # Heap of (time, col, name) after reminded
+	
+	@staticmethod
+	def now() -> float:
+		return (datetime.datetime.now() - ItemHandler._epoch).total_seconds()
+	
+	# A date (datetime, Timestamp or ISO string) as seconds since the epoch,
+	# None if missing
+	@staticmethod
+	def time(val):
+		val = Archive._value(val)
+		if val is None: return None
+		if isinstance(val, str): val = datetime.datetime.fromisoformat(val)
+		return (val - ItemHandler._epoch).total_seconds()
+	
+	def add(self, name: str, item) -> None:
+		for col in self.COLS:
+			t = self.time(item.get(col))
+			if t is None: continue
+			self.dates[col][name] = t
+			if col == "deadline": heapq.heappush(self.deadlines, (t, name))
+			if t > self.reminded: heapq.heappush(self.events, (t, col, name))
+		if len(self.deadlines) + len(self.events) > 2 * (len(self.dates["start_date"]) + 2 * len(self.dates["deadline"])) + 64:
+			self._compact()
+	
+	def remove(self, name: str) -> None:
+		for dates in self.dates.values(): dates.pop(name, None)
+	
+	# Replaces all dates with {col: {name: time}}
+	def rebuild(self, dates: dict) -> None:
+		self.dates = dates
+		self._compact()
+	
+	def _compact(self) -> None:
+		self.deadlines = [(t, name) for name, t in self.dates["deadline"].items()]
+		self.events = [(t, col, name) for col, dates in self.dates.items() for name, t in dates.items() if t > self.reminded]
+		heapq.heapify(self.deadlines)
+		heapq.heapify(self.events)
+	
+	# Names of the items with deadlines up to until, soonest first
+	# Walks only the part of the heap up to until (a subtree at its root),
+	# so it takes O(k log k) for k items found, however many there are
+	def due(self, until: float) -> list:
+		heap, deadlines = self.deadlines, self.dates["deadline"]
+		found, stack = dict(), [0] if heap else []
+		while stack:
+			i = stack.pop()
+			t, name = heap[i]
+			if t > until: continue
+			if deadlines.get(name) == t: found[name] = t
+			stack += [child for child in (2 * i + 1, 2 * i + 2) if child < len(heap)]
+		return sorted(found, key=found.get)
+	
+	# Removes and returns the (time, col, name) of dates after reminded, up
+	# to until, in order
+	def pop(self, until: float) -> list:
+		events = list()
+		while self.events and self.events[0][0] <= until:
+			event = heapq.heappop(self.events)
+			t, col, name = event
+			if self.dates[col].get(name) == t and (not events or events[-1] != event): events.append(event)
+		self.reminded = max(self.reminded, until)
+		return events
+	
+	# Time of the next date to be reminded of, None if there's none
+	def next(self):
+		events = self.events
+		while events and self.dates[events[0][1]].get(events[0][2]) != events[0][0]:
+			heapq.heappop(events)
+		return events[0][0] if events else None
+
+# Index of incomplete items' names, bucketed by (length, priority, urgency,
+# enjoyability, in_progress) so choosing only touches the matching buckets.
+# Drawing uses an alias table over the buckets, so it doesn't depend on the
+# number of items
+# Also keeps the aggregates ItemHandler.stats reads, and the Schedule of
+# start dates and deadlines, as items change
+class ItemSampler:
+	_dims: list = ["length", "priority", "urgency", "enjoyability"]
+	
+	def __init__(self):
+		self.schedule = Schedule()
+		self.clear()
+		
+	def clear(self) -> None:
+		self.schedule.clear()
+		self.buckets = dict() # Bucket key: list of names
+		self.where   = dict() # Name: (bucket key, position in bucket)
+		self.days    = dict() # Name: creation date, in days since the epoch
+		self.scores  = dict() # Bucket key: array of its names' scores (see rank)
+		self.utility = None   # Weights scores were computed with, None until needed
+		self._base   = dict() # Bucket key: score of its categories
+		self.weeks   = dict() # Week created (see Archive.week): count
+		self.sorted_days = list() # Values of days, ascending
+		self.version = 0      # Bumped on every change, invalidates _alias
+		self._alias  = None   # (query, version, bucket keys, prob, alias)
+	
+	# Indexes all incomplete items in the (typed) dataframe
+	def rebuild(self, items: DataFrame) -> None:
+		self.clear()
+		items = items[items["complete"] == False]
+		keys = zip(
+			*(items[col].cat.codes.tolist() for col in self._dims),
+			map(bool, items["in_progress"].tolist())
+		)
+		days = items["creation_date"].values.view("int64") / (86400 * 10 ** 9)
+		for name, key, day in zip(items["name"].tolist(), keys, days.tolist()):
+			bucket = self.buckets.setdefault(key, list())
+			self.where[name] = (key, len(bucket))
+			self.days[name] = day
+			bucket.append(name)
+		self.sorted_days = np.sort(days).tolist()
+		self.schedule.rebuild({
+			col: dict(zip(
+				items["name"][items[col].notna()].tolist(),
+				(items[col].dropna().values.view("int64") / 10 ** 9).tolist()
+			))
+			for col in Schedule.COLS
+		})
+		weeks = (days + 3) // 7
+		if len(weeks):
+			counts = np.bincount((weeks - weeks.min()).astype(np.int64))
+			self.weeks = {int(weeks.min()) + i: int(count) for i, count in enumerate(counts.tolist()) if count}
+	
+	@staticmethod
+	def bucket_key(item) -> tuple:
+		return tuple(ItemHandler._codes[col][item[col]] for col in ItemSampler._dims) + (bool(item["in_progress"]),)
+	
+	# Indexes an item (a dict or row), unless it's complete
+	def add(self, item) -> None:
+		if item["complete"]: return
+		key = self.bucket_key(item)
+		bucket = self.buckets.setdefault(key, list())
+		name = item["name"]
+		created = item["creation_date"]
+		if isinstance(created, str): created = datetime.datetime.fromisoformat(created)
+		self.where[name] = (key, len(bucket))
+		day = self.days[name] = (created - ItemHandler._epoch).total_seconds() / 86400
+		insort(self.sorted_days, day)
+		week = int((day + 3) // 7)
+		self.weeks[week] = self.weeks.get(week, 0) + 1
+		bucket.append(name)
+		if self.utility is not None: self.scores.setdefault(key, array("d")).append(self.score(key, self.days[name]))
+		self.schedule.add(name, item)
+		self.version += 1
+	
+	# Unindexes an item by name, by swapping the bucket's last name into its place
+	def remove(self, name: str) -> None:
+		if name not in self.where: return
+		key, pos = self.where.pop(name)
+		day = self.days.pop(name)
+		del self.sorted_days[bisect_left(self.sorted_days, day)]
+		week = int((day + 3) // 7)
+		self.weeks[week] -= 1
+		if not self.weeks[week]: del self.weeks[week]
+		bucket = self.buckets[key]
+		last = bucket.pop()
+		if pos < len(bucket):
+			bucket[pos] = last
+			self.where[last] = (key, pos)
+		if self.utility is not None:
+			scores = self.scores[key]
+			last = scores.pop()
+			if pos < len(scores): scores[pos] = last
+		self.schedule.remove(name)
+		self.version += 1
+	
+	# Keys of the buckets of items not in progress with category codes
+	# within ranges (col: (lo, hi)), that have any
+	def _keys(self, ranges: dict):
+		spans = [
+			range(ranges[col][0], ranges[col][1] + 1) if col in ranges
+			else range(len(ItemHandler._codes[col]))
+			for col in self._dims
+		]
+		for key in itertools.product(*spans):
+			if self.buckets.get(key + (False,)): yield key + (False,)
+	
+	# Draws n names (with replacement) of items not in progress, with category
+	# codes within ranges (col: (lo, hi)), weighted as in ItemHandler.choose_items
+	def sample(self, ranges: dict, weights: dict = None, n: int = 1) -> list:
+		query = (
+			tuple(sorted(ranges.items())),
+			tuple((col, tuple(ws)) for col, ws in sorted((weights or {}).items()))
+		)
+		if self._alias is None or self._alias[:2] != (query, self.version):
+			keys, key_weights = list(), list()
+			for key in self._keys(ranges):
+				weight = len(self.buckets[key]) * ItemSampler.weight(key, weights)
+				if weight > 0:
+					keys.append(key)
+					key_weights.append(weight)
+			self._alias = (query, self.version, keys) + ItemSampler.alias_table(key_weights)
+		
+		keys, prob, alias = self._alias[2:]
+		if not keys: return list()
+		names = list()
+		for _ in range(n):
+			i = randrange(len(keys))
+			if random() >= prob[i]: i = alias[i]
+			bucket = self.buckets[keys[i]]
+			names.append(bucket[randrange(len(bucket))])
+		return names
+	
+	# Names of the n items not in progress, with category codes within ranges
+	# (col: (lo, hi)), with the highest utility under weights (see
+	# RECOMMEND_WEIGHTS), best first. Ties are broken arbitrarily
+	# Scores are cached per item, kept in each bucket's order, so they're
+	# only computed when an item is added (or changed), or the weights change
+	# The best are picked without sorting them all: with argpartition if
+	# numpy is loaded (by pandas), otherwise with a heap
+	def rank(self, ranges: dict, weights: dict, n: int = 1) -> list:
+		if weights != self.utility: self.rescore(weights)
+		keys = list(self._keys(ranges))
+		total = sum(len(self.buckets[key]) for key in keys)
+		n = min(n, total)
+		if n < 1: return list()
+		
+		if "numpy" in sys.modules:
+			scores = np.concatenate([np.frombuffer(self.scores[key], dtype=np.float64) for key in keys])
+			best = np.argpartition(-scores, n - 1)[:n] if n < total else np.arange(total)
+			best = best[np.argsort(-scores[best], kind="stable")]
+			offsets = list(itertools.accumulate(len(self.buckets[key]) for key in keys))
+			names = list()
+			for i in best.tolist():
+				b = bisect_right(offsets, i)
+				names.append(self.buckets[keys[b]][i - (offsets[b - 1] if b else 0)])
+			return names
+		best = heapq.nlargest(n, zip(
+			itertools.chain.from_iterable(self.scores[key] for key in keys),
+			itertools.chain.from_iterable(self.buckets[key] for key in keys)
+		), key=lambda pair: pair[0])
+		return [name for _, name in best]
+	
+	# Cached score of an item, see rank
+	def cached(self, name: str) -> float:
+		key, pos = self.where[name]
+		return self.scores[key][pos]
+	
+	# Recomputes every item's score with new weights
+	def rescore(self, weights: dict) -> None:
+		self.utility = dict(weights)
+		self._base = dict()
+		self.scores = {
+			key: array("d", [self.score(key, self.days[name]) for name in bucket])
+			for key, bucket in self.buckets.items()
+		}
+	
+	# Score of an item in the given bucket, created the given day (see
+	# rank). Its age is counted back from the epoch rather than now, which
+	# orders items the same, so scores don't go stale as time passes
+	def score(self, key: tuple, day: float) -> float:
+		base = self._base.get(key)
+		if base is None:
+			base = self._base[key] = sum(
+				self.utility.get(col, 0) * (1 - code / (len(ItemHandler._codes[col]) - 1))
+				for col, code in zip(self._dims, key)
+			)
+		return base - self.utility.get("age", 0) * day / 30
+	
+	# Product of the weights (col: list of weights per category, or None)
+	# of the categories in a bucket key (or any codes in _dims order)
+	@staticmethod
+	def weight(key: tuple, weights: dict = None) -> float:
+		weight = 1
+		for col, ws in (weights or {}).items():
+			weight *= ws[key[ItemSampler._dims.index(col)]]
+		return weight
+	
+	# Builds Vose's alias table: index i is drawn with probability prob[i],
+	# and alias[i] otherwise
+	@staticmethod
+	def alias_table(weights: list) -> tuple:
+		n = len(weights)
+		total = sum(weights)
+		prob = [w * n / total for w in weights]
+		alias = [0] * n
+		small = [i for i, p in enumerate(prob) if p < 1]
+		large = [i for i, p in enumerate(prob) if p >= 1]
+		while small and large:
+			lo, hi = small.pop(), large.pop()
+			alias[lo] = hi
+			prob[hi] -= 1 - prob[lo]
+			(small if prob[hi] < 1 else large).append(hi)
+		for i in small + large: prob[i] = 1
+		return prob, alias
+	
+# Iterates over names in random order, without repeats, shuffling them as
+# they're drawn (Fisher-Yates, one swap per draw) so each draw is O(1)
+# With weights, names are drawn in proportion to them (among those left),
+# each keyed by an exponential variate scaled by its weight and popped off
+# a heap in key order, so each draw is O(log n). Names with no weight aren't
+# drawn. If ordered, names are drawn in the given order
+class Draws:
+	def __init__(self, names: list, weights: list = None, ordered: bool = False):
+		self.names   = names
+		self.ordered = ordered
+		self.drawn   = 0 # With no weights, names[:drawn] were drawn
+		self.heap    = None
+		if weights is not None:
+			self.heap = [(-log(1 - random()) / w, i) for i, w in enumerate(weights) if w > 0]
+			heapq.heapify(self.heap)
+	
+	def __iter__(self):
+		return self
+	
+	def __next__(self) -> str:
+		if self.heap is not None:
+			if not self.heap: raise StopIteration
+			return self.names[heapq.heappop(self.heap)[1]]
+		names, i = self.names, self.drawn
+		if i >= len(names): raise StopIteration
+		if not self.ordered:
+			j = randrange(i, len(names))
+			names[i], names[j] = names[j], names[i]
+		self.drawn = i + 1
+		return names[i]
+
+# Tasks skipped when Choose suggested them (see GUI.choose_item), each with
+# a weight that grows by 1 per skip and halves every REJECTION_HALF_LIFE
+# days. recommend lowers their utility by it (see RECOMMEND_WEIGHTS)
+# Kept in REJECTIONS_FILE, read on first use, and written through save
+# (e.g. ItemHandler._save, so the GUI doesn't wait on the disk) if given
+class Rejections:
+	MIN_WEIGHT : float = 0.01 # Weight below which a task's skips are forgotten
+	
+	def __init__(self, path: str = REJECTIONS_FILE, save = None):
+		self.path = path
+		self._weights = None # Name: (weight, time.time() it was last skipped)
+		self._save = save    # Takes [("rejections", weights)] to write later, None writes at once
+	
+	@property
+	def weights(self) -> dict:
+		if self._weights is None:
+			self._weights = dict()
+			if REJECTION_HALF_LIFE is not None and os.path.exists(self.path):
+				with open(self.path) as f:
+					self._weights = {name: tuple(entry) for name, entry in json.load(f).items()}
+		return self._weights
+	
+	# Weight of a task's skips now
+	def weight(self, name: str, now: float = None) -> float:
+		weight, when = self.weights.get(name, (0, 0))
+		if REJECTION_HALF_LIFE is None: return weight
+		return weight * 0.5 ** (((now or time.time()) - when) / (REJECTION_HALF_LIFE * 86400))
+	
+	def add(self, name: str) -> None:
+		now = time.time()
+		self.weights[name] = (self.weight(name, now) + 1, now)
+		self.save()
+	
+	# Forgets a task's skips, e.g. once it's committed to
+	def forget(self, name: str) -> None:
+		if self.weights.pop(name, None) is not None: self.save()
+	
+	# Name: weight, of tasks with skips
+	def penalties(self) -> dict:
+		now = time.time()
+		return {name: self.weight(name, now) for name in self.weights}
+	
+	# Drops skips whose weight decayed away, and saves the rest
+	def save(self) -> None:
+		if REJECTION_HALF_LIFE is None: return
+		now = time.time()
+		self._weights = {name: entry for name, entry in self.weights.items() if self.weight(name, now) >= self.MIN_WEIGHT}
+		if self._save is not None: self._save([("rejections", dict(self._weights))])
+		else: self.write(self._weights)
+	
+	# Atomically replaces the file
+	def write(self, weights: dict) -> None:
+		with open(self.path + ".tmp", "w") as f:
+			json.dump(weights, f)
+		os.replace(self.path + ".tmp", self.path)
+
+# An item as a dict, with its key in name like a dataframe row's label
+class ItemRow(dict):
+	def __init__(self, key, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.name = key
+
+# Item in an ArrayItemHandler, read like a dataframe row without copying it
+# out of the arrays. Its key is in name, like a row's label
+class ItemView:
+	__slots__ = ("handler", "name")
+	
+	def __init__(self, handler: "ArrayItemHandler", key: int):
+		self.handler = handler
+		self.name = key
+	
+	def __getitem__(self, col: str):
+		return self.handler._value(self.name, col)
+	
+	def get(self, col: str, default=None):
+		return self[col] if col in ItemHandler._columns else default
+	
+	def to_dict(self) -> dict:
+		return {col: self[col] for col in ItemHandler._columns}
+
+# ItemHandler keeping items in an SQLite database (in WAL mode) instead of a
+# dataframe. Categories are stored as codes and dates as nanoseconds, and
+# lookups go through indexes: a unique one on the names of incomplete items,
+# one on the categories for choosing, and one per sortable column for the
+# View tab. Every change is its own transaction
+@instrumented
+class SQLiteItemHandler(ItemHandler):
+	db     : sqlite3.Connection
+	_items : DataFrame = None # Cached for the items property
+	_data_version : int = None # See sync
+	_reminded     : int = None # Dates up to this (encoded) time aren't reminded of, see reminders
+	
+	def __init__(self, path: str = DB_FILE):
+		self.path = path
+		self._predicates = dict()
+		self.rejections = Rejections()
+	
+	# Opens the database, creating it from ITEMS_FILE if there is one
+	# It's used by one thread at a time, but not always the one that opened
+	# it (e.g. a Server running on its own thread)
+	def load_items(self) -> None:
+		self.db = sqlite3.connect(self.path, check_same_thread=False)
+		self.db.execute("PRAGMA journal_mode=WAL")
+		self.db.execute("PRAGMA synchronous=NORMAL")
+		self._data_version = self.db.execute("PRAGMA data_version").fetchone()[0]
+		self._reminded = self._encode_val("deadline", datetime.datetime.now())
+		with self.db:
+			self.db.execute("""
+				CREATE TABLE IF NOT EXISTS items (
+					id            INTEGER PRIMARY KEY,
+					name          TEXT    NOT NULL,
+					description   TEXT    NOT NULL DEFAULT '',
+					length        INTEGER NOT NULL,
+					reviewable    INTEGER NOT NULL,
+					in_progress   INTEGER NOT NULL,
+					priority      INTEGER NOT NULL,
+					urgency       INTEGER NOT NULL,
+					enjoyability  INTEGER NOT NULL,
+					complete      INTEGER NOT NULL,
+					creation_date INTEGER NOT NULL,
+					start_date    INTEGER,
+					deadline      INTEGER,
+					completion_date INTEGER
+				)
+			""")
+			# Databases made before completion dates were kept
+			if "completion_date" not in [row[1] for row in self.db.execute("PRAGMA table_info(items)")]:
+				self.db.execute("ALTER TABLE items ADD COLUMN completion_date INTEGER")
+			self.db.execute("""
+				CREATE UNIQUE INDEX IF NOT EXISTS incomplete_name
+				ON items (name) WHERE complete = 0
+			""")
+			self.db.execute(f"""
+				CREATE INDEX IF NOT EXISTS choose
+				ON items (in_progress, {", ".join(ItemSampler._dims)}) WHERE complete = 0
+			""")
+			for col in self._sort_cols:
+				self.db.execute(f"""
+					CREATE INDEX IF NOT EXISTS sort_{col}
+					ON items ({col}, creation_date) WHERE complete = 0
+				""")
+			for col in Schedule.COLS:
+				self.db.execute(f"""
+					CREATE INDEX IF NOT EXISTS schedule_{col}
+					ON items ({col}) WHERE complete = 0 AND {col} IS NOT NULL
+				""")
+			self._create_weeks()
+		# Migrate from the dataframe engine's files, including its journal and archive
+		empty = self.db.execute("SELECT count(*) FROM items").fetchone()[0] == 0
+		source = ItemHandler()
+		if empty and (source.storage.exists() or os.path.exists(ITEMS_FILE)):
+			source.load_items()
+			self._replace_items(itertools.chain([source.items], source.history()))
+			source.close()
+	
+	# Items created and completed per week (see Archive.week), for stats,
+	# kept up to date by triggers as items change
+	def _create_weeks(self) -> None:
+		week = lambda date: f"({date} / {86400 * 10 ** 9} + 3) / 7"
+		counted = lambda row: {
+			"created"  : ("true", week(f"{row}.creation_date")),
+			"completed": (f"{row}.complete AND {row}.completion_date IS NOT NULL", week(f"{row}.completion_date")),
+		}
+		add = lambda row: "".join(
+			f"INSERT INTO weeks (week, {col}) SELECT {key}, 1 WHERE {when} ON CONFLICT (week) DO UPDATE SET {col} = {col} + 1;\n"
+			for col, (when, key) in counted(row).items()
+		)
+		remove = lambda row: "".join(
+			f"UPDATE weeks SET {col} = {col} - 1 WHERE week = {key} AND {when};\n"
+			for col, (when, key) in counted(row).items()
+		)
+		new = self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'weeks'").fetchone() is None
+		self.db.execute("""
+			CREATE TABLE IF NOT EXISTS weeks (
+				week      INTEGER PRIMARY KEY,
+				created   INTEGER NOT NULL DEFAULT 0,
+				completed INTEGER NOT NULL DEFAULT 0
+			)
+		""")
+		self.db.execute(f"CREATE TRIGGER IF NOT EXISTS weeks_insert AFTER INSERT ON items BEGIN\n{add('NEW')}END")
+		self.db.execute(f"CREATE TRIGGER IF NOT EXISTS weeks_delete AFTER DELETE ON items BEGIN\n{remove('OLD')}END")
+		self.db.execute(f"""
+			CREATE TRIGGER IF NOT EXISTS weeks_update
+			AFTER UPDATE OF complete, creation_date, completion_date ON items BEGIN
+			{remove('OLD')}{add('NEW')}END
+		""")
+		if new:
+			for col, (when, key) in counted("items").items():
+				self.db.execute(f"""
+					INSERT INTO weeks (week, {col}) SELECT {key}, count(*) FROM items WHERE {when} GROUP BY 1
+					ON CONFLICT (week) DO UPDATE SET {col} = excluded.{col}
+				""")
+	
+	# Replaces all items with those in a CSV file
+	def import_csv(self, path: str) -> None:
+		self._replace_items([ItemHandler._typed(CSVStorage(path).read())])
+	
+	# Replaces all items with those in the given dataframes
+	def _replace_items(self, frames) -> None:
+		with self.db:
+			self.db.execute("DELETE FROM items")
+			self.db.executemany(
+				f"INSERT INTO items ({', '.join(self._columns)}) VALUES ({', '.join('?' * len(self._columns))})",
+				(self._encode_row(item) for items in frames for _, item in items.iterrows())
+			)
+		self._items = None
+	
+	def export_csv(self, path: str) -> None:
+		CSVStorage(path).write(self.items)
+	
+	# Changes are committed as they're made
+	def export_items(self) -> None:
+		pass
+	
+	# SQLite handles other processes' changes itself
+	def watched_files(self) -> list:
+		return list()
+	
+	# Nothing needs merging, but callers keeping what they read (like
+	# Server) need to know when another connection changed the database
+	# Returns an empty list if one did since the last call, otherwise None
+	def sync(self):
+		version = self.db.execute("PRAGMA data_version").fetchone()[0]
+		changed = version != self._data_version
+		self._data_version = version
+		return list() if changed else None
+	
+	def set_item_dtypes(self) -> None:
+		pass
+	
+	def close(self) -> None:
+		self.db.close()
+	
+	# SQL values of an item (a dict or row), in the order of _columns
+	def _encode_row(self, item) -> tuple:
+		return tuple(self._encode_val(col, item.get(col)) for col in self._columns)
+	
+	# Item from an SQL row of (id, *_columns), named by its id
+	def _decode_row(self, row: tuple) -> ItemRow:
+		item = ItemRow(row[0])
+		for col, val in zip(self._columns, row[1:]):
+			item[col] = self._decode_val(col, val)
+		return item
+	
+	def add_item(self, item: dict):
+		with self.db:
+			self.db.execute(
+				f"INSERT INTO items ({', '.join(self._columns)}) VALUES ({', '.join('?' * len(self._columns))})",
+				self._encode_row(item)
+			)
+		self._items = None
+	
+	def add_items(self, items) -> int:
+		items = self._validate_new_items(items)
+		with self.db:
+			self.db.executemany(
+				f"INSERT INTO items ({', '.join(self._columns)}) VALUES ({', '.join('?' * len(self._columns))})",
+				(self._encode_row(item) for item in items)
+			)
+		self._items = None
+		return len(items)
+	
+	# Every change is already a transaction
+	@contextlib.contextmanager
+	def batch(self):
+		yield self
+	
+	def delete_incomplete_item(self, name: str) -> None:
+		with self.db:
+			self.db.execute("DELETE FROM items WHERE complete = 0 AND name = ?", (name,))
+		self._items = None
+	
+	# Returns False if the new name is taken by another incomplete item
+	# Raises KeyError, like the other engines, if no incomplete item has the name
+	def update_incomplete_item(self, name: str, cols: dict):
+		self._validate_update(cols)
+		cols = self._dated(cols)
+		try:
+			with self.db:
+				cursor = self.db.execute(
+					f"UPDATE items SET {', '.join(col + ' = ?' for col in cols)} WHERE complete = 0 AND name = ?",
+					[self._encode_val(col, val) for col, val in cols.items()] + [name]
+				)
+		except sqlite3.IntegrityError:
+			return False
+		if cursor.rowcount == 0: raise KeyError(name)
+		self._items = None
+		return True
+	
+	# Counts matching items per category bucket, then picks buckets with an
+	# alias table and items within them by offset, all using the choose index
+	def choose_items(self, bounds: dict, weights: dict = None, n: int = 1) -> list:
+		dims = ItemSampler._dims
+		where, params = self._bounds_sql(bounds)
+		buckets, bucket_weights = list(), list()
+		for row in self.db.execute(
+			f"SELECT {', '.join(dims)}, count(*) FROM items WHERE {where} GROUP BY {', '.join(dims)}",
+			params
+		):
+			weight = row[-1] * ItemSampler.weight(row, weights)
+			if weight > 0:
+				buckets.append(row)
+				bucket_weights.append(weight)
+		if not buckets: return list()
+		
+		prob, alias = ItemSampler.alias_table(bucket_weights)
+		names = list()
+		for _ in range(n):
+			i = randrange(len(buckets))
+			if random() >= prob[i]: i = alias[i]
+			names.append(self.db.execute(
+				f"SELECT name FROM items WHERE complete = 0 AND in_progress = 0 AND {' AND '.join(col + ' = ?' for col in dims)} LIMIT 1 OFFSET ?",
+				buckets[i][:-1] + (randrange(buckets[i][-1]),)
+			).fetchone()[0])
+		return names
+	
+	# The utility (see ItemSampler.score) is linear in the category codes
+	# and creation date, so it's computed in the query, which keeps only the
+	# best n rows as it scans
+	def recommend(self, bounds: dict, weights: dict = None, n: int = 1) -> list:
+		weights = weights or RECOMMEND_WEIGHTS
+		penalties = self.rejections.penalties() if weights.get("rejected") else dict()
+		where, params = self._bounds_sql(bounds)
+		dims = ItemSampler._dims
+		coefs = [-weights.get(col, 0) / (len(self._codes[col]) - 1) for col in dims]
+		coefs.append(-weights.get("age", 0) / 30 / (86400 * 10 ** 9))
+		score = " + ".join(f"? * {col}" for col in dims + ["creation_date"])
+		scored = self.db.execute(
+			f"SELECT name, {score} AS score FROM items WHERE {where} ORDER BY score DESC LIMIT ?",
+			coefs + params + [n + len(penalties)]
+		).fetchall()
+		if not penalties: return [name for name, _ in scored]
+		return self._penalized(scored, penalties, weights["rejected"], n)
+	
+	# Counted in the choose index
+	def count_candidates(self, bounds: dict) -> int:
+		where, params = self._bounds_sql(bounds)
+		return self.db.execute(f"SELECT count(*) FROM items WHERE {where}", params).fetchone()[0]
+	
+	def _candidates(self, bounds: dict, weights: dict = None) -> tuple:
+		dims = ItemSampler._dims
+		where, params = self._bounds_sql(bounds)
+		rows = self.db.execute(f"SELECT name, {', '.join(dims)} FROM items WHERE {where}", params).fetchall()
+		names = [row[0] for row in rows]
+		if not weights: return names, None
+		return names, [ItemSampler.weight(row[1:], weights) for row in rows]
+	
+	# Range scans of the schedule indexes
+	def due(self, within: datetime.timedelta, bounds: dict = None) -> list:
+		where, params = self._bounds_sql(bounds or dict())
+		until = self._encode_val("deadline", datetime.datetime.now() + within)
+		return [row[0] for row in self.db.execute(
+			f"SELECT name FROM items WHERE {where} AND deadline IS NOT NULL AND deadline <= ? ORDER BY deadline",
+			params + [until]
+		)]
+	
+	def reminders(self, until: datetime.datetime = None) -> list:
+		until = self._encode_val("deadline", until or datetime.datetime.now())
+		events = list()
+		for col in Schedule.COLS:
+			events += [
+				(self._decode_val(col, t), col, name)
+				for t, name in self.db.execute(
+					f"SELECT {col}, name FROM items WHERE complete = 0 AND {col} IS NOT NULL AND {col} > ? AND {col} <= ?",
+					(self._reminded, until)
+				)
+			]
+		self._reminded = max(self._reminded, until)
+		return sorted(events)
+	
+	def next_reminder(self):
+		times = [
+			self.db.execute(
+				f"SELECT min({col}) FROM items WHERE complete = 0 AND {col} IS NOT NULL AND {col} > ?", (self._reminded,)
+			).fetchone()[0]
+			for col in Schedule.COLS
+		]
+		times = [t for t in times if t is not None]
+		return self._decode_val("deadline", min(times)) if times else None
+	
+	# WHERE clause (and its parameters) for incomplete items that aren't in
+	# progress, with categories in the given bounds (see choose_items)
+	def _bounds_sql(self, bounds: dict) -> tuple:
+		where, params = ["complete = 0", "in_progress = 0"], list()
+		for col, (lo, hi) in bounds.items():
+			where.append(f"{col} BETWEEN ? AND ?")
+			params += [self._codes[col][lo], self._codes[col][hi]]
+		return " AND ".join(where), params
+	
+	# Completed items stay in the table, out of the partial indexes
+	def history(self, chunk_size: int = 10000):
+		cursor = self.db.execute("SELECT * FROM items WHERE complete = 1")
+		while True:
+			rows = cursor.fetchmany(chunk_size)
+			if not rows: return
+			yield self._frame(rows)
+	
+	def _plain_items(self, keys: list) -> list:
+		return [self._plain(self.get_item(key)) for key in keys]
+	
+	def _history_records(self, chunk_size: int):
+		cursor = self.db.execute("SELECT * FROM items WHERE complete = 1")
+		while True:
+			rows = cursor.fetchmany(chunk_size)
+			if not rows: return
+			yield [self._plain(self._decode_row(row)) for row in rows]
+	
+	def completions(self, by: str = "month") -> dict:
+		if by == "month":
+			key = "coalesce(strftime('%Y-%m', completion_date / 1000000000, 'unixepoch'), 'unknown')"
+		elif by in self._columns:
+			key = by
+		else:
+			raise KeyError(by)
+		counts = dict(self.db.execute(f"SELECT {key}, count(*) FROM items WHERE complete = 1 GROUP BY 1 ORDER BY 1"))
+		if by in self._codes: return {cat: counts.get(code, 0) for cat, code in self._codes[by].items()}
+		if self._columns.get(by) == bool: return {bool(val): count for val, count in counts.items()}
+		return counts
+	
+	# Incomplete items are counted through the choose index, and their ages
+	# read through the creation date one. Weeks are kept by triggers
+	def stats(self, percentiles: tuple = (50, 90, 99, 100)) -> dict:
+		dims = ItemSampler._dims
+		buckets = {
+			tuple(row[:-1]): row[-1] for row in self.db.execute(
+				f"SELECT {', '.join(dims)}, in_progress, count(*) FROM items WHERE complete = 0 GROUP BY {', '.join(dims)}, in_progress"
+			)
+		}
+		created, completed = dict(), dict()
+		for week, n_created, n_completed in self.db.execute("SELECT week, created, completed FROM weeks"):
+			created[week], completed[week] = n_created, n_completed
+		day_at = lambda i: self.db.execute(
+			"SELECT creation_date FROM items WHERE complete = 0 ORDER BY creation_date LIMIT 1 OFFSET ?", (i,)
+		).fetchone()[0] / (86400 * 10 ** 9)
+		return self._stats(buckets, created, completed, sum(buckets.values()), day_at, percentiles)
+	
+	def get_incomplete_item(self, name: str):
+		row = self.db.execute("SELECT * FROM items WHERE complete = 0 AND name = ?", (name,)).fetchone()
+		return None if row is None else self._decode_row(row)
+	
+	@untimed
+	def get_item(self, key):
+		row = self.db.execute("SELECT * FROM items WHERE id = ?", (key,)).fetchone()
+		return None if row is None else self._decode_row(row)
+	
+	def sorted_keys(self, col: str, ascending: bool = True) -> ListView:
+		order = "ASC" if ascending else "DESC"
+		return ListView([row[0] for row in self.db.execute(
+			f"SELECT id FROM items WHERE complete = 0 ORDER BY {col} {order}, creation_date {order}"
+		)])
+	
+	# Scans the table, see _search_sql
+	def search(self, query: str) -> set:
+		if not SearchIndex.tokenize(query): return set()
+		where, params = self._search_sql(query)
+		return {row[0] for row in self.db.execute(f"SELECT id FROM items WHERE complete = 0 AND {where}", params)}
+	
+	# SQL condition (and its parameters) matching each word of a query at the
+	# start of the name or description, or after a space in them
+	def _search_sql(self, query: str) -> tuple:
+		terms = SearchIndex.tokenize(query)
+		# Words are letters, digits and _, so only _ is special to LIKE
+		patterns = ["% " + term.replace("_", "\\_") + "%" for term in terms]
+		text = "(' ' || name || ' ' || description) LIKE ? ESCAPE '\\'"
+		return " AND ".join([text] * len(terms)), patterns
+	
+	# Like ItemHandler.query, but fetches the keys PAGE_ROWS at a time (see
+	# PagedKeys) without limit
+	def query(self, filters: dict = None, order_by: list = None, limit: int = None, offset: int = 0):
+		order = self._order_spec(order_by)
+		filters = filters or dict()
+		where, params = self._predicate(self._filter_spec(filters))
+		params = list(params)
+		if filters.get("search") and SearchIndex.tokenize(filters["search"]):
+			search, search_params = self._search_sql(filters["search"])
+			where += " AND " + search
+			params += search_params
+		directions = [(col, "ASC" if asc else "DESC") for col, asc in order]
+		directions.append(("creation_date", directions[0][1] if len(order) == 1 else "ASC"))
+		sql = f"SELECT id FROM items WHERE {where} ORDER BY {', '.join(f'{col} {d}' for col, d in directions)}"
+		if limit is not None or offset:
+			return [row[0] for row in self.db.execute(sql + " LIMIT ? OFFSET ?", params + [-1 if limit is None else limit, offset])]
+		count = self.db.execute(f"SELECT count(*) FROM items WHERE {where}", params).fetchone()[0]
+		return PagedKeys(lambda offset, limit: self.query(filters, order_by, limit, offset), count)
+	
+	# Compiles a filter spec to an SQL condition and its parameters
+	def _compile(self, spec: tuple) -> tuple:
+		where, params = ["complete = 0"], list()
+		for col, lo, hi in spec:
+			if lo is not None:
+				where.append(f"{col} >= ?")
+				params.append(lo)
+			if hi is not None:
+				where.append(f"{col} <= ?")
+				params.append(hi)
+		return " AND ".join(where), params
+	
+	# All items as a dataframe indexed by id, cached until the next change
+	# The GUI doesn't use this, it's for scripts written against ItemHandler
+	@property
+	def items(self) -> DataFrame:
+		if self._items is None:
+			self._items = self._frame(self.db.execute("SELECT * FROM items").fetchall())
+		return self._items
+	
+	# Dataframe of SQL rows, indexed by id
+	def _frame(self, rows: list) -> DataFrame:
+		items = pd.DataFrame(
+			[dict(self._decode_row(row)) for row in rows],
+			index=[row[0] for row in rows], columns=list(self._columns)
+		)
+		return ItemHandler._typed(items)
+	
+# Arrays of an ArrayItemHandler, as (columns, strings): a dict of arrays by
+# column and the table of strings they reference. They're small, so they're
+# read whole rather than mapped
+# Layout: MAGIC, 8 byte header length, JSON header (the strings, and each
+# column's typecode, offset and length), then the arrays in native byte order
+@instrumented
+class ArrayStorage(Storage):
+	path  = "items.arr"
+	typed = True
+	MAGIC = b"TODOARR1\n"
+	
+	def write_to(self, f, table: tuple) -> None:
+		columns, strings = table
+		header = {"strings": strings, "columns": dict()}
+		offset = 0
+		for col, arr in columns.items():
+			header["columns"][col] = [arr.typecode, offset, len(arr)]
+			offset += len(arr) * arr.itemsize
+		header = json.dumps(header).encode()
+		f.write(self.MAGIC + len(header).to_bytes(8, "little") + header)
+		for arr in columns.values():
+			f.write(arr.tobytes())
+	
+	def read(self) -> tuple:
+		with open(self.path, "rb") as f:
+			data = f.read()
+		start = len(self.MAGIC) + 8
+		header_len = int.from_bytes(data[len(self.MAGIC):start], "little")
+		header = json.loads(data[start:start + header_len])
+		start += header_len
+		columns = dict()
+		for col, (typecode, offset, length) in header["columns"].items():
+			arr = array(typecode)
+			arr.frombytes(data[start + offset:start + offset + length * arr.itemsize])
+			columns[col] = arr
+		return columns, header["strings"]
+
+# ItemHandler keeping items column-wise in arrays instead of a dataframe, for
+# stores small enough that pandas' import time and per-call overhead are most
+# of the cost. Categories are int8 codes, the bools are bits of a flags byte,
+# dates are int64 nanoseconds (NAT if missing) and strings are int32 indices
+# into a table of interned strings. Rows are read through ItemViews, keyed by
+# their position in the arrays
+# Rows deleted or archived are only flagged, and dropped on the next load.
+# Every change rewrites the snapshot (ArrayStorage), there's no journal
+@instrumented
+class ArrayItemHandler(ItemHandler):
+	_categories : dict = {col: list(opts) for col, opts in ItemHandler._cboptions.items()}
+	_flag_bits  : dict = {"reviewable": 1, "in_progress": 2, "complete": 4}
+	DELETED     : int  = 8
+	NAT         : int  = -1 << 63 # Like numpy's
+	# Array typecode of each column, all the bools are in flags
+	_typecodes  : dict = dict(
+		{
+			col: "b" if col in ItemHandler._codes else "i" if dtype == str else "q"
+			for col, dtype in ItemHandler._columns.items() if dtype != bool
+		},
+		flags="B"
+	)
+	
+	columns    : dict # Column: array
+	strings    : list # Interned strings
+	_interned  : dict # String: index in strings
+	_completed : list # Keys of rows in _archiving, flagged DELETED once archived
+	
+	def __init__(self, storage: Storage = None):
+		super().__init__(journaled=False, storage=storage if storage is not None else ArrayStorage())
+		self._completed = list()
+	
+	# Reads the arrays, or creates them from the dataframe engine's files
+	# Drops rows flagged DELETED, and archives any flagged complete (left by a
+	# crash before they were archived)
+	def load_items(self) -> None:
+		with self.lock:
+			self._load_items()
+			self._snapshot_sig = self._stat(self.storage.path)
+	
+	def _load_items(self) -> None:
+		self.columns = {col: array(typecode) for col, typecode in self._typecodes.items()}
+		self.strings, self._interned = list(), dict()
+		if self.storage.exists():
+			columns, self.strings = self.storage.read()
+			self._interned = {s: i for i, s in enumerate(self.strings)}
+			rows = len(columns["flags"])
+			for col, typecode in self._typecodes.items():
+				# Columns added since the file was written
+				default = self.NAT if typecode == "q" else self._intern("") if typecode == "i" else 0
+				self.columns[col] = columns.get(col, array(typecode, [default] * rows))
+			
+			complete, deleted = self._flag_bits["complete"], self.DELETED
+			flags = self.columns["flags"]
+			keys = [key for key, flag in enumerate(flags) if not flag & (complete | deleted)]
+			if len(keys) < rows:
+				done = [ItemView(self, key).to_dict() for key, flag in enumerate(flags) if flag & complete and not flag & deleted]
+				if done:
+					found = self.archive.find({(item["name"], pd.Timestamp(item["creation_date"])) for item in done})
+					self.archive.append([item for item in done if (item["name"], pd.Timestamp(item["creation_date"])) not in found])
+				self._compact(keys)
+				self.export_items()
+		else:
+			source = ItemHandler()
+			if source.storage.exists() or os.path.exists(ITEMS_FILE):
+				source.load_items()
+				for item in source.items.to_dict("records"): self._append(item)
+				source.close()
+			self.export_items()
+		self._rebuild_indexes()
+	
+	# Keeps only the rows with the given keys (in order), and the strings they use
+	def _compact(self, keys: list) -> None:
+		interned = dict()
+		for col, arr in self.columns.items():
+			if arr.typecode == "i":
+				strs = [self.strings[arr[key]] for key in keys]
+				self.columns[col] = array("i", [interned.setdefault(s, len(interned)) for s in strs])
+			else:
+				self.columns[col] = array(arr.typecode, [arr[key] for key in keys])
+		self.strings, self._interned = list(interned), interned
+	
+	def _rebuild_indexes(self) -> None:
+		names = self.columns["name"]
+		self._names = dict()
+		self.sampler.clear()
+		for key in self._active_keys():
+			self._names[self.strings[names[key]]] = key
+			self.sampler.add(ItemView(self, key))
+		self._sort_cache.clear()
+		self._search = None
+	
+	def _search_texts(self):
+		names, descriptions = self.columns["name"], self.columns["description"]
+		return ((key, self.strings[names[key]], self.strings[descriptions[key]]) for key in self._active_keys())
+	
+	# Keys of rows that are neither complete nor deleted
+	def _active_keys(self) -> list:
+		inactive = self._flag_bits["complete"] | self.DELETED
+		return [key for key, flag in enumerate(self.columns["flags"]) if not flag & inactive]
+	
+	def _intern(self, s: str) -> int:
+		i = self._interned.get(s)
+		if i is None:
+			i = self._interned[s] = len(self.strings)
+			self.strings.append(s)
+		return i
+	
+	# Appends an item (a dict) to the arrays, returning its key
+	def _append(self, item: dict) -> int:
+		for col, arr in self.columns.items():
+			if col != "flags": arr.append(self._array_val(col, item.get(col)))
+		self.columns["flags"].append(sum(bit for col, bit in self._flag_bits.items() if item.get(col)))
+		return len(self.columns["flags"]) - 1
+	
+	def _array_val(self, col: str, val):
+		val = self._encode_val(col, val)
+		if self._typecodes[col] == "i": return self._intern(val)
+		return self.NAT if val is None else val
+	
+	# Sets a row's column to val, already encoded by _array_val unless it's a flag
+	def _set(self, key: int, col: str, val) -> None:
+		if col in self._flag_bits:
+			bit = self._flag_bits[col]
+			flags = self.columns["flags"]
+			flags[key] = flags[key] | bit if val else flags[key] & ~bit
+		else:
+			self.columns[col][key] = val
+	
+	# Value of a row's column, as a dataframe row would give it (dates as datetimes)
+	def _value(self, key: int, col: str):
+		if col in self._flag_bits: return bool(self.columns["flags"][key] & self._flag_bits[col])
+		val = self.columns[col][key]
+		if col in self._categories     : return self._categories[col][val]
+		if self._typecodes[col] == "i" : return self.strings[val]
+		return None if val == self.NAT else self._decode_val(col, val)
+	
+	# Writes the snapshot on every change. Items completed since are kept in
+	# it (flagged complete) until they're in the archive, then written again
+	# without them, so a crash in between leaves them to be archived on load
+	def commit(self, *records: dict) -> None:
+		if self._batch is not None:
+			self._batch.extend(records)
+			return
+		ops = [("snapshot", self._snapshot())]
+		if self._archiving:
+			archived, self._archiving = self._archiving, list()
+			for key in self._completed: self.columns["flags"][key] |= self.DELETED
+			self._completed.clear()
+			ops += [("archive", archived), ("snapshot", self._snapshot())]
+		self._save(ops)
+	
+	def _snapshot(self) -> tuple:
+		return {col: arr[:] for col, arr in self.columns.items()}, list(self.strings)
+	
+	# Replaces all items, archived ones included, with those in a CSV file
+	def import_csv(self, path: str) -> None:
+		self.flush()
+		items = ItemHandler._typed(CSVStorage(path).read())
+		if self.archive.exists(): os.remove(self.archive.path)
+		self.archive.append(items[items["complete"]].to_dict("records"))
+		self._compact([])
+		for item in items[~items["complete"]].to_dict("records"): self._append(item)
+		self._rebuild_indexes()
+		self.export_items()
+	
+	def set_item_dtypes(self) -> None:
+		pass
+	
+	def add_item(self, item: dict):
+		self.add_items([item])
+	
+	def add_items(self, items) -> int:
+		items = self._validate_new_items(items)
+		for item in items:
+			if item["complete"]:
+				self._archiving.append(item)
+				continue
+			key = self._append(item)
+			self._names[item["name"]] = key
+			self.sampler.add(item)
+			self._sort_insert(key, ItemView(self, key))
+		self.commit(*({"op": "add", "item": item} for item in items))
+		return len(items)
+	
+	def delete_incomplete_item(self, name: str) -> None:
+		key = self._names.pop(name, None)
+		if key is None: return
+		self._sort_remove(key, ItemView(self, key))
+		self.sampler.remove(name)
+		self.columns["flags"][key] |= self.DELETED
+		self.commit({"op": "delete", "name": name})
+	
+	def update_incomplete_item(self, name: str, cols: dict):
+		self._validate_update(cols)
+		if "name" in cols and cols["name"] != name and cols["name"] in self._names: return False
+		cols = self._dated(cols)
+		# Encodes the values before any index is changed, so one that can't
+		# be stored raises with nothing changed
+		vals = {col: val if col in self._flag_bits else self._array_val(col, val) for col, val in cols.items()}
+		key = self._names.pop(name)
+		item = ItemView(self, key)
+		self._sort_remove(key, item)
+		self.sampler.remove(name)
+		for col, val in vals.items():
+			self._set(key, col, val)
+		if item["complete"]:
+			self._archiving.append(item.to_dict())
+			self._completed.append(key)
+		else:
+			self._names[item["name"]] = key
+			self.sampler.add(item)
+			self._sort_insert(key, item)
+		self.commit({"op": "update", "name": name, "cols": cols})
+		return True
+	
+	def get_incomplete_item(self, name: str):
+		key = self._names.get(name)
+		return None if key is None else ItemView(self, key)
+	
+	@untimed
+	def get_item(self, key):
+		inactive = self._flag_bits["complete"] | self.DELETED
+		if not 0 <= key < len(self.columns["flags"]) or self.columns["flags"][key] & inactive: return None
+		return ItemView(self, key)
+	
+	def sorted_keys(self, col: str, ascending: bool = True) -> "ListView":
+		if col not in self._sort_cache:
+			order = sorted((self._sort_key(col, ItemView(self, key)), key) for key in self._active_keys())
+			self._sort_cache[col] = ([sort_key for sort_key, _ in order], [key for _, key in order])
+		return ListView(self._sort_cache[col][1], reverse=not ascending)
+	
+	# Compiles a filter spec to a function of (keys, columns, strings) giving
+	# the set of keys matching. Each column narrows the keys the previous ones
+	# left, comparing raw array values: flags by their bit, strings by their text
+	def _compile(self, spec: tuple):
+		flag_bits, typecodes = self._flag_bits, self._typecodes
+		def matching(keys, columns, strings):
+			for col, lo, hi in spec:
+				vals = columns["flags" if col in flag_bits else col]
+				if   col in flag_bits     : value = lambda key, vals=vals, bit=flag_bits[col]: vals[key] & bit != 0
+				elif typecodes[col] == "i": value = lambda key, vals=vals: strings[vals[key]]
+				else                      : value = vals.__getitem__
+				if   lo is None and hi is None: continue
+				elif hi is None               : keys = [key for key in keys if lo <= value(key)]
+				elif lo is None               : keys = [key for key in keys if value(key) <= hi]
+				else                          : keys = [key for key in keys if lo <= value(key) <= hi]
+			return set(keys)
+		return matching
+	
+	def _matching(self, spec: tuple) -> set:
+		return self._predicate(spec)(self._active_keys(), self.columns, self.strings)
+	
+	def _plain_items(self, keys: list) -> list:
+		return [self._plain(self.get_item(key)) for key in keys]
+	
+	# Reads codes and dates straight from the arrays (items are ItemViews here)
+	def _sort_key(self, col: str, item) -> tuple:
+		created = self.columns["creation_date"][item.name]
+		if   col in self._codes         : val = self.columns[col][item.name]
+		elif col == "creation_date"     : val = created
+		else                            : val = item[col]
+		return (val, created)
+	
+	# Active items as a dataframe indexed by key
+	# The GUI doesn't use this, it's for scripts written against ItemHandler
+	@property
+	def items(self) -> DataFrame:
+		keys = self._active_keys()
+		return ItemHandler._typed(pd.DataFrame(
+			[ItemView(self, key).to_dict() for key in keys],
+			index=keys, columns=list(self._columns)
+		))
+	
+# Grid that only materializes the rows fitting in its viewport (plus a small
+# buffer), reusing those widgets as it scrolls through rows
+# Wraps its frame (widget) rather than subclassing it, so tkinter is only
+# imported once a grid is made
+class VirtualGrid:
+	ROW_BUFFER = 2 # Rows materialized past the bottom of the viewport
+	
+	# make_row(frame, grid_row) creates and grids a row's widgets, returning them
+	# fill_row(widgets, key) configures the widgets to display the given row
+	def __init__(self, container, make_row, fill_row, *args, **kwargs):
+		self.widget = ttk.Frame(container, *args, **kwargs)
+		self.make_row = make_row
+		self.fill_row = fill_row
+		self.rows     = list() # Keys of all rows, in display order
+		self.slots    = list() # Widgets of each materialized row
+		self.hidden   = set()  # Indices of slots with no row to display
+		self.first    = 0      # Index in rows of the top slot
+		self.frame = ttk.Frame(self.widget)
+		self.frame.grid_propagate(False)
+		self.frame.bind("<Configure>", lambda e: self.fit(e.height))
+		self.scrollbar = ttk.Scrollbar(self.widget, orient="vertical", command=self.yview)
+		self.frame.pack(side="left", fill="both", expand=True)
+		self.scrollbar.pack(side="right", fill="y")
+		self.bind_wheel(self.frame)
+	
+	# Scrolls when the mouse wheel is used over the widget
+	def bind_wheel(self, widget):
+		widget.bind("<MouseWheel>", lambda e: self.yview("scroll", -1 if e.delta > 0 else 1, "units"))
+		widget.bind("<Button-4>"  , lambda e: self.yview("scroll", -1, "units"))
+		widget.bind("<Button-5>"  , lambda e: self.yview("scroll",  1, "units"))
+	
+	# Number of slots fully inside the viewport
+	def visible(self) -> int:
+		return max(1, len(self.slots) - self.ROW_BUFFER)
+	
+	# Materializes enough slots to fill the given height
+	def fit(self, height: int):
+		if not self.slots: self.add_slot()
+		row_height = max(1, *(w.winfo_reqheight() for w in self.slots[0]))
+		while len(self.slots) < height // row_height + self.ROW_BUFFER:
+			self.add_slot()
+		self.redraw()
+		
+	# Grid row 0 is left for headers
+	def add_slot(self):
+		widgets = self.make_row(self.frame, len(self.slots) + 1)
+		for w in widgets: self.bind_wheel(w)
+		self.slots.append(widgets)
+	
+	# Handles the scrollbar and mouse wheel
+	def yview(self, *args):
+		if args[0] == "moveto":
+			first = int(float(args[1]) * len(self.rows))
+		else: # "scroll", count, "units" or "pages"
+			first = self.first + int(args[1]) * (self.visible() if args[2] == "pages" else 1)
+		self.scroll_to(first)
+	
+	def scroll_to(self, first: int):
+		first = max(0, min(first, len(self.rows) - self.visible()))
+		if first != self.first:
+			self.first = first
+			self.redraw()
+	
+	# Replaces all rows (any sequence), keeping the scroll position unless told otherwise
+	def set_rows(self, rows, first: int = None):
+		self.rows = rows
+		self.first = max(0, min(self.first if first is None else first, len(rows) - self.visible()))
+		self.redraw()
+	
+	# Redisplays all slots
+	def redraw(self):
+		for i in range(len(self.slots)):
+			self.draw_slot(i)
+		n = max(1, len(self.rows))
+		self.scrollbar.set(self.first / n, min(1, (self.first + self.visible()) / n))
+	
+	def draw_slot(self, i: int):
+		idx = self.first + i
+		if idx < len(self.rows):
+			if i in self.hidden:
+				for w in self.slots[i]: w.grid()
+				self.hidden.discard(i)
+			self.fill_row(self.slots[i], self.rows[idx])
+		elif i not in self.hidden:
+			for w in self.slots[i]: w.grid_remove()
+			self.hidden.add(i)
+	
+	# Redisplays a single row, if it's on screen
+	def refresh_row(self, key):
+		on_screen = self.rows[self.first:self.first + len(self.slots)]
+		if key in on_screen: self.draw_slot(on_screen.index(key))
+	
+# Calls callback (on Tk's thread) after any of the given files is written,
+# replaced or deleted, so the GUI sees other processes' changes. Uses inotify
+# where there is one (Linux), and otherwise checks the files' sizes and mtimes
+# every WATCH_INTERVAL ms. callback returns False to be called again later
+class Watcher:
+	IN_MODIFY     = 0x002
+	IN_MOVED_TO   = 0x080
+	IN_CREATE     = 0x100
+	IN_DELETE     = 0x200
+	IN_Q_OVERFLOW = 0x4000 # Events were dropped
+	
+	def __init__(self, win: tk.Tk, paths: list, callback):
+		self.win      = win
+		self.callback = callback
+		self.names    = {os.path.basename(path) for path in paths}
+		self.paths    = paths
+		self.fd       = self.inotify({os.path.dirname(os.path.abspath(path)) for path in paths})
+		if self.fd is not None:
+			win.tk.createfilehandler(self.fd, tk.READABLE, self.read_events)
+		else:
+			self.sigs = [ItemHandler._stat(path) for path in paths]
+			win.after(WATCH_INTERVAL, self.poll)
+	
+	# inotify file descriptor watching the directories, or None if there's no inotify
+	def inotify(self, dirs: set):
+		if not hasattr(tk, "READABLE") or not sys.platform.startswith("linux"): return None
+		try:
+			libc = ctypes.CDLL(ctypes_util.find_library("c"), use_errno=True)
+			fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+			if fd < 0: return None
+			mask = self.IN_MODIFY | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+			for path in dirs:
+				if libc.inotify_add_watch(fd, path.encode(), mask) < 0:
+					os.close(fd)
+					return None
+			return fd
+		except (OSError, AttributeError):
+			return None
+	
+	# Reads the inotify events waiting, each a (wd, mask, cookie, len) header
+	# and a name of len bytes
+	def read_events(self, fd, mask):
+		changed = False
+		while True:
+			try:
+				data = os.read(self.fd, 1 << 16)
+			except BlockingIOError:
+				break
+			pos = 0
+			while pos < len(data):
+				_, event, _, length = struct.unpack_from("iIII", data, pos)
+				name = data[pos + 16 : pos + 16 + length].rstrip(b"\0").decode(errors="replace")
+				if name in self.names or event & self.IN_Q_OVERFLOW: changed = True
+				pos += 16 + length
+		if changed: self.notify()
+	
+	def notify(self):
+		if not self.callback(): self.win.after(WATCH_INTERVAL, self.notify)
+	
+	def poll(self):
+		sigs = [ItemHandler._stat(path) for path in self.paths]
+		if sigs == self.sigs or self.callback(): self.sigs = sigs
+		self.win.after(WATCH_INTERVAL, self.poll)
+	
+	def close(self):
+		if self.fd is not None:
+			self.win.tk.deletefilehandler(self.fd)
+			os.close(self.fd)
+
+# Serves the items as JSON over HTTP (todo.py serve), for scripts and other
+# devices. Routes, with names URL-encoded:
+#   GET    /items?sort=priority,-urgency&search=...&limit=&offset=&<col>=<value or min..max>
+#   GET    /items/<name>
+#   POST   /items           (an item, or a list of them, as for ItemHandler.add_items)
+#   PATCH  /items/<name>    (columns to change, as for ItemHandler.update_incomplete_item)
+#   DELETE /items/<name>
+#   GET    /choose?length_min=&length_max=&priority_min=&urgency_min=&enjoyability_min=&weighted=1&optimal=1&n=&due=soon|overdue
+#   GET    /stats
+# Runs on asyncio. Changes are queued for one writer task, which makes them
+# one at a time, in order. Responses to other GETs (but /choose's) are made
+# once per version of the items, and kept in a cache that's replaced, not
+# changed, on every change, so they're read from a consistent snapshot
+# The version, after a nonce per run, is their ETag, so clients polling with
+# If-None-Match get a 304 without anything being read, and never for a
+# version from before a restart. Changes other processes make are merged
+# (starting a new version) every WATCH_INTERVAL ms
+class Server:
+	MAX_BODY : int = 1 << 20 # Largest request body accepted, in bytes
+	EDITABLE : set = {"name", "description", "length", "reviewable", "in_progress", "priority", "urgency", "enjoyability", "complete", "start_date", "deadline"}
+	
+	def __init__(self, handler: ItemHandler, host: str = "127.0.0.1", port: int = SERVE_PORT):
+		self.handler = handler
+		self.host    = host
+		self.port    = port # The one listened on once started, if 0
+		self.version = 0
+		self.nonce   = f"{os.getpid():x}.{time.time_ns():x}" # Starts ETags, so ones from an earlier run never match
+		self.cache   = dict() # Request target: (status, body) at this version
+		self.queue   = None   # Changes (functions) for the writer task, with futures for their results
+		self.loop    = None   # Running run
+		self.stopping = None  # Set to stop run
+	
+	# Serves until stop() is called. started (a threading.Event) is set once listening
+	async def run(self, started: threading.Event = None) -> None:
+		self.loop = asyncio.get_running_loop()
+		self.queue = asyncio.Queue()
+		self.stopping = self.loop.create_future()
+		tasks = [asyncio.ensure_future(self.write_changes()), asyncio.ensure_future(self.sync_changes())]
+		server = await asyncio.start_server(self.serve, self.host, self.port)
+		self.port = server.sockets[0].getsockname()[1]
+		# Stop (and save changes waiting to be) when terminated, where possible
+		if threading.current_thread() is threading.main_thread():
+			with contextlib.suppress(NotImplementedError): self.loop.add_signal_handler(signal.SIGTERM, self._stop)
+		if started is not None: started.set()
+		try:
+			await self.stopping
+		finally:
+			server.close()
+			for task in tasks: task.cancel()
+	
+	# Stops run, from any thread
+	def stop(self) -> None:
+		self.loop.call_soon_threadsafe(self._stop)
+	
+	def _stop(self) -> None:
+		if not self.stopping.done(): self.stopping.set_result(None)
+	
+	# Answers the requests of a connection, keeping it open between them
+	async def serve(self, reader, writer) -> None:
+		try:
+			while True:
+				line = await reader.readline()
+				if not line: break
+				method, target, version = line.decode("latin-1").split()
+				headers = dict()
+				while True:
+					line = await reader.readline()
+					if line in (b"\r\n", b"\n", b""): break
+					key, _, val = line.decode("latin-1").partition(":")
+					headers[key.strip().lower()] = val.strip()
+				length = int(headers.get("content-length", 0))
+				if length > self.MAX_BODY:
+					await self.reply(writer, 413, self.error("Request body too large"), None, False)
+					break
+				body = await reader.readexactly(length)
+				keep_alive = headers.get("connection", "").lower() != "close" if version == "HTTP/1.1" else headers.get("connection", "").lower() == "keep-alive"
+				try:
+					status, payload, etag = await self.respond(method, target, headers, body)
+				except Exception as e:
+					status, payload, etag = 500, self.error(f"{type(e).__name__}: {e}"), None
+				await self.reply(writer, status, payload, etag, keep_alive)
+				if not keep_alive: break
+		except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			writer.close()
+	
+	async def reply(self, writer, status: int, payload: bytes, etag: str, keep_alive: bool) -> None:
+		head = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}"]
+		if status not in (204, 304): head += [f"Content-Length: {len(payload)}", "Content-Type: application/json"]
+		if etag   : head.append(f"ETag: {etag}")
+		if not keep_alive: head.append("Connection: close")
+		writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+		await writer.drain()
+	
+	# Returns (status, body, ETag or None)
+	async def respond(self, method: str, target: str, headers: dict, body: bytes) -> tuple:
+		url = urlparse.urlsplit(target)
+		path = [urlparse.unquote(part) for part in url.path.strip("/").split("/")]
+		query = {key: vals[-1] for key, vals in urlparse.parse_qs(url.query).items()}
+		
+		if method == "GET" and path == ["choose"]:
+			return self.choose(query) + (None,)
+		if method == "GET":
+			etag = self.etag()
+			if etag in headers.get("if-none-match", ""): return 304, b"", etag
+			cache = self.cache
+			if target not in cache: cache[target] = self.read(path, query)
+			return cache[target] + (etag,)
+		
+		if method not in ("POST", "PATCH", "DELETE"):
+			return 405, self.error(f"No {method} requests"), None
+		if path[0] != "items" or len(path) != (1 if method == "POST" else 2):
+			return 404, self.error(f"No {method} {url.path}"), None
+		try:
+			data = json.loads(body) if body else None
+		except ValueError as e:
+			return 400, self.error(f"Invalid JSON: {e}"), None
+		if   method == "POST"  : change = partial(self.add, data)
+		elif method == "PATCH" : change = partial(self.update, path[1], data)
+		else                   : change = partial(self.delete, path[1])
+		future = asyncio.get_running_loop().create_future()
+		await self.queue.put((change, future))
+		return (await future) + (None,)
+	
+	# Makes the queued changes one at a time, in order
+	async def write_changes(self) -> None:
+		while True:
+			change, future = await self.queue.get()
+			try:
+				result = change()
+			except Exception as e:
+				if future is not None: future.set_exception(e)
+			else:
+				if future is not None: future.set_result(result)
+	
+	async def sync_changes(self) -> None:
+		while True:
+			await asyncio.sleep(WATCH_INTERVAL / 1000)
+			await self.queue.put((self.sync, None))
+	
+	def sync(self) -> None:
+		if self.handler.sync() is not None: self.changed()
+	
+	# ETag of the current version
+	def etag(self) -> str:
+		return f'"{self.nonce}-{self.version}"'
+	
+	# Starts a new version (and cache) after a change
+	def changed(self) -> None:
+		self.version += 1
+		self.cache = dict()
+	
+	# Changes, made by the writer task. Return (status, body)
+	def add(self, items) -> tuple:
+		if isinstance(items, dict): items = [items]
+		if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+			return 400, self.error("Expected an item or a list of them")
+		# Dates may be given as ISO text, add_items parses them
+		errors = list()
+		for i, item in enumerate(items):
+			try:
+				ItemHandler._validate_update({col: val for col, val in item.items() if ItemHandler._columns.get(col) != "datetime64[ns]"})
+			except ValueError as e:
+				errors.append(f"Item {i + 1}: {e}")
+		if errors: return 400, self.error("\n".join(errors))
+		try:
+			added = self.handler.add_items(items)
+		except ValueError as e:
+			return 400, self.error(str(e))
+		self.changed()
+		return 201, self.json({"added": added})
+	
+	def update(self, name: str, cols) -> tuple:
+		if not isinstance(cols, dict) or not cols:
+			return 400, self.error("Expected the columns to change")
+		for col, val in cols.items():
+			if col not in self.EDITABLE:
+				return 400, self.error(f"Can't change {col}, only {sorted(self.EDITABLE)}")
+			if col in Schedule.COLS:
+				try:
+					cols[col] = ItemHandler.local_date(val)
+				except ValueError:
+					return 400, self.error(f"{col} {val!r} isn't an ISO date or null")
+		if self.handler.get_incomplete_item(name) is None:
+			return 404, self.error(f"No incomplete item named {name!r}")
+		try:
+			if not self.handler.update_incomplete_item(name, cols):
+				return 409, self.error(f"Name {cols['name']!r} already exists for another uncompleted task")
+		except ValueError as e:
+			return 400, self.error(str(e))
+		self.changed()
+		return 200, self.json({"updated": name})
+	
+	def delete(self, name: str) -> tuple:
+		if self.handler.get_incomplete_item(name) is None:
+			return 404, self.error(f"No incomplete item named {name!r}")
+		self.handler.delete_incomplete_item(name)
+		self.changed()
+		return 204, b""
+	
+	# Reads, of the current version. Return (status, body)
+	def read(self, path: list, query: dict) -> tuple:
+		if path == ["items"]:
+			try:
+				filters, order_by = dict(), [col for col in query.get("sort", "").split(",") if col]
+				for col, val in query.items():
+					if col == "search": filters[col] = val
+					elif col in ItemHandler._columns: filters[col] = ItemHandler.filter_value(col, val)
+				limit, offset = int(query["limit"]) if "limit" in query else None, int(query.get("offset", 0))
+				if offset < 0 or limit is not None and limit < 0: raise ValueError("limit and offset can't be negative")
+				keys = self.handler.query(filters, order_by or None, limit, offset)
+			except (KeyError, ValueError) as e:
+				return 400, self.error(f"Invalid query: {e}")
+			return 200, self.json([ItemHandler._plain(self.handler.get_item(key)) for key in keys])
+		if len(path) == 2 and path[0] == "items":
+			item = self.handler.get_incomplete_item(path[1])
+			if item is None: return 404, self.error(f"No incomplete item named {path[1]!r}")
+			return 200, self.json(ItemHandler._plain(item))
+		if path == ["stats"]:
+			return 200, self.json(self.handler.stats())
+		return 404, self.error(f"No GET /{'/'.join(path)}")
+	
+	def choose(self, query: dict) -> tuple:
+		options = ItemHandler._cboptions
+		try:
+			bounds = {
+				"length"      : (query.get("length_min", list(options["length"])[0]), query.get("length_max", list(options["length"])[-1])),
+				"priority"    : (list(options["priority"    ])[0], query.get("priority_min"    , list(options["priority"    ])[-1])),
+				"urgency"     : (list(options["urgency"     ])[0], query.get("urgency_min"     , list(options["urgency"     ])[-1])),
+				"enjoyability": (list(options["enjoyability"])[0], query.get("enjoyability_min", list(options["enjoyability"])[-1])),
+			}
+			n, weights = int(query.get("n", 1)), CHOOSE_WEIGHTS if query.get("weighted") == "1" else None
+			if "due" in query: names = self.handler.choose_due(Schedule.FILTERS[query["due"]], bounds, weights, query.get("optimal") == "1", n)
+			elif query.get("optimal") == "1": names = self.handler.recommend(bounds, n=n)
+			else: names = self.handler.choose_items(bounds, weights, n)
+		except (KeyError, ValueError) as e:
+			return 400, self.error(f"Invalid query: {e}")
+		return 200, self.json({"names": names})
+	
+	@staticmethod
+	def json(data) -> bytes:
+		return json.dumps(data, default=ItemHandler._encode).encode()
+	
+	@staticmethod
+	def error(message: str) -> bytes:
+		return Server.json({"error": message})
+
+# Formats ItemHandler.stats as lines of text, for the Stats tab and the
+# command line, with the latest of its weeks
+def stats_lines(stats: dict, weeks: int = 12) -> list:
+	lines = [f"{stats['open']} open tasks, {stats['in_progress']} in progress", ""]
+	for col, counts in stats["by"].items():
+		lines.append(f"{col.capitalize():13} " + "   ".join(f"{cat}: {count}" for cat, count in counts.items()))
+	
+	urgencies = list(ItemHandler._cboptions["urgency"])
+	lines += ["", f"{'Priority':13} " + "".join(f"{urgency:>15}" for urgency in urgencies)]
+	for priority, counts in stats["priority_by_urgency"].items():
+		lines.append(f"{priority:13} " + "".join(f"{counts[urgency]:15}" for urgency in urgencies))
+	
+	if stats["age_days"]:
+		lines += ["", "Age (days)    " + "   ".join(
+			f"{'max' if p == 100 else f'p{p}'}: {age:.0f}" for p, age in stats["age_days"].items()
+		)]
+	lines += ["", f"{'Week of':13} {'Created':>10} {'Completed':>10}"]
+	for monday, counts in list(stats["weeks"].items())[-weeks:]:
+		lines.append(f"{monday:13} {counts['created']:10} {counts['completed']:10}")
+	return lines
+
+# Formats a reminder (see ItemHandler.reminders) as a line of text, for the
+# GUI and todo.py remind
+def reminder_line(when: datetime.datetime, col: str, name: str) -> str:
+	return f"{when:%Y-%m-%d %H:%M}  {name} " + ("is due" if col == "deadline" else "can be started")
+
+@instrumented
+class GUI:
+	items_handler : ItemHandler
+	win_main      : tk.Tk
+	tab_control   : ttk.Notebook
+	tab_choose    : tk.Frame
+	tab_insert    : tk.Frame
+	tab_view      : VirtualGrid
+	frm_view      : tk.Frame   # View tab: search box above tab_view
+	str_search    : tk.StringVar # View tab's search box
+	view_bg       : str        # Default background of the View tab's labels
+	view_cache    : dict # Key: its View row's (item name, ((text, color), ...)), see view_row
+	view_shown    : dict # View label: its (text, fg, bg), or Edit button: its item's name
+	sort_col      : str  = "" # Column used to sort
+	sort_asc      : bool = True            # Sort ascending?
+	watcher       : Watcher = None # Sees other processes' changes to the items
+	tab_metrics   : tk.Frame # Hidden until F12 is pressed, see build_tab_metrics
+	txt_metrics   : tk.Text
+	tab_stats     : tk.Frame # Shape of the backlog, see ItemHandler.stats
+	txt_stats     : tk.Text
+	# Insert Item
+	txt_name   : tk.Entry     # Name
+	txt_desc   : tk.Text      # Description
+	cbx_leng   : ttk.Combobox # Length
+	cbx_prior  : ttk.Combobox # Priority
+	cbx_urge   : ttk.Combobox # Urgency
+	cbx_enjoy  : ttk.Combobox # Enjoyability
+	int_review : tk.IntVar    # Is reviewable
+	txt_start  : tk.Entry     # Start date (see parse_date)
+	txt_due    : tk.Entry     # Deadline
+	# Choose Item
+	cbx_leng_min    : ttk.Combobox    # Length Min
+	cbx_leng_max    : ttk.Combobox    # Length Max
+	cbx_prior_min   : ttk.Combobox    # Priority Min
+	cbx_urge_min    : ttk.Combobox    # Urgency Min
+	cbx_enjoy_min   : ttk.Combobox    # Enjoyability Min
+	int_weighted    : tk.IntVar       # Favor categories in CHOOSE_WEIGHTS
+	int_optimal     : tk.IntVar       # Choose the best item by RECOMMEND_WEIGHTS instead
+	cbx_due         : ttk.Combobox    # Only items overdue or due soon, see due_filters
+	frm_chosen_item : tk.Frame        # Displays the chosen item, built once (see build_frm_chosen)
+	frm_chosen_rows : tk.Frame        # Its columns and buttons, hidden when nothing was found
+	lbl_chosen      : dict            # Column: label showing the chosen item's value
+	lbl_chosen_count: tk.Label        # Number of items matching
+	lbl_chosen_none : tk.Label        # Shown instead of frm_chosen_rows when nothing was found
+	chosen_name     : str = None      # Name of the chosen item, skipped (see Rejections) if another is chosen
+	# Edit Item (popup window, built once and hidden between edits, see build_win_edit)
+	win_edit             : tk.Toplevel  # View popup window
+	txt_edit_name        : tk.Entry     # Name
+	txt_edit_desc        : tk.Text      # Description
+	cbx_edit_leng        : ttk.Combobox # Length
+	cbx_edit_prior       : ttk.Combobox # Priority
+	cbx_edit_urge        : ttk.Combobox # Urgency
+	cbx_edit_enjoy       : ttk.Combobox # Enjoyability
+	int_edit_review      : tk.IntVar    # Is reviewable
+	int_edit_in_progress : tk.IntVar    # In progress
+	int_edit_complete    : tk.IntVar    # Complete
+	txt_edit_start       : tk.Entry     # Start date
+	txt_edit_due         : tk.Entry     # Deadline
+	remove_frm_chosen    : bool         # Whether to remove frame in Choose
+	edit_name            : str          # Name of the item being edited
+	edit_key             = None         # and its key
+	edit_sort_val        = None         # and its sort_col value before it was edited
+	edit_by_choose       : bool         # Whether it was opened from Choose
+	reminder_timer       = None         # Tk after() id of the timer for the next reminder, see remind
+	
+	# Category: color, of each column with categories, for the View and Choose tabs
+	colors: dict = {
+		col: {cat: opts["color"] for cat, opts in cats.items()}
+		for col, cats in ItemHandler._cboptions.items()
+	}
+	
+	# Choices of Choose's due filter: how soon items' deadlines must be (see ItemHandler.due)
+	due_filters: dict = {
+		"Any deadline"        : None,
+		f"Due in {DUE_SOON} days": Schedule.FILTERS["soon"],
+		"Overdue"             : Schedule.FILTERS["overdue"],
+	}
+	
+	def __init__(self, items_handler: ItemHandler):
+		self.items_handler = items_handler
+		self.view_cache = dict()
+		self.view_shown = dict()
+		
+	# Columns of the View tab: header, width, item column
+	view_cols: list = [
+		("Name"    , 30, "name"         ),
+		("Length"  , 13, "length"       ),
+		("Priority", 9 , "priority"     ),
+		("Urgency" , 13, "urgency"      ),
+		("Enjoy"   , 6 , "enjoyability" ),
+		("Created" , 10, "creation_date"),
+		("InProg"  , 6 , "in_progress"  ),
+	]
+	
+	# Displays items as rows in View tab, sorted by the given column
+	# Only the rows on screen have widgets, see VirtualGrid
+	def disp_items(self, sort_col: str, keep_sort: bool = False):
+		if sort_col == self.sort_col and not keep_sort:
+			self.sort_asc = not self.sort_asc
+		else:
+			self.sort_asc = True
+		self.sort_col = sort_col
+		self.show_items(None if keep_sort else 0)
+	
+	# Displays the items matching the search box in View tab, in the current
+	# order, scrolled to the given row (or where it was)
+	def show_items(self, first: int = None):
+		# Rows are keyed by their index in items
+		keys = self.items_handler.query(
+			{"search": self.str_search.get()},
+			[("" if self.sort_asc else "-") + self.sort_col]
+		)
+		self.tab_view.set_rows(keys, first)
+	
+	# Makes the widgets for a row of the View tab's grid
+	# The Edit button's command is set once, and looks up the row's item
+	@untimed
+	def make_view_row(self, frame: tk.Frame, grid_row: int) -> list:
+		widgets = list()
+		for col_idx, (_, width, _) in enumerate(self.view_cols):
+			lbl = tk.Label(frame, width=width, anchor="w")
+			self.view_bg = lbl.cget("bg")
+			lbl.grid(row=grid_row, column=col_idx, sticky="w")
+			widgets.append(lbl)
+		btn = tk.Button(frame, width=5, text="Edit")
+		btn.configure(command=lambda: self.edit_item(self.view_shown[btn]))
+		btn.grid(row=grid_row, column=len(self.view_cols), sticky="w")
+		widgets.append(btn)
+		return widgets
+	
+	# Displays the item with the given index in a row of the View tab's grid
+	# Only reconfigures the labels showing something else than before, since
+	# each configure is a round trip through Tcl
+	@untimed
+	def fill_view_row(self, widgets: list, key):
+		name, cells = self.view_row(key)
+		shown = self.view_shown
+		for lbl, (text, fg), (_, _, col) in zip(widgets, cells, self.view_cols):
+			style = (text, fg, "white" if col == self.sort_col else self.view_bg)
+			if shown.get(lbl) != style:
+				lbl.configure(text=text, fg=fg, bg=style[2])
+				shown[lbl] = style
+		shown[widgets[-1]] = name
+	
+	# The name of the item with the given key, and the text and color of each
+	# of its View cells. Cached until it's changed (see refresh_view_item),
+	# so scrolling doesn't read the items again
+	@untimed
+	def view_row(self, key) -> tuple:
+		row = self.view_cache.get(key)
+		if row is None:
+			item = self.items_handler.get_item(key)
+			cells = list()
+			for _, _, col in self.view_cols:
+				if   col == "in_progress"   : text = "✓" if item["in_progress"] else ""
+				elif col == "creation_date" : text = str(item[col].date())
+				else                        : text = item[col]
+				cells.append((text, self.colors[col][text] if col in self.colors else "black"))
+			row = self.view_cache[key] = (item["name"], tuple(cells))
+		return row
+	
+	# Updates the View tab after the item with the given index was edited
+	# Only redraws its row, unless it was moved or removed
+	def refresh_view_item(self, key, sort_val):
+		self.view_cache.pop(key, None)
+		item = self.items_handler.get_item(key)
+		if item is not None and not item["complete"] and item[self.sort_col] == sort_val and not self.str_search.get().strip():
+			self.tab_view.refresh_row(key)
+		else:
+			self.disp_items(self.sort_col, keep_sort=True)
+		
+	# Sets the item to be in_progress
+	def commit_item(self, name: str):
+		self.hide_chosen()
+		self.items_handler.rejections.forget(name)
+		# Read before updating, as the array engine's items are live views
+		item = self.items_handler.get_incomplete_item(name)
+		key, sort_val = item.name, item[self.sort_col]
+		self.items_handler.update_incomplete_item(
+			name, {"in_progress": True}
+		)
+		self.refresh_view_item(key, sort_val)
+	
+	# Displays a randomly generated item following given parameters, or the
+	# best one if "Optimal" is checked. Items already shown aren't shown
+	# again until every matching one was (see ItemHandler.draw), and the one
+	# shown is counted as skipped
+	def choose_item(self):
+		# Generate a random item
+		first = lambda col: list(ItemHandler._cboptions[col].keys())[0]
+		bounds = {
+			"length"      : (self.cbx_leng_min.get(), self.cbx_leng_max.get()),
+			"priority"    : (first("priority")      , self.cbx_prior_min.get()),
+			"urgency"     : (first("urgency")       , self.cbx_urge_min .get()),
+			"enjoyability": (first("enjoyability")  , self.cbx_enjoy_min.get()),
+		}
+		due = self.due_filters[self.cbx_due.get()]
+		if self.chosen_name is not None: self.items_handler.rejections.add(self.chosen_name)
+		self.chosen_name = self.items_handler.draw(
+			bounds, CHOOSE_WEIGHTS if self.int_weighted.get() else None, bool(self.int_optimal.get()), due
+		)
+		self.frm_chosen_item.pack(side=tk.TOP)
+		if self.chosen_name is None:
+			self.frm_chosen_rows.pack_forget()
+			self.lbl_chosen_none.pack()
+			return
+		item = self.items_handler.get_incomplete_item(self.chosen_name)
+		if due is None:
+			matching = self.items_handler.count_candidates(bounds)
+		else:
+			matching = len(self.items_handler.due(due, bounds))
+		
+		# Display the item
+		for col, lbl in self.lbl_chosen.items():
+			if col == "deadline":
+				lbl.configure(text=self.format_date(item[col]) or "None")
+				continue
+			lbl.configure(text=item[col], fg=self.colors[col][item[col]] if col in self.colors else "black")
+		self.lbl_chosen_count.configure(text=f"({'next best' if self.int_optimal.get() else 'one'} of {matching} matching tasks)")
+		self.lbl_chosen_none.pack_forget()
+		self.frm_chosen_rows.pack(side=tk.TOP, anchor="w", fill=tk.X)
+	
+	# Builds the frame choose_item displays the chosen item in, hidden
+	def build_frm_chosen(self):
+		frm = self.frm_chosen_item = tk.Frame(self.tab_choose, borderwidth=2, relief=tk.RAISED)
+		self.lbl_chosen_none = tk.Label(frm, text="No items found!")
+		self.frm_chosen_rows = tk.Frame(frm)
+		
+		# Columns
+		self.lbl_chosen = dict()
+		for name, col in [("Name", "name"), ("Length", "length"), ("Priority", "priority"), ("Urgency", "urgency"), ("Enjoyability", "enjoyability"), ("Deadline", "deadline")]:
+			subframe = tk.Frame(self.frm_chosen_rows)
+			tk.Label(subframe, text=name, width=13, anchor="w").pack(side=tk.LEFT)
+			self.lbl_chosen[col] = tk.Label(subframe, anchor="w")
+			self.lbl_chosen[col].pack(side=tk.LEFT, fill=tk.X, expand=1)
+			subframe.pack(side=tk.TOP, anchor="w", fill=tk.X)
+		self.lbl_chosen_count = tk.Label(self.frm_chosen_rows, anchor="w")
+		self.lbl_chosen_count.pack(side=tk.TOP, anchor="w")
+		
+		# Buttons
+		subframe = tk.Frame(self.frm_chosen_rows)
+		tk.Button(subframe, text="Commit", command=lambda: self.commit_item(self.chosen_name)).pack(fill=tk.X)
+		tk.Button(subframe, text="Edit", command=lambda: self.edit_item(self.chosen_name, True)).pack(fill=tk.X)
+		subframe.pack(side=tk.TOP, anchor="w", fill=tk.X)
+	
+	# Hides the chosen item, e.g. once it's in progress, so it isn't skipped
+	def hide_chosen(self):
+		self.frm_chosen_item.pack_forget()
+		self.chosen_name = None
+	
+	# Opens the popup for viewing the item, filled in with it
+	def edit_item(self, name: str, called_by_choose: bool = False):
+		item = self.items_handler.get_incomplete_item(name)
+		self.edit_name, self.edit_by_choose = name, called_by_choose
+		self.edit_key, self.edit_sort_val = item.name, item[self.sort_col]
+		self.remove_frm_chosen = False # Whether or not we should remove the frame in Choose tab
+		
+		self.txt_edit_name.delete(0, tk.END)
+		self.txt_edit_name.insert(0, item["name"])
+		self.txt_edit_desc.delete(1.0, tk.END)
+		self.txt_edit_desc.insert(1.0, item["description"])
+		self.cbx_edit_leng .set(item["length"])
+		self.cbx_edit_prior.set(item["priority"])
+		self.cbx_edit_urge .set(item["urgency"])
+		self.cbx_edit_enjoy.set(item["enjoyability"])
+		self.txt_edit_start.delete(0, tk.END)
+		self.txt_edit_start.insert(0, self.format_date(item["start_date"]))
+		self.txt_edit_due  .delete(0, tk.END)
+		self.txt_edit_due  .insert(0, self.format_date(item["deadline"]))
+		self.int_edit_review     .set(int(item["reviewable"]))
+		self.int_edit_complete   .set(0)
+		self.int_edit_in_progress.set(int(item["in_progress"]))
+		
+		self.win_edit.deiconify()
+		self.win_edit.grab_set()
+		self.txt_edit_name.focus_set()
+	
+	# Hides the popup, and updates the View and Choose tabs for the edit
+	def close_edit(self):
+		self.win_edit.grab_release()
+		self.win_edit.withdraw()
+		self.refresh_view_item(self.edit_key, self.edit_sort_val)
+		if self.edit_by_choose and self.remove_frm_chosen: self.hide_chosen()
+	
+	# Builds the popup edit_item shows, hidden. It's hidden again rather than
+	# destroyed when closed, so editing only fills it in
+	def build_win_edit(self):
+		self.win_edit = tk.Toplevel(self.win_main)
+		self.win_edit.withdraw()
+		self.win_edit.title("Edit Task")
+		self.win_edit.geometry(WINDOW_GEOMETRY)
+		self.win_edit.option_add("*Font", FONT)
+		self.win_edit.protocol("WM_DELETE_WINDOW", self.close_edit)
+		
+		# Build the UI
+		frm_edit = tk.Frame(self.win_edit)
+		
+		# Name
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Name", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.txt_edit_name = tk.Entry(subframe)
+		self.txt_edit_name.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Description
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Description", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.txt_edit_desc = tk.Text(subframe, height=5)
+		self.txt_edit_desc.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Length
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Length", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_edit_leng = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
+		self.cbx_edit_leng.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Priority
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Priority", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_edit_prior = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
+		self.cbx_edit_prior.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Urgency
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Urgency", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_edit_urge = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
+		self.cbx_edit_urge.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Enjoyability
+		subframe = tk.Frame(frm_edit)
+		tk.Label(subframe, text="Enjoyability", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_edit_enjoy = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
+		self.cbx_edit_enjoy.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Dates
+		subframe = tk.Frame(frm_edit)
+		self.txt_edit_start, self.txt_edit_due = self.make_date_entries(subframe)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Checkboxes
+		subframe = tk.Frame(frm_edit)
+		self.int_edit_review = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_edit_review, text="Is reviewable").pack(side=tk.LEFT)
+		
+		self.int_edit_complete = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_edit_complete, text="Complete").pack(side=tk.LEFT)
+		
+		self.int_edit_in_progress = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_edit_in_progress, text="In Progress").pack(side=tk.LEFT)
+		subframe.pack()
+		
+		# Buttons
+		def apply_wrapper():
+			self.remove_frm_chosen = self.int_edit_complete.get() or self.int_edit_in_progress.get()
+			self.edit_apply(self.edit_name)
+		def delete_wrapper():
+			self.remove_frm_chosen = True
+			self.edit_delete(self.edit_name)
+		tk.Button(frm_edit, text="Apply",  command=apply_wrapper ).pack(fill=tk.X)
+		tk.Button(frm_edit, text="Delete", command=delete_wrapper).pack(fill=tk.X)
+		
+		frm_edit.pack()
+	
+	# Applies views to the item in the dataframe and View tab
+	def edit_apply(self, name: str):
+		try:
+			start_date, deadline = self.parse_date(self.txt_edit_start.get()), self.parse_date(self.txt_edit_due.get())
+			result = self.items_handler.update_incomplete_item(name, {
+				"name":          self.txt_edit_name.get(),
+				"description":   self.txt_edit_desc.get("1.0", tk.END)[:-1],
+				"length":        self.cbx_edit_leng.get(),
+				"reviewable":    bool(self.int_edit_review .get()),
+				"in_progress":   bool(self.int_edit_in_progress.get()),
+				"priority":      self.cbx_edit_prior.get(),
+				"urgency":       self.cbx_edit_urge.get(),
+				"enjoyability":  self.cbx_edit_enjoy.get(),
+				"complete":      bool(self.int_edit_complete.get()),
+				"start_date":    start_date,
+				"deadline":      deadline,
+			})
+		except ValueError as e:
+			messagebox.showerror(title="ERROR", message=str(e))
+			return
+		
+		# Was name already taken?
+		if result == False:
+			messagebox.showerror(title="ERROR", message="Name already exists for another uncompleted task. Uncompleted task names must be unique")
+		else:
+			self.edit_name = self.txt_edit_name.get()
+			self.remind()
+		
+	# Deletes the given item from the dataframe and View tab
+	def edit_delete(self, name: str):
+		self.items_handler.delete_incomplete_item(name)
+		self.close_edit()
+			
+	# Inserts an item into the dataframe, writes the CSV, and updates View tab
+	def insert_item(self):
+		name = self.txt_name.get()
+		if name.strip() == "":
+			messagebox.showerror(title="ERROR", message="Please enter a name")
+			return
+		if self.items_handler.get_incomplete_item(name) is not None:
+			messagebox.showerror(title="ERROR", message="Name already exists for another uncompleted task. Uncompleted task names must be unique")
+			return
+		try:
+			start_date, deadline = self.parse_date(self.txt_start.get()), self.parse_date(self.txt_due.get())
+		except ValueError as e:
+			messagebox.showerror(title="ERROR", message=str(e))
+			return
+		item = {
+			"name":          self.txt_name.get(),
+			"description":   self.txt_desc.get("1.0", tk.END)[:-1],
+			"length":        self.cbx_leng.get(),
+			"reviewable":    self.int_review.get(),
+			"in_progress":   False,
+			"priority":      self.cbx_prior.get(),
+			"urgency":       self.cbx_urge.get(),
+			"enjoyability":  self.cbx_enjoy.get(),
+			"creation_date": datetime.datetime.now(),
+			"complete":      False,
+			"start_date":    start_date,
+			"deadline":      deadline,
+		}
+		# Add to data frame and export
+		self.items_handler.add_item(item)
+		self.view_cache.clear() # Its key may be a removed item's
+		# Clear fields
+		self.txt_name  .delete(0  , tk.END)
+		self.txt_desc  .delete(1.0, tk.END)
+		self.cbx_leng  .set(list(ItemHandler._cboptions["length"      ].keys())[0])
+		self.cbx_prior .set(list(ItemHandler._cboptions["priority"    ].keys())[0])
+		self.cbx_urge  .set(list(ItemHandler._cboptions["urgency"     ].keys())[0])
+		self.cbx_enjoy .set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
+		self.int_review.set(False)
+		self.txt_start .delete(0  , tk.END)
+		self.txt_due   .delete(0  , tk.END)
+		# Re-display items
+		self.disp_items(self.sort_col, keep_sort=True)
+		self.remind()
+	
+	# Makes a start date and a deadline entry side by side, returning them
+	def make_date_entries(self, frame: tk.Frame) -> tuple:
+		entries = list()
+		for text in ["Start date", "Deadline"]:
+			tk.Label(frame, text=text, width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+			entries.append(tk.Entry(frame))
+			entries[-1].pack(side=tk.LEFT, fill=tk.X, expand=1)
+		return tuple(entries)
+	
+	# Date typed in a form, as YYYY-MM-DD with an optional HH:MM, or None if
+	# left empty. Raises ValueError if it's not a date
+	@staticmethod
+	def parse_date(text: str):
+		text = text.strip()
+		if not text: return None
+		try:
+			return datetime.datetime.fromisoformat(text)
+		except ValueError:
+			raise ValueError(f"{text!r} isn't a date, enter one as YYYY-MM-DD or YYYY-MM-DD HH:MM")
+	
+	# Inverse of parse_date, leaving out midnight's time
+	@staticmethod
+	def format_date(val) -> str:
+		val = Archive._value(val)
+		if val is None: return ""
+		return f"{val:%Y-%m-%d}" if (val.hour, val.minute) == (0, 0) else f"{val:%Y-%m-%d %H:%M}"
+		
+	# TODO
+	def build_tab_insert(self):
+		self.tab_insert = tk.Frame(self.tab_control)
+		
+		# Name
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Name", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.txt_name = tk.Entry(subframe)
+		self.txt_name.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Description
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Description", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.txt_desc = tk.Text(subframe, height=5)
+		self.txt_desc.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Length
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Length", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_leng = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
+		self.cbx_leng.set(list(ItemHandler._cboptions["length"].keys())[0])
+		self.cbx_leng.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Priority
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Priority", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_prior = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
+		self.cbx_prior.set(list(ItemHandler._cboptions["priority"].keys())[0])
+		self.cbx_prior.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Urgency
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Urgency", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_urge = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
+		self.cbx_urge.set(list(ItemHandler._cboptions["urgency"].keys())[0])
+		self.cbx_urge.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Enjoyability
+		subframe = tk.Frame(self.tab_insert)
+		tk.Label(subframe, text="Enjoyability", width=12, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_enjoy = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
+		self.cbx_enjoy.set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
+		self.cbx_enjoy.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Dates
+		subframe = tk.Frame(self.tab_insert)
+		self.txt_start, self.txt_due = self.make_date_entries(subframe)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Checkboxes
+		subframe = tk.Frame(self.tab_insert)
+		self.int_review = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_review, text="Is reviewable").pack(side=tk.LEFT)
+		subframe.pack()
+		
+		# Insert button
+		tk.Button(self.tab_insert, text="Insert", command=self.insert_item).pack(fill=tk.X)
+		
+		self.tab_insert.pack()
+		
+	def build_tab_view(self):
+		self.frm_view = tk.Frame(self.tab_control)
+		
+		# Search box, filtering the items as it's typed in
+		subframe = tk.Frame(self.frm_view)
+		tk.Label(subframe, text="Search").pack(side=tk.LEFT)
+		self.str_search = tk.StringVar()
+		self.str_search.trace_add("write", lambda *args: self.show_items(0))
+		tk.Entry(subframe, textvariable=self.str_search).pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		self.tab_view = VirtualGrid(self.frm_view, self.make_view_row, self.fill_view_row)
+		
+		# Not sure this does anything
+		for i in range(8):
+			self.tab_view.frame.grid_columnconfigure(i, weight=1)
+		
+		# Makes a column header (button)
+		def make_col(text, width, data, col):
+			tk.Button(self.tab_view.frame, text=text, width=width, relief=tk.RAISED, command=lambda: self.disp_items(data)).grid(row=0, column=col, sticky="w")
+		
+		# Column headers
+		for col_idx, (text, width, data) in enumerate(self.view_cols):
+			make_col(text, width, data, col_idx)
+		tk.Button(self.tab_view.frame, text="Edit", width=5, relief=tk.RAISED).grid(row=0, column=7, sticky="w")
+		
+		# Items (and initial sorting)
+		self.disp_items("creation_date")
+		
+		self.tab_view.widget.pack(fill="both", expand=True)
+		
+	def build_tab_choose(self):
+		self.tab_choose = tk.Frame(self.tab_control)
+		# cboptions = ItemHandler._cboptions["length"].keys() # alias
+		
+		# Length Min
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="Length       Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_leng_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
+		self.cbx_leng_min.set(list(ItemHandler._cboptions["length"].keys())[0])
+		self.cbx_leng_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Length Max
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="             Max", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_leng_max = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["length"].keys()))
+		self.cbx_leng_max.set(list(ItemHandler._cboptions["length"].keys())[0])
+		self.cbx_leng_max.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Priority Min
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="Priority     Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_prior_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["priority"].keys()))
+		self.cbx_prior_min.set(list(ItemHandler._cboptions["priority"].keys())[0])
+		self.cbx_prior_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Urgency Min
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="Urgency      Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_urge_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["urgency"].keys()))
+		self.cbx_urge_min.set(list(ItemHandler._cboptions["urgency"].keys())[0])
+		self.cbx_urge_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Enjoyability Min
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="Enjoyability Min", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_enjoy_min = ttk.Combobox(subframe, state="readonly", values=list(ItemHandler._cboptions["enjoyability"].keys()))
+		self.cbx_enjoy_min.set(list(ItemHandler._cboptions["enjoyability"].keys())[0])
+		self.cbx_enjoy_min.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Deadline
+		subframe = tk.Frame(self.tab_choose)
+		tk.Label(subframe, text="Deadline", width=16, borderwidth=2, anchor="w").pack(side=tk.LEFT)
+		self.cbx_due = ttk.Combobox(subframe, state="readonly", values=list(self.due_filters.keys()))
+		self.cbx_due.set(list(self.due_filters.keys())[0])
+		self.cbx_due.pack(side=tk.LEFT, fill=tk.X, expand=1)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		
+		# Checkboxes
+		subframe = tk.Frame(self.tab_choose)
+		self.int_weighted = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_weighted, text="Weighted").pack(side=tk.LEFT)
+		self.int_optimal = tk.IntVar()
+		tk.Checkbutton(subframe, variable=self.int_optimal, text="Optimal").pack(side=tk.LEFT)
+		subframe.pack()
+		
+		# Choose button
+		tk.Button(self.tab_choose, text="Choose", command=self.choose_item).pack(fill=tk.X)
+		self.build_frm_chosen()
+		
+		self.tab_choose.pack()
+	
+	# Reports an error saving changes. Called on the writer's thread, so the
+	# message is shown from Tk's
+	def report_write_error(self, error: Exception):
+		self.win_main.after(0, lambda: messagebox.showerror(
+			title="ERROR", message=f"Couldn't save changes, will retry with the next ones:\n{error}"
+		))
+	
+	# Merges other processes' changes to the items (see ItemHandler.sync)
+	# Returns False if changes made here are still being saved, to be called later
+	def sync_items(self) -> bool:
+		if self.items_handler.saving(): return False
+		conflicts = self.items_handler.sync()
+		if conflicts is None: return True
+		self.view_cache.clear()
+		self.disp_items(self.sort_col, keep_sort=True)
+		self.remind()
+		if conflicts:
+			messagebox.showwarning(title="WARNING", message=(
+				"These tasks were also changed by another program, whichever change was saved last was kept:\n" +
+				"\n".join(conflicts)
+			))
+		return True
+	
+	# Shows the start dates and deadlines that passed since the last call, and
+	# sets a timer to be called again when the next one does (see Schedule).
+	# A single timer is kept, re-set whenever the dates may have changed, and
+	# it waits at most REMIND_MAX_WAIT seconds, so a clock change is noticed
+	def remind(self):
+		if self.reminder_timer is not None: self.win_main.after_cancel(self.reminder_timer)
+		lines = [reminder_line(*reminder) for reminder in self.items_handler.reminders()]
+		when = self.items_handler.next_reminder()
+		wait = REMIND_MAX_WAIT if when is None else (when - datetime.datetime.now()).total_seconds()
+		self.reminder_timer = self.win_main.after(int(min(max(wait, 0), REMIND_MAX_WAIT) * 1000) + 1, self.remind)
+		if lines: messagebox.showinfo(title="REMINDER", message="\n".join(lines))
+	
+	# Saves any changes waiting to be before closing the window
+	def close(self):
+		try:
+			self.items_handler.flush()
+		except Exception as e:
+			if not messagebox.askyesno(title="ERROR", message=f"Couldn't save changes:\n{e}\n\nClose anyway?"):
+				return
+		if self.watcher is not None: self.watcher.close()
+		self.win_main.destroy()
+		
+	# Shows the shape of the backlog, refreshed whenever the tab is opened
+	def build_tab_stats(self):
+		self.tab_stats = tk.Frame(self.tab_control)
+		self.txt_stats = tk.Text(self.tab_stats, wrap="none")
+		self.txt_stats.pack(expand=True, fill="both")
+		self.tab_control.bind("<<NotebookTabChanged>>", self.show_stats, add="+")
+	
+	def show_stats(self, event=None):
+		if self.tab_control.select() != str(self.tab_stats): return
+		self.txt_stats.delete("1.0", tk.END)
+		self.txt_stats.insert("1.0", "\n".join(stats_lines(self.items_handler.stats())))
+	
+	# Shows metrics (see Metrics) in a hidden tab, toggled with F12
+	def build_tab_metrics(self):
+		self.tab_metrics = tk.Frame(self.tab_control)
+		subframe = tk.Frame(self.tab_metrics)
+		tk.Button(subframe, text="Refresh", command=self.show_metrics).pack(side=tk.LEFT)
+		tk.Button(subframe, text=f"Save to {METRICS_FILE}", command=partial(METRICS.dump, METRICS_FILE)).pack(side=tk.LEFT)
+		subframe.pack(side=tk.TOP, fill=tk.X)
+		self.txt_metrics = tk.Text(self.tab_metrics, wrap="none")
+		self.txt_metrics.pack(expand=True, fill="both")
+	
+	def show_metrics(self):
+		stats = METRICS.snapshot()
+		lines = [f"{'Span':48} {'Calls':>8} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}"]
+		for name, span in stats["spans"].items():
+			lines.append(f"{name:48} {span['calls']:8} {span['total_s'] * 1000:10.1f} {span['mean_s'] * 1000:9.3f} {span['max_s'] * 1000:9.1f}")
+		lines.append("")
+		for name, total in stats["counters"].items():
+			lines.append(f"{name:48} {total:>10}")
+		for profile in stats["profiles"][-5:]:
+			lines += ["", f"{profile['name']} at {profile['time']}: {profile['seconds'] * 1000:.1f} ms"]
+			lines += [f"  {func['total_s'] * 1000:9.1f} ms {func['calls']:8} {func['function']}" for func in profile["functions"][:10]]
+		self.txt_metrics.delete("1.0", tk.END)
+		self.txt_metrics.insert("1.0", "\n".join(lines))
+	
+	def toggle_metrics(self, event=None):
+		if str(self.tab_metrics) in self.tab_control.tabs():
+			self.tab_control.forget(self.tab_metrics)
+		else:
+			self.tab_control.add(self.tab_metrics, text="Metrics")
+			self.tab_control.select(self.tab_metrics)
+			self.show_metrics()
+	
+	# Runs the event loop, so it isn't timed (see untimed)
+	@untimed
+	def build_gui(self):
+		METRICS.count_widgets()
+		self.win_main = tk.Tk()
+		self.win_main.title("TODO")
+		self.win_main.geometry(WINDOW_GEOMETRY)
+		self.win_main.option_add("*Font", FONT)
+		self.win_main.protocol("WM_DELETE_WINDOW", self.close)
+		self.items_handler.on_error = self.report_write_error
+		self.tab_control = ttk.Notebook(self.win_main)
+		self.build_tab_choose()
+		self.build_tab_insert()
+		self.build_tab_view()
+		self.tab_control.add(self.tab_choose, text='Choose')
+		self.tab_control.add(self.tab_insert, text='Insert')
+		self.tab_control.add(self.frm_view, text='View')
+		self.build_tab_stats()
+		self.tab_control.add(self.tab_stats, text='Stats')
+		self.build_tab_metrics()
+		self.build_win_edit()
+		self.win_main.bind("<F12>", self.toggle_metrics)
+		self.tab_control.pack(expand=True, fill="both")
+		files = self.items_handler.watched_files()
+		self.watcher = Watcher(self.win_main, files, self.sync_items) if files else None
+		self.remind()
+		self.win_main.mainloop()
+	
+# ItemHandler classes selectable with ITEMS_ENGINE
+ITEM_HANDLERS: dict = {
+	"pandas": ItemHandler,
+	"sqlite": SQLiteItemHandler,
+	"array" : ArrayItemHandler,
+}
+
+# Without a command, opens the GUI. The other commands are headless, and with
+# the sqlite engine never import pandas or tkinter, so they start quickly
+def main():
+	options = ItemHandler._cboptions
+	parser = argparse.ArgumentParser(description="Tracks tasks. Opens the GUI when no command is given")
+	parser.add_argument("--engine", choices=list(ITEM_HANDLERS), default=ITEMS_ENGINE, help="how items are stored")
+	parser.add_argument("--profile", action="store_true", help="profile each interaction (see Metrics), slowly")
+	parser.add_argument("--metrics", metavar="PATH", help="save timings and counters (and profiles) as JSON on exit")
+	commands = parser.add_subparsers(dest="command")
+	
+	cmd = commands.add_parser("choose", help="print a random (or the best) task that isn't in progress")
+	cmd.add_argument("--length-min"      , choices=list(options["length"      ]), default=list(options["length"      ])[ 0])
+	cmd.add_argument("--length-max"      , choices=list(options["length"      ]), default=list(options["length"      ])[-1])
+	cmd.add_argument("--priority-min"    , choices=list(options["priority"    ]), default=list(options["priority"    ])[-1])
+	cmd.add_argument("--urgency-min"     , choices=list(options["urgency"     ]), default=list(options["urgency"     ])[-1])
+	cmd.add_argument("--enjoyability-min", choices=list(options["enjoyability"]), default=list(options["enjoyability"])[-1])
+	cmd.add_argument("--weighted", action="store_true", help="favor the categories in CHOOSE_WEIGHTS")
+	cmd.add_argument("--optimal", action="store_true", help="print the best tasks by RECOMMEND_WEIGHTS instead, best first")
+	cmd.add_argument("-n", type=int, default=1, help="number of tasks to print (may repeat, unless --optimal or --due)")
+	cmd.add_argument("--due", choices=list(Schedule.FILTERS), help=f"only tasks overdue, or due within {DUE_SOON} days (soonest first with --optimal)")
+	
+	cmd = commands.add_parser("add", help="add a task")
+	cmd.add_argument("name")
+	cmd.add_argument("--description", default="")
+	for col, opts in options.items():
+		cmd.add_argument(f"--{col}", choices=list(opts), default=list(opts)[0])
+	cmd.add_argument("--reviewable", action="store_true")
+	cmd.add_argument("--start-date", type=datetime.datetime.fromisoformat, help="when it can be started, as YYYY-MM-DD[ HH:MM]")
+	cmd.add_argument("--deadline", type=datetime.datetime.fromisoformat, help="when it's due, as YYYY-MM-DD[ HH:MM]")
+	
+	cmd = commands.add_parser("list", help="print incomplete tasks, like the View tab")
+	cmd.add_argument("--sort", choices=ItemHandler._sort_cols, nargs="+", default=["creation_date"], help="columns to sort by, in order")
+	cmd.add_argument("--desc", action="store_true", help="sort descending")
+	cmd.add_argument("--search", help="only tasks with words starting with these words, like the View tab's search box")
+	
+	cmd = commands.add_parser("done", help="mark an incomplete task complete")
+	cmd.add_argument("name")
+	
+	cmd = commands.add_parser("history", help="print how many tasks were completed, by month or category")
+	cmd.add_argument("--by", choices=["month", *options, "reviewable"], default="month")
+	
+	cmd = commands.add_parser("stats", help="print the shape of the backlog, like the Stats tab")
+	cmd.add_argument("--weeks", type=int, default=12, help="latest weeks to print created and completed tasks for")
+	cmd.add_argument("--json", action="store_true", help="print everything as JSON")
+	
+	cmd = commands.add_parser("remind", help="print overdue and soon due tasks, then start dates and deadlines as they pass, until Ctrl+C")
+	
+	cmd = commands.add_parser("serve", help="serve the tasks as JSON over HTTP, see Server")
+	cmd.add_argument("--host", default="127.0.0.1", help="address to listen on (anyone who can reach it can change the tasks)")
+	cmd.add_argument("--port", type=int, default=SERVE_PORT)
+	
+	cmd = commands.add_parser("import", help="add the tasks in a CSV or JSON lines (.jsonl) file")
+	cmd.add_argument("path")
+	cmd.add_argument("--chunk-size", type=int, default=1000, help="tasks validated and saved at a time")
+	
+	cmd = commands.add_parser("export", help="write the tasks, completed ones included, as JSON lines, Markdown, HTML or iCalendar")
+	cmd.add_argument("path", help="file to write, its extension (.jsonl, .md, .html or .ics) picks the format")
+	cmd.add_argument("--format", choices=list(EXPORT_FORMATS), help="format, instead of the extension's")
+	cmd.add_argument("--columns", choices=list(ItemHandler._columns), nargs="+", help="columns to write, in order (default all)")
+	cmd.add_argument("--sort", choices=ItemHandler._sort_cols, nargs="+", help="columns to sort incomplete tasks by, in order")
+	cmd.add_argument("--search", help="only tasks with words starting with these words")
+	cmd.add_argument("--where", metavar="COL=VALUE", nargs="+", default=[], help="only tasks with these values, or ranges (e.g. priority=\"Very High..High\")")
+	cmd.add_argument("--open", action="store_true", help="only incomplete tasks")
+	args = parser.parse_args()
+	
+	if args.profile: METRICS.start_profiling()
+	items_handler = ITEM_HANDLERS[args.engine]()
+	items_handler.load_items()
+	try:
+		if args.command is None:
+			gui = GUI(items_handler)
+			gui.build_gui()
+		
+		elif args.command == "choose":
+			first = lambda col: list(options[col])[0]
+			bounds = {
+				"length"      : (args.length_min        , args.length_max),
+				"priority"    : (first("priority")      , args.priority_min),
+				"urgency"     : (first("urgency")       , args.urgency_min),
+				"enjoyability": (first("enjoyability")  , args.enjoyability_min),
+			}
+			weights = CHOOSE_WEIGHTS if args.weighted else None
+			if   args.due    : names = items_handler.choose_due(Schedule.FILTERS[args.due], bounds, weights, args.optimal, args.n)
+			elif args.optimal: names = items_handler.recommend(bounds, n=args.n)
+			else:            names = items_handler.choose_items(bounds, weights, args.n)
+			if len(names) < 1: sys.exit("No items found!")
+			for name in names: print(name)
+		
+		elif args.command == "add":
+			item = {col: getattr(args, col) for col in options}
+			item.update(
+				name=args.name, description=args.description, reviewable=args.reviewable,
+				start_date=args.start_date, deadline=args.deadline
+			)
+			try:
+				items_handler.add_items([item])
+			except ValueError as e:
+				sys.exit(f"ERROR: {e}")
+		
+		elif args.command == "list":
+			keys = items_handler.query({"search": args.search}, [("-" if args.desc else "") + col for col in args.sort])
+			for key in keys:
+				item = items_handler.get_item(key)
+				cells = list()
+				for _, width, col in GUI.view_cols:
+					if   col == "in_progress"   : text = "✓" if item["in_progress"] else ""
+					elif col == "creation_date" : text = item[col].date()
+					else                        : text = item[col]
+					cells.append(f"{text!s:{width}.{width}}")
+				print(" ".join(cells).rstrip())
+		
+		elif args.command == "done":
+			if items_handler.get_incomplete_item(args.name) is None:
+				sys.exit(f"ERROR: No uncompleted task named {args.name!r}")
+			items_handler.update_incomplete_item(args.name, {"complete": True})
+		
+		elif args.command == "history":
+			for key, count in items_handler.completions(args.by).items():
+				print(f"{key!s:20} {count}")
+		
+		elif args.command == "remind":
+			overdue = items_handler.due(Schedule.FILTERS["overdue"])
+			soon    = [name for name in items_handler.due(Schedule.FILTERS["soon"]) if name not in overdue]
+			for label, names in [("Overdue", overdue), (f"Due within {DUE_SOON} days", soon)]:
+				if names: print(f"{label}:")
+				for name in names:
+					print(f"  {GUI.format_date(items_handler.get_incomplete_item(name)['deadline']):16}  {name}")
+			sys.stdout.flush()
+			# Sleeps until the next date passes (or others change the items), see GUI.remind
+			try:
+				while True:
+					for reminder in items_handler.reminders(): print(reminder_line(*reminder), flush=True)
+					when = items_handler.next_reminder()
+					wait = WATCH_INTERVAL / 1000 if when is None else (when - datetime.datetime.now()).total_seconds()
+					time.sleep(min(max(wait, 0), WATCH_INTERVAL / 1000))
+					items_handler.sync()
+			except KeyboardInterrupt:
+				pass
+		
+		elif args.command == "serve":
+			server = Server(items_handler, args.host, args.port)
+			print(f"Serving on http://{args.host}:{args.port}, Ctrl+C to stop")
+			try:
+				asyncio.run(server.run())
+			except KeyboardInterrupt:
+				pass
+		
+		elif args.command == "stats":
+			stats = items_handler.stats()
+			if args.json: print(json.dumps(stats, indent=1))
+			else:         print("\n".join(stats_lines(stats, args.weeks)))
+		
+		elif args.command == "import":
+			try:
+				print(f"Imported {items_handler.import_items(args.path, args.chunk_size)} tasks")
+			except ValueError as e:
+				sys.exit(f"ERROR: {e}")
+		
+		elif args.command == "export":
+			try:
+				filters = {"search": args.search}
+				for where in args.where:
+					col, val = where.split("=", 1)
+					filters[col] = ItemHandler.filter_value(col, val)
+				written = items_handler.export(args.path, args.format, filters, args.columns, args.sort, history=not args.open)
+			except (KeyError, ValueError) as e:
+				sys.exit(f"ERROR: Invalid export: {e}")
+			print(f"Exported {written} tasks")
+	finally:
+		items_handler.close()
+		if args.metrics: METRICS.dump(args.metrics)
+
 if __name__== "__main__": main()
\ No newline at end of file